@@ -2,9 +2,10 @@
 """
 Module to calculate the determinant of a matrix.
 """
+lu = __import__('6-lu_decomposition')
 
 
-def determinant(matrix):
+def determinant(matrix, exact=False):
     """
     Calculate the determinant of a matrix. Validates that the input is a
     list of lists and checks for squareness. Handles 0x0 matrices by
@@ -12,6 +13,10 @@ def determinant(matrix):
 
     Args:
         matrix (list of lists): The matrix to calculate the determinant for.
+        exact (bool or None): False (the default) for floating point LU
+            decomposition, True for exact (fraction-free) arithmetic,
+            None to use exact arithmetic only when every entry is an
+            int.
 
     Returns:
         int or float: The determinant of the matrix, with special handling for
@@ -40,11 +45,5 @@ def determinant(matrix):
     if num_rows == 1:
         return matrix[0][0]
 
-    # Recursive case for matrices larger than 1x1
-    det = 0
-    for col in range(num_rows):
-        minor = [row[:col] + row[col + 1:] for row in matrix[1:]]
-        cofactor = (-1) ** col * matrix[0][col] * determinant(minor)
-        det += cofactor
-
-    return det
+    # O(n^3) elimination instead of the O(n!) cofactor expansion
+    return lu.lu_determinant(matrix, lu.resolve_exact(matrix, exact))
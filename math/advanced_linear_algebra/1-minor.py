@@ -2,36 +2,18 @@
 """
 Module for calculating the minor matrix of a given matrix.
 """
+lu = __import__('6-lu_decomposition')
 
 
-def determinant(matrix):
-    """
-    Calculates the determinant of a matrix.
-
-    Args:
-        matrix (list): A square matrix represented as a list of lists.
-
-    Returns:
-        int: The determinant of the matrix.
-    """
-    if len(matrix) == 1:
-        return matrix[0][0]
-    if len(matrix) == 2:
-        return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
-
-    det = 0
-    for i in range(len(matrix)):
-        mini = [row[:i] + row[i + 1:] for row in matrix[1:]]
-        det += ((-1) ** i) * matrix[0][i] * determinant(mini)
-    return det
-
-
-def minor(matrix):
+def minor(matrix, exact=False):
     """
     Calculates the minor matrix of a given matrix.
 
     Args:
         matrix (list of lists): The matrix to calculate the minor for.
+        exact (bool or None): False (the default) for floating point,
+            True for exact arithmetic, None to use exact arithmetic only
+            when every entry is an int.
 
     Raises:
         TypeError: If matrix is not a list of lists.
@@ -49,14 +31,8 @@ def minor(matrix):
     if len(matrix) == 1 and len(matrix[0]) == 1:
         return [[1]]
 
-    minor_matrix = []
-    for i in range(len(matrix)):
-        minor_row = []
-        for j in range(len(matrix)):
-            # Adjusting line length for compliance
-            submatrix = [row[:j] + row[j + 1:]
-                         for k, row in enumerate(matrix) if k != i]
-            minor_row.append(determinant(submatrix))
-        minor_matrix.append(minor_row)
-
-    return minor_matrix
+    cofactor_matrix = lu.lu_cofactor(matrix, lu.resolve_exact(matrix, exact))
+    # A minor is its cofactor without the (-1)^(i+j) sign
+    return [[value if (i + j) % 2 == 0 else -value
+             for j, value in enumerate(row)]
+            for i, row in enumerate(cofactor_matrix)]
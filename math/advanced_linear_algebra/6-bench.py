@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark of the LU-based determinant and inverse, from n=2 to
+n=500, against the recursive Laplace expansion for small n. The default
+calls on integer matrices run in floating point; exact arithmetic is
+opt-in and only timed for the sizes where it stays practical.
+"""
+import random
+import time
+determinant = __import__('0-determinant').determinant
+inverse = __import__('4-inverse').inverse
+
+
+def laplace(matrix):
+    """Reference recursive cofactor expansion (the original task 0)."""
+    if len(matrix) == 1:
+        return matrix[0][0]
+    det = 0
+    for col in range(len(matrix)):
+        minor = [row[:col] + row[col + 1:] for row in matrix[1:]]
+        det += (-1) ** col * matrix[0][col] * laplace(minor)
+    return det
+
+
+def timed(func, *args, **kwargs):
+    """Returns the wall-clock time of one call."""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    cell = '{:>11}'
+    # the default call on integer matrices, then float and exact opt-ins
+    print(('{:>4}' + cell * 7).format(
+        'n', 'laplace', 'det ints', 'det float', 'det exact', 'inv ints',
+        'inv float', 'inv exact'))
+    for n in (2, 4, 6, 8, 10, 20, 50, 100, 200, 500):
+        ints = [[random.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+        floats = [[float(x) for x in row] for row in ints]
+        times = [
+            timed(laplace, ints) if n <= 8 else None,
+            timed(determinant, ints),
+            timed(determinant, floats),
+            timed(determinant, ints, exact=True) if n <= 200 else None,
+            timed(inverse, ints),
+            timed(inverse, floats),
+            timed(inverse, ints, exact=True) if n <= 50 else None,
+        ]
+        print(('{:>4}' + cell * 7).format(
+            n, *['-' if t is None else '{:.5f}'.format(t) for t in times]))
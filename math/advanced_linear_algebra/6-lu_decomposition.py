@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Module with an LU-decomposition core shared by the determinant, minor,
+cofactor, adjugate and inverse functions. Every operation is O(n^3).
+"""
+import sys
+from fractions import Fraction
+
+
+def resolve_exact(matrix, exact=None):
+    """
+    Decides whether exact arithmetic should be used.
+
+    Args:
+        matrix (list of lists): The matrix that will be decomposed.
+        exact (bool or None): True or False forces the mode, None uses
+            exact arithmetic when every entry is an int.
+
+    Returns:
+        bool: True for exact arithmetic.
+    """
+    if exact is None:
+        return all(type(x) is int for row in matrix for x in row)
+    return exact
+
+
+def simplify(value):
+    """
+    Turns a Fraction with a denominator of 1 back into an int.
+
+    Args:
+        value: The number to simplify.
+
+    Returns:
+        int or the unchanged value.
+    """
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return int(value)
+    return value
+
+
+def lu_decomposition(matrix, exact=False):
+    """
+    Factors P * A = L * U with partial pivoting.
+
+    Args:
+        matrix (list of lists): A square, non-empty matrix.
+        exact (bool): Use Fraction arithmetic, pivoting on the first
+            non-zero entry, instead of floats pivoting on the largest.
+
+    Returns:
+        tuple: (lu, perm, sign) where lu holds U on and above the
+        diagonal and the multipliers of the unit lower triangular L
+        below it, perm is the row permutation and sign its parity.
+        sign is 0 when the matrix is singular; the decomposition then
+        stops at the first column without a pivot.
+    """
+    n = len(matrix)
+    if exact:
+        lu = [[Fraction(x) for x in row] for row in matrix]
+    else:
+        lu = [[float(x) for x in row] for row in matrix]
+    perm = list(range(n))
+    sign = 1
+    for k in range(n):
+        if exact:
+            p = next((i for i in range(k, n) if lu[i][k] != 0), k)
+        else:
+            p = max(range(k, n), key=lambda i: abs(lu[i][k]))
+        if lu[p][k] == 0:
+            return lu, perm, 0
+        if p != k:
+            lu[k], lu[p] = lu[p], lu[k]
+            perm[k], perm[p] = perm[p], perm[k]
+            sign = -sign
+        pivot_row = lu[k]
+        pivot = pivot_row[k]
+        tail = pivot_row[k + 1:]
+        for i in range(k + 1, n):
+            row = lu[i]
+            factor = row[k] / pivot
+            if factor:
+                lu[i] = row[:k] + [factor] + [
+                    x - factor * y for x, y in zip(row[k + 1:], tail)]
+            else:
+                row[k] = factor
+    return lu, perm, sign
+
+
+def bareiss_determinant(matrix):
+    """
+    Fraction-free (Bareiss) elimination: every intermediate value is
+    itself a determinant, so integer matrices stay integers.
+
+    Args:
+        matrix (list of lists): A square, non-empty matrix of ints
+            or Fractions.
+
+    Returns:
+        int or Fraction: The exact determinant.
+    """
+    n = len(matrix)
+    m = [list(row) for row in matrix]
+    integral = all(type(x) is int for row in m for x in row)
+    sign = 1
+    previous = 1
+    for k in range(n - 1):
+        if m[k][k] == 0:
+            swap = next((i for i in range(k + 1, n) if m[i][k] != 0), None)
+            if swap is None:
+                return 0
+            m[k], m[swap] = m[swap], m[k]
+            sign = -sign
+        pivot_row = m[k]
+        pivot = pivot_row[k]
+        tail = pivot_row[k + 1:]
+        for i in range(k + 1, n):
+            row = m[i]
+            head = row[k]
+            if integral:
+                m[i] = row[:k + 1] + [(x * pivot - head * y) // previous
+                                      for x, y in zip(row[k + 1:], tail)]
+            else:
+                m[i] = row[:k + 1] + [(x * pivot - head * y) / previous
+                                      for x, y in zip(row[k + 1:], tail)]
+        previous = pivot
+    return simplify(sign * m[n - 1][n - 1])
+
+
+def lu_determinant(matrix, exact=False):
+    """
+    Determinant of a square, non-empty matrix.
+
+    Args:
+        matrix (list of lists): The matrix.
+        exact (bool): Exact (Bareiss) arithmetic instead of floats.
+
+    Returns:
+        int, Fraction or float: The determinant.
+    """
+    if exact:
+        return bareiss_determinant(
+            [[x if type(x) is int else Fraction(x) for x in row]
+             for row in matrix])
+    lu, _, sign = lu_decomposition(matrix)
+    if sign == 0:
+        return 0.0
+    det = float(sign)
+    for i in range(len(matrix)):
+        det *= lu[i][i]
+    return det
+
+
+def lu_inverse(matrix, exact=False):
+    """
+    Inverse of a square, non-empty matrix by solving L * U * X = P.
+
+    Args:
+        matrix (list of lists): The matrix.
+        exact (bool): Fraction arithmetic instead of floats.
+
+    Returns:
+        list of lists: The inverse, or None if the matrix is singular.
+    """
+    n = len(matrix)
+    lu, perm, sign = lu_decomposition(matrix, exact)
+    if sign == 0:
+        return None
+    one = Fraction(1) if exact else 1.0
+    zero = one - one
+    # forward substitution, one whole row of X at a time
+    x = []
+    for i in range(n):
+        acc = [zero] * n
+        acc[perm[i]] = one
+        row = lu[i]
+        for j in range(i):
+            factor = row[j]
+            if factor:
+                acc = [a - factor * b for a, b in zip(acc, x[j])]
+        x.append(acc)
+    # back substitution
+    for i in range(n - 1, -1, -1):
+        acc = x[i]
+        row = lu[i]
+        for j in range(i + 1, n):
+            factor = row[j]
+            if factor:
+                acc = [a - factor * b for a, b in zip(acc, x[j])]
+        pivot = row[i]
+        x[i] = [a / pivot for a in acc]
+    return x
+
+
+def null_vector(matrix, exact=False):
+    """
+    Rank of a square matrix by Gauss-Jordan elimination with partial
+    pivoting, and a vector spanning its null space when that is a line.
+
+    Args:
+        matrix (list of lists): A square, non-empty matrix.
+        exact (bool): Fraction arithmetic, pivoting on the first
+            non-zero entry, instead of floats pivoting on the largest
+            and treating entries within rounding of 0 as 0.
+
+    Returns:
+        tuple: (rank, x) where x is a non-zero list with matrix * x = 0
+        when the rank is n - 1, and None otherwise.
+    """
+    n = len(matrix)
+    if exact:
+        a = [[Fraction(x) for x in row] for row in matrix]
+        tol = 0
+    else:
+        a = [[float(x) for x in row] for row in matrix]
+        scale = max(abs(x) for row in a for x in row)
+        tol = n * sys.float_info.epsilon * scale
+    pivots = []
+    for k in range(n):
+        r = len(pivots)
+        if r == n:
+            break
+        if exact:
+            p = next((i for i in range(r, n) if a[i][k] != 0), r)
+        else:
+            p = max(range(r, n), key=lambda i: abs(a[i][k]))
+        if abs(a[p][k]) <= tol:
+            continue
+        a[r], a[p] = a[p], a[r]
+        pivot = a[r][k]
+        a[r] = [x / pivot for x in a[r]]
+        pivot_row = a[r]
+        for i in range(n):
+            factor = a[i][k]
+            if i != r and factor:
+                a[i] = [x - factor * y for x, y in zip(a[i], pivot_row)]
+        pivots.append(k)
+    rank = len(pivots)
+    if rank != n - 1:
+        return rank, None
+    free = next(k for k in range(n) if k not in pivots)
+    x = [a[0][0] * 0] * n
+    x[free] = x[free] + 1
+    for r, k in enumerate(pivots):
+        x[k] = -a[r][free]
+    return rank, x
+
+
+def lu_cofactor(matrix, exact=False):
+    """
+    Cofactor matrix of a square, non-empty matrix.
+
+    A non-singular matrix uses cofactor(A) = det(A) * inverse(A)^T.
+    The cofactors of a singular one are all 0 below rank n - 1; at rank
+    n - 1 they are c * u * v^T, u and v spanning the null spaces of A^T
+    and A, with c from a single minor.
+
+    Args:
+        matrix (list of lists): The matrix.
+        exact (bool): Exact arithmetic instead of floats.
+
+    Returns:
+        list of lists: The cofactor matrix.
+    """
+    n = len(matrix)
+    if n == 1:
+        return [[1]]
+    inv = lu_inverse(matrix, exact)
+    if inv is not None:
+        det = lu_determinant(matrix, exact)
+        return [[simplify(det * inv[j][i]) for j in range(n)]
+                for i in range(n)]
+    _, v = null_vector(matrix, exact)
+    _, u = null_vector([list(column) for column in zip(*matrix)], exact)
+    if u is None or v is None:
+        zero = 0 if exact else 0.0
+        return [[zero] * n for _ in range(n)]
+    # the minor of the largest entries of u and v, the best conditioned
+    i = max(range(n), key=lambda r: abs(u[r]))
+    j = max(range(n), key=lambda r: abs(v[r]))
+    rows = matrix[:i] + matrix[i + 1:]
+    minor = lu_determinant([row[:j] + row[j + 1:] for row in rows], exact)
+    c = (-1) ** (i + j) * minor / (u[i] * v[j])
+    return [[simplify(c * x * y) for y in v] for x in u]
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Defines batched determinant, minor and definiteness functions that work
+on a whole (b, n, n) stack of matrices in one vectorized pass.
+"""
+
+import numpy as np
+
+LABELS = np.array([None, "Positive definite", "Positive semi-definite",
+                   "Negative definite", "Negative semi-definite",
+                   "Indefinite"], dtype=object)
+
+
+def check_stack(matrices):
+    """
+    Validates a stack of square matrices.
+
+    Args:
+        matrices (numpy.ndarray): Stack to be validated.
+
+    Raises:
+        TypeError: If matrices is not a numpy.ndarray.
+        ValueError: If matrices does not have shape (b, n, n) with n > 0.
+    """
+    if not isinstance(matrices, np.ndarray):
+        raise TypeError("matrices must be a numpy.ndarray")
+    if (matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]
+            or matrices.shape[1] == 0):
+        raise ValueError("matrices must have shape (b, n, n)")
+
+
+def batch_determinant(matrices):
+    """
+    Calculates the determinant of every matrix in a stack.
+
+    Args:
+        matrices (numpy.ndarray): Stack of shape (b, n, n).
+
+    Returns:
+        numpy.ndarray: Determinants of shape (b,).
+    """
+    check_stack(matrices)
+    return np.linalg.det(matrices)
+
+
+def batch_minor(matrices):
+    """
+    Calculates the minor matrix of every matrix in a stack.
+
+    Non-singular matrices use minor[i, j] = (-1)^(i+j) det * inv[j, i];
+    only the singular ones compute the n^2 sub-determinants.
+
+    Args:
+        matrices (numpy.ndarray): Stack of shape (b, n, n).
+
+    Returns:
+        numpy.ndarray: Minor matrices of shape (b, n, n).
+    """
+    check_stack(matrices)
+    b, n, _ = matrices.shape
+    if n == 1:
+        return np.ones((b, 1, 1))
+    sign = (-1.0) ** np.add.outer(np.arange(n), np.arange(n))
+    det = np.linalg.det(matrices)
+    # |det| against its Hadamard bound, the product of the row norms
+    bound = np.prod(np.linalg.norm(matrices, axis=2), axis=1)
+    regular = np.abs(det) > n * np.finfo(float).eps * bound
+    minors = np.empty((b, n, n))
+    if regular.any():
+        inv = np.linalg.inv(matrices[regular])
+        minors[regular] = (sign * det[regular, np.newaxis, np.newaxis]
+                           * inv.swapaxes(1, 2))
+    if not regular.all():
+        keep = np.array([np.delete(np.arange(n), i) for i in range(n)])
+        sub = matrices[~regular][:, keep[:, np.newaxis, :, np.newaxis],
+                                 keep[np.newaxis, :, np.newaxis, :]]
+        minors[~regular] = np.linalg.det(sub)
+    return minors
+
+
+def batch_cholesky_ok(matrices):
+    """
+    Runs a Cholesky factorization on every matrix of a symmetric stack
+    at once and reports which ones succeeded.
+
+    Args:
+        matrices (numpy.ndarray): Symmetric stack of shape (b, n, n).
+
+    Returns:
+        numpy.ndarray: Boolean mask of shape (b,), True when every pivot
+        is clearly positive (the matrix is positive definite); False
+        also covers nearly singular matrices.
+    """
+    b, n, _ = matrices.shape
+    # near-singular matrices are left to the eigenvalue fallback
+    tol = np.sqrt(np.finfo(float).eps) * np.abs(
+        np.diagonal(matrices, axis1=1, axis2=2)).max(axis=1)
+    lower = np.zeros((b, n, n))
+    ok = np.ones(b, dtype=bool)
+    for j in range(n):
+        row = lower[:, j, :j]
+        pivot = matrices[:, j, j] - np.einsum('bk,bk->b', row, row)
+        ok &= pivot > tol
+        pivot = np.sqrt(np.where(ok, pivot, 1))
+        lower[:, j, j] = pivot
+        lower[:, j + 1:, j] = (matrices[:, j + 1:, j]
+                               - np.einsum('bik,bk->bi',
+                                           lower[:, j + 1:, :j], row)
+                               ) / pivot[:, np.newaxis]
+    return ok
+
+
+def batch_definiteness(matrices):
+    """
+    Calculates the definiteness of every matrix in a stack.
+
+    Non-symmetric matrices are labelled None without further work,
+    matrices whose Cholesky (or that of their negation) succeeds are
+    definite, and only the rest go through eigvalsh.
+
+    Args:
+        matrices (numpy.ndarray): Stack of shape (b, n, n).
+
+    Returns:
+        numpy.ndarray: Object array of shape (b,) with the same labels
+        as definiteness, empty for an empty stack, or None if the stack
+        is not (b, n, n) with n > 0.
+
+    Raises:
+        TypeError: If matrices is not a numpy.ndarray.
+    """
+    if not isinstance(matrices, np.ndarray):
+        raise TypeError("matrices must be a numpy.ndarray")
+    if (matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]
+            or matrices.shape[1] == 0):
+        return None
+    b = matrices.shape[0]
+    codes = np.zeros(b, dtype=np.intp)
+    symmetric = np.all(np.isclose(matrices, matrices.swapaxes(1, 2)),
+                       axis=(1, 2))
+    todo = np.flatnonzero(symmetric)
+
+    positive = batch_cholesky_ok(matrices[todo])
+    codes[todo[positive]] = 1
+    todo = todo[~positive]
+
+    negative = batch_cholesky_ok(-matrices[todo])
+    codes[todo[negative]] = 3
+    todo = todo[~negative]
+
+    if todo.size:
+        eigenvalues = np.linalg.eigvalsh(matrices[todo])
+        # round-off around a zero eigenvalue must not decide the label
+        scale = np.abs(eigenvalues).max(axis=1, keepdims=True)
+        noise = matrices.shape[1] * np.finfo(float).eps * scale
+        eigenvalues[np.abs(eigenvalues) <= noise] = 0
+        rest = np.full(todo.size, 5)
+        rest[np.all(eigenvalues <= 0, axis=1)] = 4
+        rest[np.all(eigenvalues < 0, axis=1)] = 3
+        rest[np.all(eigenvalues >= 0, axis=1)] = 2
+        rest[np.all(eigenvalues > 0, axis=1)] = 1
+        codes[todo] = rest
+    return LABELS[codes]
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark (matrices per second) of the batched determinant,
+minor and definiteness functions against one call per matrix.
+"""
+import time
+import numpy as np
+batched = __import__('7-batched')
+definiteness = __import__('5-definiteness').definiteness
+
+
+def covariances(b, n):
+    """Random stack of covariance matrices, a quarter of them perturbed
+    to be indefinite and a few made non-symmetric."""
+    A = np.random.randn(b, n, n)
+    S = A @ A.swapaxes(1, 2) / n
+    S[::4] -= 2 * np.eye(n)
+    S[::97, 0, -1] += 1
+    return S
+
+
+def rate(func, matrices):
+    """Matrices processed per second by one call."""
+    start = time.perf_counter()
+    func(matrices)
+    return matrices.shape[0] / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    n = 3
+    loop = covariances(10000, n)
+    start = time.perf_counter()
+    for matrix in loop:
+        definiteness(matrix)
+    print('definiteness, one call per matrix: {:,.0f} matrices/s'.format(
+        loop.shape[0] / (time.perf_counter() - start)))
+
+    print('{:>9} {:>16} {:>16} {:>16}'.format(
+        'b', 'determinant/s', 'minor/s', 'definiteness/s'))
+    for b in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+        S = covariances(b, n)
+        print('{:>9} {:>16,.0f} {:>16,.0f} {:>16,.0f}'.format(
+            b, rate(batched.batch_determinant, S),
+            rate(batched.batch_minor, S),
+            rate(batched.batch_definiteness, S)))
@@ -6,6 +6,7 @@
 
 
 import numpy as np
+convolve_im2col = __import__('7-convolve_im2col').convolve_im2col
 
 
 def convolve_grayscale_valid(images, kernel):
@@ -22,15 +23,7 @@ def convolve_grayscale_valid(images, kernel):
     Returns: a numpy.ndarray containing
     the convolved images
     """
-    m, n = kernel.shape
-    if m == n:
-        i, y, x = images.shape
-        y = y - m + 1
-        x = x - m + 1
-        convolved_image = np.zeros((i, y, x))
-        for i in range(y):
-            for j in range(x):
-                shadow_area = images[:, i:i + m, j:j + n]
-                convolved_image[:, i, j] = \
-                    np.sum(shadow_area * kernel, axis=(1, 2))
-    return convolved_image
+    convolved_image = convolve_im2col(images[..., np.newaxis],
+                                      kernel[..., np.newaxis, np.newaxis],
+                                      padding='valid')
+    return convolved_image[..., 0]
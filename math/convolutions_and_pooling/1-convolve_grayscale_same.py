@@ -6,6 +6,7 @@
 
 
 import numpy as np
+convolve_im2col = __import__('7-convolve_im2col').convolve_im2col
 
 
 def convolve_grayscale_same(images, kernel):
@@ -27,25 +28,13 @@ def convolve_grayscale_same(images, kernel):
             the convolved images
 
     '''
-    m = images.shape[0]
-    height = images.shape[1]
-    width = images.shape[2]
-    kh = kernel.shape[0]
-    kw = kernel.shape[1]
-    if kh % 2 == 1:
-        ph = (kh - 1) // 2
-    else:
-        ph = kh // 2
-    if kw % 2 == 1:
-        pw = (kw - 1) // 2
-    else:
-        pw = kw // 2
-    images = np.pad(images, ((0, 0), (ph, ph), (pw, pw)),
-                    'constant', constant_values=0)
-    convoluted = np.zeros((m, height, width))
-    for h in range(height):
-        for w in range(width):
-            output = np.sum(images[:, h: h + kh, w: w + kw] * kernel,
-                            axis=1).sum(axis=1)
-            convoluted[:, h, w] = output
-    return convoluted
+    m, height, width = images.shape
+    kh, kw = kernel.shape
+    # ph == (kh - 1) // 2 for odd kernels and kh // 2 for even kernels,
+    # even kernels produce one extra row/column that is dropped
+    ph = kh // 2
+    pw = kw // 2
+    convoluted = convolve_im2col(images[..., np.newaxis],
+                                 kernel[..., np.newaxis, np.newaxis],
+                                 padding=(ph, pw))
+    return convoluted[:, :height, :width, 0]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+'''
+    Crossover benchmark for the convolution dispatcher:
+    calibrates the cost model on this host, saves it to
+    convolve_costs.json and reports, per image size, the kernel
+    size at which each algorithm becomes the fastest
+'''
+
+
+import json
+import numpy as np
+dispatch = __import__('10-convolve_dispatch')
+convolve_im2col = __import__('7-convolve_im2col').convolve_im2col
+convolve_fft = __import__('9-convolve_fft').convolve_fft
+
+ALGORITHMS = {
+    'direct': dispatch.convolve_direct,
+    'im2col': convolve_im2col,
+    'fft': convolve_fft,
+}
+
+
+def crossovers(sizes):
+    """ smallest kernel size at which each algorithm is the fastest """
+    first = {}
+    for k, name in sizes:
+        first.setdefault(name, k)
+    return first
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    costs = dispatch.calibrate()
+    with open(dispatch.COSTS_FILE, 'w') as f:
+        json.dump(costs, f, indent=4)
+    print('cost coefficients written to', dispatch.COSTS_FILE)
+    for name, value in costs.items():
+        print('    {:<9} {:.3e}'.format(name, value))
+
+    kernel_sizes = (1, 3, 5, 7, 9, 11, 15, 21, 31)
+    for size in (32, 128):
+        images = np.random.randn(8, size, size, 3)
+        measured = []
+        predicted = []
+        print('\nimages (8, {0}, {0}, 3), 8 kernels, same padding'.format(
+            size))
+        print('{:>4} {:>10} {:>10} {:>10} {:>9} {:>9}'.format(
+            'k', 'direct', 'im2col', 'fft', 'fastest', 'chosen'))
+        for k in kernel_sizes:
+            kernels = np.random.randn(k, k, 3, 8)
+            times = {name: dispatch.best_time(func, images, kernels)
+                     for name, func in ALGORITHMS.items()}
+            fastest = min(times, key=times.get)
+            chosen = dispatch.choose_algorithm(images.shape, kernels.shape,
+                                               costs=costs)
+            measured.append((k, fastest))
+            predicted.append((k, chosen))
+            print('{:>4} {:>10.5f} {:>10.5f} {:>10.5f} {:>9} {:>9}'.format(
+                k, times['direct'], times['im2col'], times['fft'],
+                fastest, chosen))
+        print('measured thresholds: ', crossovers(measured))
+        print('predicted thresholds:', crossovers(predicted))
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+'''
+    A cost model dispatcher for convolutions:
+    estimates the time of the direct, im2col and FFT algorithms
+    from the shapes of a call and runs the cheapest one
+'''
+
+
+import json
+import os
+import time
+import numpy as np
+resolve_padding = __import__('7-convolve_im2col').resolve_padding
+window_view = __import__('7-convolve_im2col').window_view
+convolve_im2col = __import__('7-convolve_im2col').convolve_im2col
+next_fast_len = __import__('9-convolve_fft').next_fast_len
+convolve_fft = __import__('9-convolve_fft').convolve_fft
+
+COSTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'convolve_costs.json')
+# seconds per unit of work, overwritten by convolve_costs.json if present
+COSTS = {
+    'call': 5e-6,
+    'direct': 1.5e-9,
+    'copy': 1e-9,
+    'gemm': 1e-10,
+    'fft': 2e-9,
+    'spectral': 2e-9,
+}
+# path -> ((modification time, size) or None if missing, costs)
+LOADED_COSTS = {}
+
+
+def load_costs(path=COSTS_FILE):
+    '''
+        Loads the cost coefficients measured by calibrate, parsing
+        the file again only once its modification time or size changes
+
+        path: json file written by 10-bench.py
+
+        returns:
+            dict of cost coefficients, the defaults if path is missing
+    '''
+    try:
+        info = os.stat(path)
+        stamp = info.st_mtime_ns, info.st_size
+    except OSError:
+        stamp = None
+    cached = LOADED_COSTS.get(path)
+    if cached is None or cached[0] != stamp:
+        costs = dict(COSTS)
+        if stamp is not None:
+            with open(path) as f:
+                costs.update(json.load(f))
+        cached = LOADED_COSTS[path] = stamp, costs
+    return dict(cached[1])
+
+
+def convolve_direct(images, kernels, padding='same', stride=(1, 1)):
+    """
+    Performs a convolution on images using multiple kernels
+    by accumulating one small matrix product per kernel tap,
+    kh * kw iterations and no im2col expansion
+
+    parameters:
+        images [numpy.ndarray with shape (m, h, w, c)]:
+            contains multiple images
+        kernels [numpy.ndarray with shape (kh, kw, c, nc)]:
+            contains the kernels for the convolution
+        padding [tuple of (ph, pw) or 'same' or 'valid']:
+            same semantics as convolve
+        stride [tuple of (sh, sw)]:
+            sh: stride for the height of the image
+            sw: stride for the width of the image
+
+    returns:
+        numpy.ndarray with shape (m, ch, cw, nc) containing
+        the convolved images
+    """
+    m, height, width, c = images.shape
+    kh, kw, kc, nc = kernels.shape
+    sh, sw = stride
+    ph, pw = resolve_padding(padding, height, width, kh, kw, sh, sw)
+    if ph or pw:
+        images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
+                        'constant', constant_values=0)
+    ch = ((height + (2 * ph) - kh) // sh) + 1
+    cw = ((width + (2 * pw) - kw) // sw) + 1
+    convolved = np.zeros((m, ch, cw, nc))
+    for i in range(kh):
+        for j in range(kw):
+            tap = images[:, i:i + (ch - 1) * sh + 1:sh,
+                         j:j + (cw - 1) * sw + 1:sw]
+            convolved += np.tensordot(tap, kernels[i, j], axes=1)
+    return convolved
+
+
+def estimate_costs(images_shape, kernels_shape, padding='same',
+                   stride=(1, 1), costs=None):
+    '''
+        Estimates the running time of every convolution algorithm
+
+        images_shape: (m, h, w, c) shape of the images
+        kernels_shape: (kh, kw, c, nc) shape of the kernels
+        padding: same semantics as convolve
+        stride: (sh, sw) stride of the convolution
+        costs: dict of cost coefficients, defaults to load_costs()
+
+        returns:
+            dict mapping 'direct', 'im2col' and 'fft' to seconds
+    '''
+    if costs is None:
+        costs = load_costs()
+    m, height, width, c = images_shape
+    kh, kw, kc, nc = kernels_shape
+    sh, sw = stride
+    ph, pw = resolve_padding(padding, height, width, kh, kw, sh, sw)
+    ch = ((height + (2 * ph) - kh) // sh) + 1
+    cw = ((width + (2 * pw) - kw) // sw) + 1
+    windows = m * ch * cw
+    lh = next_fast_len(height + 2 * ph)
+    lw = next_fast_len(width + 2 * pw)
+    transforms = m * c + c * nc + m * nc
+    return {
+        'direct': kh * kw * costs['call']
+        + windows * kh * kw * c * nc * costs['direct'],
+        'im2col': costs['call']
+        + windows * kh * kw * c * (costs['copy'] + nc * costs['gemm']),
+        'fft': 3 * costs['call']
+        + transforms * lh * lw * np.log2(lh * lw) * costs['fft']
+        + m * lh * (lw // 2 + 1) * c * nc * costs['spectral'],
+    }
+
+
+def choose_algorithm(images_shape, kernels_shape, padding='same',
+                     stride=(1, 1), costs=None):
+    '''
+        Picks the convolution algorithm with the lowest estimated time
+
+        arguments are the same as estimate_costs
+
+        returns:
+            'direct', 'im2col' or 'fft'
+    '''
+    estimates = estimate_costs(images_shape, kernels_shape, padding,
+                               stride, costs)
+    return min(estimates, key=estimates.get)
+
+
+def convolve_auto(images, kernels, padding='same', stride=(1, 1),
+                  costs=None):
+    """
+    Performs a convolution on images using multiple kernels
+    with the algorithm the cost model estimates to be the fastest
+
+    parameters:
+        images [numpy.ndarray with shape (m, h, w, c)]:
+            contains multiple images
+        kernels [numpy.ndarray with shape (kh, kw, c, nc)]:
+            contains the kernels for the convolution
+        padding [tuple of (ph, pw) or 'same' or 'valid']:
+            same semantics as convolve
+        stride [tuple of (sh, sw)]:
+            sh: stride for the height of the image
+            sw: stride for the width of the image
+        costs [dict or None]:
+            cost coefficients, defaults to load_costs()
+
+    returns:
+        numpy.ndarray with shape (m, ch, cw, nc) containing
+        the convolved images
+    """
+    algorithms = {
+        'direct': convolve_direct,
+        'im2col': convolve_im2col,
+        'fft': convolve_fft,
+    }
+    name = choose_algorithm(images.shape, kernels.shape, padding, stride,
+                            costs)
+    return algorithms[name](images, kernels, padding=padding, stride=stride)
+
+
+def best_time(func, *args, repeat=3):
+    """ returns the fastest wall-clock time of repeat calls """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate():
+    '''
+        Measures the cost coefficients on this host
+
+        every coefficient is timed on a problem dominated by
+        the work it models and divided by the amount of work
+
+        returns:
+            dict of cost coefficients
+    '''
+    costs = {}
+    small = np.zeros((1, 1))
+    costs['call'] = best_time(np.tensordot, small, small, 1, repeat=200)
+
+    images = np.random.randn(16, 64, 64, 8)
+    windows = window_view(images, 3, 3, 1, 1)
+    costs['copy'] = best_time(np.ascontiguousarray, windows) / windows.size
+
+    a = np.random.randn(4096, 256)
+    b = np.random.randn(256, 64)
+    costs['gemm'] = best_time(np.dot, a, b) / (a.size * b.shape[1])
+
+    kernels = np.random.randn(3, 3, 8, 16)
+    work = 16 * 64 * 64 * 9 * 8 * 16
+    elapsed = best_time(convolve_direct, images, kernels, 'same')
+    costs['direct'] = max(elapsed - 9 * costs['call'], 0) / work
+
+    signal = np.random.randn(64, 128, 128)
+
+    def round_trip(x):
+        """ forward and inverse transforms """
+        np.fft.irfft2(np.fft.rfft2(x), s=x.shape[1:])
+
+    elapsed = best_time(round_trip, signal) / 2
+    costs['fft'] = elapsed / (signal.size * np.log2(128 * 128))
+
+    def spectral_product(f_images, f_kernels):
+        """ products of the spectra summed over the channels """
+        np.einsum('mhwc,hwcn->mhwn', f_images, f_kernels, optimize=True)
+
+    f_images = np.random.randn(16, 64, 33, 8) + 0j
+    f_kernels = np.random.randn(64, 33, 8, 16) + 0j
+    elapsed = best_time(spectral_product, f_images, f_kernels)
+    costs['spectral'] = elapsed / (16 * 64 * 33 * 8 * 16)
+    return costs
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+'''
+    Benchmarks the strided-window pooling against the original
+    loop pooling, and times the backward pass
+'''
+
+
+import time
+import numpy as np
+pool = __import__('6-pool').pool
+pool_backward = __import__('11-pool_backward').pool_backward
+
+
+def pool_loop(images, kernel_shape, stride, mode='max'):
+    """ reference loop pooling (original task 6 implementation) """
+    m, height, width, c = images.shape
+    kh, kw = kernel_shape
+    sh, sw = stride
+    ph = ((height - kh) // sh) + 1
+    pw = ((width - kw) // sw) + 1
+    pooled = np.zeros((m, ph, pw, c))
+    for i, h in enumerate(range(0, (height - kh + 1), sh)):
+        for j, w in enumerate(range(0, (width - kw + 1), sw)):
+            if mode == 'max':
+                output = np.max(images[:, h:h + kh, w:w + kw, :], axis=(1, 2))
+            else:
+                output = np.average(images[:, h:h + kh, w:w + kw, :],
+                                    axis=(1, 2))
+            pooled[:, i, j, :] = output
+    return pooled
+
+
+def best_of(func, *args, repeat=3, **kwargs):
+    """ returns the fastest wall-clock time of repeat calls """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    print('{:>4} {:>5} {:>7} {:>7} {:>5} {:>9} {:>9} {:>8} {:>9} {:>9}'.format(
+        'm', 'size', 'kernel', 'stride', 'mode', 'loop (s)', 'fast (s)',
+        'speedup', '+idx (s)', 'back (s)'))
+    row = ('{:>4} {:>5} {:>7} {:>7} {:>5} {:>9.4f} {:>9.4f} {:>7.1f}x'
+           ' {:>9.4f} {:>9.4f}')
+    for m, size in ((8, 64), (64, 64), (16, 224)):
+        images = np.random.randn(m, size, size, 16)
+        for kernel, stride in (((2, 2), (2, 2)), ((3, 3), (2, 2)),
+                               ((3, 3), (1, 1))):
+            for mode in ('max', 'avg'):
+                expected = pool_loop(images, kernel, stride, mode)
+                assert np.allclose(expected,
+                                   pool(images, kernel, stride, mode))
+                t_loop = best_of(pool_loop, images, kernel, stride, mode,
+                                 repeat=1)
+                t_fast = best_of(pool, images, kernel, stride, mode)
+                t_idx = best_of(pool, images, kernel, stride, mode,
+                                return_indices=(mode == 'max'))
+                if mode == 'max':
+                    dA, indices = pool(images, kernel, stride, mode,
+                                       return_indices=True)
+                else:
+                    dA, indices = expected, None
+                t_back = best_of(pool_backward, dA, images.shape, kernel,
+                                 stride, mode, indices=indices)
+                print(row.format(m, size, '{}x{}'.format(*kernel),
+                                 '{}x{}'.format(*stride), mode, t_loop,
+                                 t_fast, t_loop / t_fast, t_idx, t_back))
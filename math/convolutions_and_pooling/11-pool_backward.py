@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+'''
+    a function def
+    pool_backward(dA, images_shape, kernel_shape, stride, mode='max'):
+    that performs back propagation over a pooling layer
+'''
+
+
+import numpy as np
+pool = __import__('6-pool').pool
+pool_padding = __import__('6-pool').pool_padding
+
+
+def pool_backward(dA, images_shape, kernel_shape, stride, mode='max',
+                  padding='valid', indices=None, images=None):
+    '''
+        dA: numpy.ndarray with shape (m, ph, pw, c)
+            partial derivatives with respect to the pooled output
+        images_shape: tuple of (m, h, w, c), shape of the pooled images
+        kernel_shape: tuple of (kh, kw)
+        stride: tuple of (sh, sw)
+        mode: max or avg
+        padding: 'valid', 'same' or a tuple of (ph, pw),
+            must match the forward pooling
+        indices: flat indices returned by
+            pool(..., mode='max', return_indices=True), the windows are
+            not recomputed when they are given
+        images: numpy.ndarray with shape images_shape, only needed in
+            max mode when indices is None
+        Returns: numpy.ndarray with shape images_shape containing
+            the partial derivatives with respect to the images
+    '''
+    m, height, width, c = images_shape
+    kh, kw = kernel_shape
+    sh, sw = stride
+    top, bottom, left, right = pool_padding(padding, height, width,
+                                            kh, kw, sh, sw)
+    if mode == 'max':
+        if indices is None:
+            _, indices = pool(images, kernel_shape, stride, mode='max',
+                              padding=padding, return_indices=True)
+        # scatter every gradient to (image, row * w + col, channel)
+        position = (np.arange(m)[:, np.newaxis, np.newaxis, np.newaxis]
+                    * (height * width) + indices) * c + np.arange(c)
+        dX = np.bincount(position.ravel(), weights=dA.ravel(),
+                         minlength=m * height * width * c)
+        return dX.reshape(images_shape)
+
+    ph, pw = dA.shape[1:3]
+    rows = np.arange(ph) * sh - top
+    cols = np.arange(pw) * sw - left
+    rows = np.minimum(rows + kh, height) - np.maximum(rows, 0)
+    cols = np.minimum(cols + kw, width) - np.maximum(cols, 0)
+    share = dA / np.outer(rows, cols)[np.newaxis, :, :, np.newaxis]
+    dX = np.zeros((m, height + top + bottom, width + left + right, c))
+    # within one tap the windows never overlap, so += is safe
+    for i in range(kh):
+        for j in range(kw):
+            dX[:, i:i + (ph - 1) * sh + 1:sh,
+               j:j + (pw - 1) * sw + 1:sw] += share
+    return dX[:, top:top + height, left:left + width]
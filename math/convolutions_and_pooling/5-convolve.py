@@ -7,9 +7,11 @@
 
 
 import numpy as np
+convolve_auto = __import__('10-convolve_dispatch').convolve_auto
+convolve_chunked = __import__('8-convolve_chunked').convolve_chunked
 
 
-def convolve(images, kernels, padding='same', stride=(1, 1)):
+def convolve(images, kernels, padding='same', stride=(1, 1), max_bytes=None):
     """
     Performs a convolution on images with multiple channels
     using given padding and stride
@@ -35,6 +37,12 @@ def convolve(images, kernels, padding='same', stride=(1, 1)):
         stride [tuple of (sh, sw)]:
             sh: stride for the height of the image
             sw: stride for the width of the image
+        max_bytes [int or None]:
+            if given, the batch and the output rows are tiled so that
+            the temporaries of each tile stay under max_bytes, always
+            with the im2col engine; otherwise the cost model picks the
+            direct, im2col or FFT engine. The results of the engines
+            agree to rounding, not bit for bit
 
     if needed, images should be padded with 0s
     function may only use two for loops maximum and no other loops are allowed
@@ -42,29 +50,8 @@ def convolve(images, kernels, padding='same', stride=(1, 1)):
     returns:
         numpy.ndarray contained convolved images
     """
-    m, height, width, c = images.shape
-    kh, kw, kc, nc = kernels.shape
-    sh, sw = stride
-    if padding is 'same':
-        ph = ((((height - 1) * sh) + kh - height) // 2) + 1
-        pw = ((((width - 1) * sw) + kw - width) // 2) + 1
-    elif padding is 'valid':
-        ph = 0
-        pw = 0
-    else:
-        ph, pw = padding
-    images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
-                    'constant', constant_values=0)
-    ch = ((height + (2 * ph) - kh) // sh) + 1
-    cw = ((width + (2 * pw) - kw) // sw) + 1
-    convoluted = np.zeros((m, ch, cw, nc))
-
-    for index in range(nc):
-        kernel_index = kernels[:, :, :, index]
-        for i, h in enumerate(range(0, (height + (2 * ph) - kh + 1), sh)):
-            for j, w in enumerate(range(0, (width + (2 * pw) - kw + 1), sw)):
-                output = np.sum(images[:, h: h + kh, w: w + kw, :]
-                                * kernel_index, axis=(1, 2, 3))
-                convoluted[:, i, j, index] = output
-
-    return convoluted
+    if max_bytes is not None:
+        convoluted, _, _ = convolve_chunked(images, kernels, padding=padding,
+                                            stride=stride, max_bytes=max_bytes)
+        return convoluted
+    return convolve_auto(images, kernels, padding=padding, stride=stride)
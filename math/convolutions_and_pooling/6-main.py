@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import numpy as np
+pool = __import__('6-pool').pool
+pool_backward = __import__('11-pool_backward').pool_backward
+
+if __name__ == '__main__':
+    images = np.arange(2 * 4 * 4 * 1, dtype=float).reshape(2, 4, 4, 1)
+    # padding kernel - 1: every window still holds a real cell
+    pooled, indices = pool(images, (2, 2), (2, 2), mode='max',
+                           padding=(1, 1), return_indices=True)
+    print(pooled[0, :, :, 0])
+    print(indices[0, :, :, 0])
+    print(pool(images, (2, 2), (2, 2), mode='avg', padding=(1, 1))[0, :, :, 0])
+    dX = pool_backward(np.ones(pooled.shape), images.shape, (2, 2), (2, 2),
+                       mode='max', padding=(1, 1), indices=indices)
+    print(dX[0, :, :, 0])
+    # padding as large as the kernel would give windows of padding only
+    for mode in ('max', 'avg'):
+        try:
+            pool(images, (1, 1), (1, 1), mode=mode, padding=(1, 1))
+        except ValueError as e:
+            print(mode, e)
+    try:
+        pool_backward(np.ones((2, 6, 6, 1)), images.shape, (1, 1), (1, 1),
+                      mode='max', padding=(1, 1), images=images)
+    except ValueError as e:
+        print('backward', e)
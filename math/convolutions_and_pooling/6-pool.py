@@ -8,9 +8,44 @@
 
 
 import numpy as np
+window_view = __import__('7-convolve_im2col').window_view
 
 
-def pool(images, kernel_shape, stride, mode='max'):
+def pool_padding(padding, height, width, kh, kw, sh, sw):
+    '''
+        Converts a pooling padding argument into explicit padding
+
+        padding: 'valid', 'same' or a tuple of (ph, pw)
+            'same' pads so that the output has ceil(h / sh) rows and
+            ceil(w / sw) columns, the extra row/column goes at the end
+        height, width: size of the images
+        kh, kw: size of the kernel
+        sh, sw: stride of the pooling
+
+        returns:
+            (top, bottom, left, right) padding
+
+        raises:
+            ValueError: if an explicit padding is negative or not
+            smaller than the kernel, which would leave windows made
+            of padding only
+    '''
+    if padding == 'valid':
+        return 0, 0, 0, 0
+    if padding == 'same':
+        total_h = max((-(-height // sh) - 1) * sh + kh - height, 0)
+        total_w = max((-(-width // sw) - 1) * sw + kw - width, 0)
+        return (total_h // 2, total_h - total_h // 2,
+                total_w // 2, total_w - total_w // 2)
+    ph, pw = padding
+    if not 0 <= ph < kh or not 0 <= pw < kw:
+        raise ValueError('padding must be non-negative and smaller than '
+                         'kernel_shape')
+    return ph, ph, pw, pw
+
+
+def pool(images, kernel_shape, stride, mode='max', padding='valid',
+         return_indices=False, unravel=False):
     '''
         images: numpy.ndarray with shape (m, h, w, c)
             m: number of images
@@ -23,26 +58,52 @@ def pool(images, kernel_shape, stride, mode='max'):
         stride: tuple of (sh, sw)
             sh: stride for the height of the image
             sw: stride for the width of the image
+            windows overlap when the stride is smaller than the kernel
         mode: max or avg
-        Returns: numpy.ndarray containing the pooled images
+        padding: 'valid', 'same' or a tuple of (ph, pw) with
+            0 <= ph < kh and 0 <= pw < kw, so that every window holds
+            a real cell; padded cells are never selected by max and
+            are not counted by avg
+        return_indices: if True, also return the position in the
+            image of the maximum of every window (mode max only)
+        unravel: if True the indices are a tuple (rows, cols),
+            otherwise the flat index row * w + col
+        Returns: numpy.ndarray containing the pooled images,
+            and the indices if return_indices is True
     '''
     m, height, width, c = images.shape
     kh, kw = kernel_shape
     sh, sw = stride
+    top, bottom, left, right = pool_padding(padding, height, width,
+                                            kh, kw, sh, sw)
+    images = images.astype(float, copy=False)
+    if top or bottom or left or right:
+        fill = -np.inf if mode == 'max' else 0
+        images = np.pad(images, ((0, 0), (top, bottom), (left, right),
+                                 (0, 0)),
+                        'constant', constant_values=fill)
+    windows = window_view(images, kh, kw, sh, sw)
+    ph, pw = windows.shape[1:3]
+
+    if mode == 'avg':
+        # number of real (non padded) cells in each window
+        rows = np.arange(ph) * sh - top
+        cols = np.arange(pw) * sw - left
+        rows = np.minimum(rows + kh, height) - np.maximum(rows, 0)
+        cols = np.minimum(cols + kw, width) - np.maximum(cols, 0)
+        count = np.outer(rows, cols)[np.newaxis, :, :, np.newaxis]
+        return windows.sum(axis=(3, 4)) / count
 
-    ph = ((height - kh) // sh) + 1
-    pw = ((width - kw) // sw) + 1
-    pooled = np.zeros((m, ph, pw, c))
-
-    for i, h in enumerate(range(0, (height - kh + 1), sh)):
-        for j, w in enumerate(range(0, (width - kw + 1), sw)):
-            if mode == 'max':
-                output = np.max(images[:, h:h + kh, w:w + kw, :], axis=(1, 2))
-            elif mode == 'avg':
-                output = np.average(images[:, h:h + kh, w:w + kw, :],
-                                    axis=(1, 2))
-            else:
-                pass
-            pooled[:, i, j, :] = output
-
-    return pooled
+    pooled = windows.max(axis=(3, 4))
+    if not return_indices:
+        return pooled
+    # first tap (row-major in the window) that holds the maximum
+    arg = np.full(pooled.shape, kh * kw - 1)
+    for tap in range(kh * kw - 2, -1, -1):
+        np.copyto(arg, tap,
+                  where=windows[:, :, :, tap // kw, tap % kw] == pooled)
+    rows = (np.arange(ph) * sh - top)[:, np.newaxis, np.newaxis] + arg // kw
+    cols = (np.arange(pw) * sw - left)[:, np.newaxis] + arg % kw
+    if unravel:
+        return pooled, (rows, cols)
+    return pooled, rows * width + cols
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+'''
+    Benchmarks the im2col engine against the original loop convolution
+    across batch size, image size and number of kernels
+'''
+
+
+import time
+import numpy as np
+convolve_im2col = __import__('7-convolve_im2col').convolve_im2col
+resolve_padding = __import__('7-convolve_im2col').resolve_padding
+
+
+def convolve_loop(images, kernels, padding='same', stride=(1, 1)):
+    """ reference loop convolution (original task 5 implementation) """
+    m, height, width, c = images.shape
+    kh, kw, kc, nc = kernels.shape
+    sh, sw = stride
+    ph, pw = resolve_padding(padding, height, width, kh, kw, sh, sw)
+    images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
+                    'constant', constant_values=0)
+    ch = ((height + (2 * ph) - kh) // sh) + 1
+    cw = ((width + (2 * pw) - kw) // sw) + 1
+    convoluted = np.zeros((m, ch, cw, nc))
+    for index in range(nc):
+        kernel_index = kernels[:, :, :, index]
+        for i, h in enumerate(range(0, (height + (2 * ph) - kh + 1), sh)):
+            for j, w in enumerate(range(0, (width + (2 * pw) - kw + 1), sw)):
+                output = np.sum(images[:, h: h + kh, w: w + kw, :]
+                                * kernel_index, axis=(1, 2, 3))
+                convoluted[:, i, j, index] = output
+    return convoluted
+
+
+def best_of(func, *args, repeat=3):
+    """ returns the fastest wall-clock time of repeat calls """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    cases = [(m, size, nc)
+             for m in (1, 8, 32)
+             for size in (16, 32, 64)
+             for nc in (4, 16, 64)]
+    row = '{:>4} {:>5} {:>4} {:>10.4f} {:>10.4f} {:>8.1f}x'
+    print('{:>4} {:>5} {:>4} {:>10} {:>10} {:>9}'.format(
+        'm', 'size', 'nc', 'loop (s)', 'im2col (s)', 'speedup'))
+    for m, size, nc in cases:
+        images = np.random.randn(m, size, size, 3)
+        kernels = np.random.randn(3, 3, 3, nc)
+        expected = convolve_loop(images, kernels)
+        assert np.allclose(expected, convolve_im2col(images, kernels))
+        t_loop = best_of(convolve_loop, images, kernels, repeat=1)
+        t_fast = best_of(convolve_im2col, images, kernels)
+        print(row.format(m, size, nc, t_loop, t_fast, t_loop / t_fast))
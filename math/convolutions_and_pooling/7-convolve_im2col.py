@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+'''
+    An im2col convolution engine:
+    builds a zero-copy strided window view of the padded images
+    and convolves every kernel with a single tensordot (GEMM)
+'''
+
+
+import numpy as np
+
+
+def resolve_padding(padding, height, width, kh, kw, sh, sw):
+    '''
+        Converts a padding argument into a (ph, pw) tuple
+
+        padding [tuple of (ph, pw) or 'same' or 'valid']:
+            'same' uses the same formula as convolve_grayscale,
+            convolve_channels and convolve
+        height, width: size of the images
+        kh, kw: size of the kernel
+        sh, sw: stride of the convolution
+
+        returns:
+            (ph, pw) padding for the height and width of the images
+    '''
+    if padding == 'same':
+        ph = ((((height - 1) * sh) + kh - height) // 2) + 1
+        pw = ((((width - 1) * sw) + kw - width) // 2) + 1
+    elif padding == 'valid':
+        ph = 0
+        pw = 0
+    else:
+        ph, pw = padding
+    return ph, pw
+
+
+def window_view(images, kh, kw, sh, sw):
+    '''
+        Creates a read-only strided view of every convolution window
+
+        images [numpy.ndarray with shape (m, h, w, c)]:
+            already padded images
+        kh, kw: size of the kernel
+        sh, sw: stride of the convolution
+
+        no data is copied, the view shares memory with images
+
+        returns:
+            numpy.ndarray view with shape (m, ch, cw, kh, kw, c)
+    '''
+    m, height, width, c = images.shape
+    ch = ((height - kh) // sh) + 1
+    cw = ((width - kw) // sw) + 1
+    s_m, s_h, s_w, s_c = images.strides
+    return np.lib.stride_tricks.as_strided(
+        images, shape=(m, ch, cw, kh, kw, c),
+        strides=(s_m, s_h * sh, s_w * sw, s_h, s_w, s_c),
+        writeable=False)
+
+
+def convolve_im2col(images, kernels, padding='same', stride=(1, 1)):
+    """
+    Performs a convolution on images using multiple kernels
+    with one matrix product over all windows and all kernels
+
+    parameters:
+        images [numpy.ndarray with shape (m, h, w, c)]:
+            contains multiple images
+        kernels [numpy.ndarray with shape (kh, kw, c, nc)]:
+            contains the kernels for the convolution
+            nc: number of kernels
+        padding [tuple of (ph, pw) or 'same' or 'valid']:
+            same semantics as convolve
+        stride [tuple of (sh, sw)]:
+            sh: stride for the height of the image
+            sw: stride for the width of the image
+
+    returns:
+        numpy.ndarray with shape (m, ch, cw, nc) containing
+        the convolved images
+    """
+    m, height, width, c = images.shape
+    kh, kw, kc, nc = kernels.shape
+    sh, sw = stride
+    ph, pw = resolve_padding(padding, height, width, kh, kw, sh, sw)
+    if ph or pw:
+        images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
+                        'constant', constant_values=0)
+    windows = window_view(images, kh, kw, sh, sw)
+    convolved = np.tensordot(windows, kernels, axes=3)
+    return convolved.astype(float, copy=False)
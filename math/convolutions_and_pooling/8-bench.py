@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+'''
+    Benchmarks the chunked convolution for several memory budgets:
+    time, number of tiles, reported and traced peak bytes
+'''
+
+
+import time
+import tracemalloc
+import numpy as np
+convolve_im2col = __import__('7-convolve_im2col').convolve_im2col
+convolve_chunked = __import__('8-convolve_chunked').convolve_chunked
+rounding_bound = __import__('8-convolve_chunked').rounding_bound
+
+
+def traced(func, *args, **kwargs):
+    """ returns the result, wall-clock time and traced peak of a call """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    images = np.random.randn(256, 64, 64, 3)
+    kernels = np.random.randn(3, 3, 3, 32)
+    expected, t_full, p_full = traced(convolve_im2col, images, kernels)
+    bound = rounding_bound(images, kernels)
+    output_bytes = expected.nbytes
+    print('{:>12} {:>8} {:>6} {:>14} {:>14}'.format(
+        'max_bytes', 'time (s)', 'tiles', 'peak (report)', 'peak (traced)'))
+    print('{:>12} {:>8.3f} {:>6} {:>14} {:>14}'.format(
+        'unbounded', t_full, 1, '-', p_full - output_bytes))
+    for max_bytes in (2 ** 30, 2 ** 26, 2 ** 22, 2 ** 18, 2 ** 14):
+        (convolved, tiles, peak), elapsed, traced_peak = traced(
+            convolve_chunked, images, kernels, max_bytes=max_bytes)
+        assert np.abs(convolved - expected).max() <= bound
+        print('{:>12} {:>8.3f} {:>6} {:>14} {:>14}'.format(
+            max_bytes, elapsed, tiles, peak, traced_peak - output_bytes))
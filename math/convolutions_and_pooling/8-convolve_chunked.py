@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+'''
+    A memory bounded convolution:
+    tiles the batch and the output rows so that the im2col
+    expansion of each tile stays under a byte budget
+'''
+
+
+import numpy as np
+resolve_padding = __import__('7-convolve_im2col').resolve_padding
+window_view = __import__('7-convolve_im2col').window_view
+
+
+def tile_bytes(mt, rt, cw, width, c, kh, kw, nc, sh, itemsize):
+    '''
+        Bytes allocated to convolve one tile
+
+        mt: number of images in the tile
+        rt: number of output rows in the tile
+        cw: number of output columns
+        width: padded width of the images
+        c: number of channels
+        kh, kw: size of the kernel
+        nc: number of kernels
+        sh: stride for the height of the image
+        itemsize: size in bytes of one element
+
+        returns:
+            size of the padded input slab, the im2col patch matrix
+            and the matrix product for the tile
+    '''
+    rows_in = (rt - 1) * sh + kh
+    slab = mt * rows_in * width * c * itemsize
+    patches = mt * rt * cw * kh * kw * c * itemsize
+    product = mt * rt * cw * nc * itemsize
+    return slab + patches + product
+
+
+def rounding_bound(images, kernels):
+    '''
+        Largest difference expected between two convolutions of the
+        same images that sum the kh * kw * c products of each output
+        in different orders, as the tiles and the untiled engines do
+
+        images: numpy.ndarray with shape (m, h, w, c)
+        kernels: numpy.ndarray with shape (kh, kw, c, nc)
+
+        returns:
+            2 * gamma_n * max|images| * the largest 1-norm of a kernel,
+            gamma_n = n * eps / (1 - n * eps) for n products
+    '''
+    n = kernels.shape[0] * kernels.shape[1] * kernels.shape[2]
+    eps = np.finfo(np.result_type(images, kernels, float)).eps
+    gamma = n * eps / (1 - n * eps)
+    scale = np.abs(images).max(initial=0) * np.abs(kernels).sum(
+        axis=(0, 1, 2)).max(initial=0)
+    return 2 * gamma * scale
+
+
+def convolve_chunked(images, kernels, padding='same', stride=(1, 1),
+                     max_bytes=2 ** 28):
+    """
+    Performs a convolution on images using multiple kernels
+    while keeping the working memory under max_bytes
+
+    parameters:
+        images [numpy.ndarray with shape (m, h, w, c)]:
+            contains multiple images
+        kernels [numpy.ndarray with shape (kh, kw, c, nc)]:
+            contains the kernels for the convolution
+        padding [tuple of (ph, pw) or 'same' or 'valid']:
+            same semantics as convolve
+        stride [tuple of (sh, sw)]:
+            sh: stride for the height of the image
+            sw: stride for the width of the image
+        max_bytes [int]:
+            budget for the temporaries of one tile, the returned
+            array is not counted; a single output row of a single
+            image is the smallest tile, so the budget can be exceeded
+            when even that does not fit
+
+    the batch is split first, then the output rows of each image,
+    every tile is padded on its own so the full padded batch is never
+    allocated
+
+    every tile is an im2col matrix product of its own, and BLAS may sum
+    a product with fewer rows in another order: the result matches
+    convolve_im2col to within rounding_bound, not bit for bit
+
+    returns:
+        convolved, tiles, peak_bytes
+        convolved: numpy.ndarray with shape (m, ch, cw, nc)
+        tiles: number of tiles that were convolved
+        peak_bytes: largest number of bytes allocated for one tile
+    """
+    m, height, width, c = images.shape
+    kh, kw, kc, nc = kernels.shape
+    sh, sw = stride
+    ph, pw = resolve_padding(padding, height, width, kh, kw, sh, sw)
+    ch = ((height + (2 * ph) - kh) // sh) + 1
+    cw = ((width + (2 * pw) - kw) // sw) + 1
+    dtype = np.result_type(images, kernels)
+    padded_width = width + 2 * pw
+    sizes = (cw, padded_width, c, kh, kw, nc, sh, dtype.itemsize)
+
+    image_bytes = tile_bytes(1, ch, *sizes)
+    if image_bytes <= max_bytes:
+        mt = min(m, max_bytes // image_bytes)
+        rt = ch
+    else:
+        mt = 1
+        row_bytes = tile_bytes(1, 2, *sizes) - tile_bytes(1, 1, *sizes)
+        base_bytes = tile_bytes(1, 1, *sizes) - row_bytes
+        rt = max(1, (max_bytes - base_bytes) // row_bytes)
+
+    convolved = np.zeros((m, ch, cw, nc))
+    tiles = 0
+    peak_bytes = 0
+    for i0 in range(0, m, mt):
+        i1 = min(i0 + mt, m)
+        for r0 in range(0, ch, rt):
+            r1 = min(r0 + rt, ch)
+            # rows of the padded images needed by output rows r0..r1
+            top = r0 * sh - ph
+            bottom = (r1 - 1) * sh + kh - ph
+            slab = np.zeros((i1 - i0, bottom - top, padded_width, c),
+                            dtype=dtype)
+            src_top = max(top, 0)
+            src_bottom = min(bottom, height)
+            if src_bottom > src_top:
+                slab[:, src_top - top:src_bottom - top, pw:pw + width] = \
+                    images[i0:i1, src_top:src_bottom]
+            windows = window_view(slab, kh, kw, sh, sw)
+            product = np.tensordot(windows, kernels, axes=3)
+            convolved[i0:i1, r0:r1] = product
+            # release the tile before the next one is allocated
+            del slab, windows, product
+            tiles += 1
+            peak_bytes = max(peak_bytes,
+                             tile_bytes(i1 - i0, r1 - r0, *sizes))
+    return convolved, tiles, peak_bytes
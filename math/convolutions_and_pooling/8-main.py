@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import numpy as np
+convolve = __import__('5-convolve').convolve
+convolve_im2col = __import__('7-convolve_im2col').convolve_im2col
+chunked = __import__('8-convolve_chunked')
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    worst = {'im2col': 0, 'convolve': 0}
+    for _ in range(200):
+        m, c, nc = np.random.randint(1, 5, 3)
+        h, w = np.random.randint(5, 40, 2)
+        kh, kw = np.minimum(np.random.randint(1, 16, 2), (h, w))
+        images = np.random.randn(m, h, w, c)
+        kernels = np.random.randn(kh, kw, c, nc)
+        padding = ('same', 'valid', (1, 2))[np.random.randint(3)]
+        stride = tuple(np.random.randint(1, 3, 2))
+        tiled = convolve(images, kernels, padding, stride,
+                         max_bytes=int(np.random.randint(100, 20000)))
+        bound = chunked.rounding_bound(images, kernels)
+        for name, func in (('im2col', convolve_im2col),
+                           ('convolve', convolve)):
+            error = np.abs(tiled - func(images, kernels, padding, stride))
+            worst[name] = max(worst[name], error.max() / bound)
+    # tiles agree with the untiled engines to rounding, not bit for bit
+    for name, ratio in worst.items():
+        print(name, 'within bound:', ratio <= 1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+'''
+    An FFT convolution backend:
+    correlates the padded images with every kernel in the
+    frequency domain using numpy.fft.rfft2
+'''
+
+
+import numpy as np
+resolve_padding = __import__('7-convolve_im2col').resolve_padding
+
+
+def next_fast_len(n):
+    '''
+        Finds the smallest 5-smooth number (2^a * 3^b * 5^c)
+        greater than or equal to n, FFTs of these lengths are fast
+
+        n: positive integer
+
+        returns:
+            the fast length
+    '''
+    best = 2 * n
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            length = p35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def convolve_fft(images, kernels, padding='same', stride=(1, 1)):
+    """
+    Performs a convolution on images using multiple kernels
+    with products of real FFTs, O(h * w * log(h * w)) per
+    image and kernel regardless of the size of the kernel
+
+    parameters:
+        images [numpy.ndarray with shape (m, h, w, c)]:
+            contains multiple images
+        kernels [numpy.ndarray with shape (kh, kw, c, nc)]:
+            contains the kernels for the convolution
+        padding [tuple of (ph, pw) or 'same' or 'valid']:
+            same semantics as convolve
+        stride [tuple of (sh, sw)]:
+            sh: stride for the height of the image
+            sw: stride for the width of the image
+
+    like convolve this is a cross-correlation, the kernels are not
+    flipped; the transforms are padded to 5-smooth lengths at least
+    as large as the padded images so no window wraps around
+
+    returns:
+        numpy.ndarray with shape (m, ch, cw, nc) containing
+        the convolved images
+    """
+    m, height, width, c = images.shape
+    kh, kw, kc, nc = kernels.shape
+    sh, sw = stride
+    ph, pw = resolve_padding(padding, height, width, kh, kw, sh, sw)
+    if ph or pw:
+        images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
+                        'constant', constant_values=0)
+    padded_h = height + 2 * ph
+    padded_w = width + 2 * pw
+    ch = ((padded_h - kh) // sh) + 1
+    cw = ((padded_w - kw) // sw) + 1
+    shape = (next_fast_len(padded_h), next_fast_len(padded_w))
+
+    f_images = np.fft.rfft2(images, s=shape, axes=(1, 2))
+    f_kernels = np.fft.rfft2(kernels, s=shape, axes=(0, 1))
+    # correlation theorem: conj of the kernel spectrum, summed over c
+    f_product = np.einsum('mhwc,hwcn->mhwn', f_images, f_kernels.conj(),
+                          optimize=True)
+    correlated = np.fft.irfft2(f_product, s=shape, axes=(1, 2))
+    return correlated[:, :ch * sh:sh, :cw * sw:sw]
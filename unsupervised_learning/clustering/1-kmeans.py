@@ -6,9 +6,10 @@ perfoms K-means on a dataset
 """
 
 import numpy as np
+engine = __import__('12-kmeans_engine')
 
 
-def kmeans(X, k, iterations=1000):
+def kmeans(X, k, iterations=1000, init='random', block=None):
     """
     perfoms K-means on a dataset
 
@@ -18,6 +19,11 @@ def kmeans(X, k, iterations=1000):
         - d no. of dimensions for each data point
     k: positive integer - the no. of clusters
     iterations: +ve(int) - max no. of iterations perfomed
+    init: 'random' for centroids drawn uniformly within the bounds of
+    X, 'k-means++' for k-means++ seeding, or a numpy.ndarray (j, d) of
+    j <= k starting centroids, extended by k-means++ when j < k
+    block: no. of points whose distances to the centroids are computed
+    at once, or None to bound them to about 32 MiB
 
     return:
         - C: numpy.ndarray (k, d) containing the centroid
@@ -32,22 +38,24 @@ def kmeans(X, k, iterations=1000):
     if type(iterations) is not int or iterations <= 0:
         return (None, None)
     n, d = X.shape
+    if type(init) is np.ndarray:
+        if (len(init.shape) != 2 or init.shape[1] != d
+                or init.shape[0] > k):
+            return (None, None)
+    elif init not in ('random', 'k-means++'):
+        return (None, None)
     if k == 0:
         return (None, None)
-    low = np.amin(X, axis=0)
-    high = np.amax(X, axis=0)
-    C = np.random.uniform(low, high, size=(k, d))
-    for i in range(iterations):
-        clss = np.argmin(np.linalg.norm(X[:, None] - C, axis=-1), axis=-1)
-        new_C = np.copy(C)
-        for c in range(k):
-            if c not in clss:
-                new_C[c] = np.random.uniform(low, high)
-            else:
-                new_C[c] = np.mean(X[clss == c], axis=0)
-        if (new_C == C).all():
-            return (C, clss)
-        else:
-            C = new_C
-    clss = np.argmin(np.linalg.norm(X[:, None] - C, axis=-1), axis=-1)
+    X = X.astype(float, copy=False)
+    if type(init) is np.ndarray:
+        C = init.astype(float)
+        if C.shape[0] < k:
+            C = engine.kmeans_plus_plus(X, k, C=C)
+    elif init == 'k-means++':
+        C = engine.kmeans_plus_plus(X, k)
+    else:
+        low = np.amin(X, axis=0)
+        high = np.amax(X, axis=0)
+        C = np.random.uniform(low, high, size=(k, d))
+    C, clss, _ = engine.hamerly(X, C, iterations, block)
     return (C, clss)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the K-means engine against the original (n, k, d) broadcast
+implementation: iterations per second and peak memory, and how much
+Hamerly's bounds save over blocked Lloyd iterations
+"""
+
+import time
+import tracemalloc
+import numpy as np
+engine = __import__('12-kmeans_engine')
+
+
+def broadcast(X, C, iterations):
+    """ the original K-means loop, counting its iterations """
+    low = np.amin(X, axis=0)
+    high = np.amax(X, axis=0)
+    k = C.shape[0]
+    for i in range(iterations):
+        clss = np.argmin(np.linalg.norm(X[:, None] - C, axis=-1), axis=-1)
+        new_C = np.copy(C)
+        for c in range(k):
+            if c not in clss:
+                new_C[c] = np.random.uniform(low, high)
+            else:
+                new_C[c] = np.mean(X[clss == c], axis=0)
+        if (new_C == C).all():
+            return C, clss, i
+        C = new_C
+    return C, clss, iterations
+
+
+def lloyd(X, C, iterations):
+    """ blocked Lloyd iterations without bounds """
+    low = np.amin(X, axis=0)
+    high = np.amax(X, axis=0)
+    x_sq = np.einsum('ij,ij->i', X, X)
+    for i in range(iterations):
+        clss, _, _ = engine.nearest_two(X, x_sq, C)
+        new_C = engine.centroids(X, clss, C, low, high)
+        if (new_C == C).all():
+            return C, clss, i
+        C = new_C
+    return C, clss, iterations
+
+
+def measured(func, *args):
+    """ returns iterations per second and peak traced memory in MiB """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    _, _, done = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return max(done, 1) / elapsed, peak / 2 ** 20
+
+
+def blobs(n, k, d):
+    """ n points around k gaussian centers """
+    centers = np.random.uniform(-10, 10, (k, d))
+    return centers[np.random.randint(0, k, n)] + np.random.randn(n, d)
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    iterations = 20
+    print('{:>8} {:>4} {:>3} {:>21} {:>21} {:>21}'.format(
+        'n', 'k', 'd', 'broadcast it/s (MiB)', 'blocked it/s (MiB)',
+        'hamerly it/s (MiB)'))
+    for n, k, d in ((10 ** 4, 16, 2), (10 ** 5, 64, 8), (10 ** 6, 16, 2),
+                    (10 ** 6, 256, 8)):
+        X = blobs(n, k, d)
+        C = engine.kmeans_plus_plus(X, k)
+        cells = []
+        for func in (broadcast, lloyd, engine.hamerly):
+            # the (n, k, d) temporaries do not fit in memory
+            if func is broadcast and n * k * d * 8 > 2 ** 30:
+                cells.append('-')
+                continue
+            rate, peak = measured(func, X, C, iterations)
+            cells.append('{:.2f} ({:.0f})'.format(rate, peak))
+        print('{:>8} {:>4} {:>3} {:>21} {:>21} {:>21}'.format(
+            n, k, d, *cells))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""
+This module contains a memory-bounded K-means engine: blocked
+assignments with the ||x||^2 - 2x.c + ||c||^2 expansion, bincount
+centroid updates, Hamerly's triangle-inequality bounds and
+k-means++ seeding
+"""
+
+import numpy as np
+
+# number of point-centroid distances held at once by the blocked
+# assignment, 32 MiB of float64
+BLOCK_ELEMENTS = 2 ** 22
+
+
+def kmeans_plus_plus(X, k, x_sq=None, C=None):
+    """
+    k-means++ seeding: each centroid is drawn among the data points
+    with probability proportional to the squared distance to the
+    closest centroid already chosen
+
+    X: numpy.ndarray (n, d) containing the dataset
+    k: positive integer - the no. of clusters
+    x_sq: numpy.ndarray (n,) of the squared norms of X, or None
+    C: numpy.ndarray (j, d) of j < k centroids to extend, e.g. the
+    solution for j clusters, or None to start from scratch
+
+    return: numpy.ndarray (k, d) containing the initial centroids
+    """
+    n, d = X.shape
+    if x_sq is None:
+        x_sq = np.einsum('ij,ij->i', X, X)
+    if C is None:
+        C = np.empty((k, d))
+        C[0] = X[np.random.randint(n)]
+        first = 1
+    else:
+        first = C.shape[0]
+        C = np.concatenate((C, np.empty((k - first, d))))
+    closest = np.full(n, np.inf)
+    for c in range(first):
+        np.minimum(closest, np.maximum(
+            x_sq - 2 * X @ C[c] + C[c] @ C[c], 0), out=closest)
+    for c in range(first, k):
+        total = closest.sum()
+        if total > 0:
+            C[c] = X[np.random.choice(n, p=closest / total)]
+        else:
+            # fewer distinct points than clusters
+            C[c] = X[np.random.randint(n)]
+        np.minimum(closest, np.maximum(
+            x_sq - 2 * X @ C[c] + C[c] @ C[c], 0), out=closest)
+    return C
+
+
+def distances(X, Y):
+    """
+    euclidean distances between matching rows of two matrices
+
+    X, Y: numpy.ndarray (n, d)
+
+    return: numpy.ndarray (n,)
+    """
+    Z = X - Y
+    return np.sqrt(np.einsum('ij,ij->i', Z, Z))
+
+
+def nearest_two(X, x_sq, C, block=None):
+    """
+    nearest and second nearest centroid of each point, computed in row
+    blocks so that no more than block x k distances exist at once
+
+    X: numpy.ndarray (n, d) containing the dataset
+    x_sq: numpy.ndarray (n,) of the squared norms of X
+    C: numpy.ndarray (k, d) containing the centroids
+    block: no. of rows per block, or None to bound the block by
+    BLOCK_ELEMENTS
+
+    return: clss, first, second
+        - clss: numpy.ndarray (n,) index of the nearest centroid
+        - first: numpy.ndarray (n,) distance to the nearest centroid
+        - second: numpy.ndarray (n,) distance to the second nearest
+        centroid, inf when k == 1
+    """
+    n, k = X.shape[0], C.shape[0]
+    if block is None:
+        block = max(1, BLOCK_ELEMENTS // k)
+    c_sq = np.einsum('ij,ij->i', C, C)
+    clss = np.empty(n, dtype=np.intp)
+    first = np.empty(n)
+    second = np.full(n, np.inf)
+    for start in range(0, n, block):
+        rows = slice(start, start + block)
+        D = X[rows] @ C.T
+        D *= -2
+        D += c_sq
+        D += x_sq[rows, None]
+        nearest = np.argmin(D, axis=1)
+        clss[rows] = nearest
+        # the expansion only ranks the centroids: the distances that
+        # seed bounds come from exact differences, which lose nothing
+        # far from the origin
+        first[rows] = distances(X[rows], C[nearest])
+        if k > 1:
+            D[np.arange(D.shape[0]), nearest] = np.inf
+            second[rows] = distances(X[rows], C[np.argmin(D, axis=1)])
+    return clss, first, second
+
+
+def centroids(X, clss, C, low, high):
+    """
+    centroid update with one weighted bincount per dimension instead of
+    one mask per cluster; empty clusters are reinitialized uniformly
+    between low and high
+
+    X: numpy.ndarray (n, d) containing the dataset
+    clss: numpy.ndarray (n,) cluster index of each point
+    C: numpy.ndarray (k, d) containing the current centroids
+    low, high: numpy.ndarray (d,) bounds of the dataset
+
+    return: numpy.ndarray (k, d) containing the new centroids
+    """
+    k, d = C.shape
+    counts = np.bincount(clss, minlength=k)
+    new_C = np.empty((k, d))
+    for j in range(d):
+        new_C[:, j] = np.bincount(clss, weights=X[:, j], minlength=k)
+    filled = counts > 0
+    new_C[filled] /= counts[filled, None]
+    for c in np.flatnonzero(~filled):
+        new_C[c] = np.random.uniform(low, high)
+    return new_C
+
+
+def hamerly(X, C, iterations, block=None):
+    """
+    Lloyd iterations with Hamerly's bounds: each point keeps an upper
+    bound on the distance to its centroid and one lower bound on the
+    distance to every other centroid, and is only reassigned when the
+    bounds overlap. Elkan's k lower bounds per point would need an
+    (n, k) array, which is what this engine avoids
+
+    X: numpy.ndarray (n, d) containing the dataset
+    C: numpy.ndarray (k, d) containing the initial centroids
+    iterations: +ve(int) - max no. of centroid updates
+    block: no. of rows per assignment block, or None
+
+    return: C, clss, i
+        - C: numpy.ndarray (k, d) containing the centroid
+        for each cluster
+        - clss: numpy.ndarray (n,) containing the index of the
+        cluster in C that each data point belongs to
+        - i: no. of centroid updates performed
+    """
+    k = C.shape[0]
+    # centered, so that the expansion ranks the centroids reliably
+    center = np.mean(X, axis=0)
+    X = X - center
+    C = C - center
+    low = np.amin(X, axis=0)
+    high = np.amax(X, axis=0)
+    x_sq = np.einsum('ij,ij->i', X, X)
+    clss, upper, lower = nearest_two(X, x_sq, C, block)
+    for i in range(iterations):
+        new_C = centroids(X, clss, C, low, high)
+        if (new_C == C).all():
+            return C + center, clss, i
+        shift = np.sqrt(np.sum((new_C - C) ** 2, axis=1))
+        C = new_C
+        upper += shift[clss]
+        if k > 1:
+            # the other centroids moved by at most the largest shift,
+            # or the second largest for the cluster that moved most
+            order = np.argsort(shift)
+            most, runner_up = order[-1], order[-2]
+            lower -= np.where(clss == most, shift[runner_up], shift[most])
+            # half the distance from each centroid to its nearest other
+            _, _, gap = nearest_two(C, np.einsum('ij,ij->i', C, C), C)
+            bound = np.maximum(0.5 * gap[clss], lower)
+        else:
+            bound = lower
+        check = np.flatnonzero(upper > bound)
+        if check.size == 0:
+            continue
+        # tighten the upper bound before a full search
+        upper[check] = distances(X[check], C[clss[check]])
+        check = check[upper[check] > bound[check]]
+        if check.size:
+            clss[check], upper[check], lower[check] = nearest_two(
+                X[check], x_sq[check], C, block)
+    return C + center, clss, iterations
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""
+Compares mini-batch K-means over a numpy.memmap with full-batch kmeans:
+time, inertia relative to full-batch and peak traced memory
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+kmeans = __import__('1-kmeans').kmeans
+minibatch = __import__('13-minibatch_kmeans')
+
+
+def measured(func, *args, **kwargs):
+    """ returns the result, wall-clock time and peak traced MiB """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    n, k, d = 2 * 10 ** 6, 64, 8
+    path = os.path.join(tempfile.mkdtemp(), 'X.dat')
+    X = np.memmap(path, dtype=np.float64, mode='w+', shape=(n, d))
+    centers = np.random.uniform(-10, 10, (k, d))
+    for start in range(0, n, 10 ** 5):
+        rows = min(10 ** 5, n - start)
+        X[start:start + rows] = (centers[np.random.randint(0, k, rows)]
+                                 + np.random.randn(rows, d))
+    X.flush()
+    X = np.memmap(path, dtype=np.float64, mode='r', shape=(n, d))
+    print('n={} k={} d={}, {:.0f} MiB on disk'.format(
+        n, k, d, n * d * 8 / 2 ** 20))
+    print('{:>24} {:>9} {:>9} {:>11}'.format(
+        'method', 'time (s)', 'inertia', 'peak (MiB)'))
+
+    def full():
+        """ full-batch kmeans on the dataset loaded in memory """
+        return kmeans(np.array(X), k, 100, init='k-means++')
+
+    (C, _), elapsed, peak = measured(full)
+    _, best = minibatch.predict(X, C)
+    print('{:>24} {:>9.2f} {:>9.4f} {:>11.0f}'.format(
+        'kmeans (100 it)', elapsed, 1.0, peak))
+    for batch, epochs in ((1024, 1), (4096, 1), (16384, 1), (4096, 3)):
+        (C, _), elapsed, peak = measured(
+            minibatch.minibatch_kmeans, X, k, batch, epochs)
+        _, inertia = minibatch.predict(X, C)
+        print('{:>24} {:>9.2f} {:>9.4f} {:>11.0f}'.format(
+            'batch={} epochs={}'.format(batch, epochs), elapsed,
+            inertia / best, peak))
+    os.remove(path)
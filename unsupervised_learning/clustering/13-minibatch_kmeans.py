@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+This module contains a mini-batch K-means for datasets that do not fit
+in memory: the data is read in chunks from a numpy.memmap, an array or
+any source of chunks, and memory grows with the batch size, not n
+"""
+
+import numpy as np
+engine = __import__('12-kmeans_engine')
+
+
+def chunks(X, batch, shuffle=False):
+    """
+    reads a dataset in chunks
+
+    X: numpy.ndarray or numpy.memmap (n, d), or a callable returning a
+    fresh iterable of numpy.ndarray chunks (m, d) on every call
+    batch: +ve(int) - no. of rows per chunk of an array
+    shuffle: whether to visit the chunks of an array in random order;
+    the rows of a chunk stay contiguous so a memmap is read sequentially
+
+    return: generator of float numpy.ndarray chunks (m, d)
+    """
+    if callable(X):
+        for chunk in X():
+            yield np.asarray(chunk, dtype=float)
+        return
+    starts = np.arange(0, X.shape[0], batch)
+    if shuffle:
+        np.random.shuffle(starts)
+    for start in starts:
+        yield np.asarray(X[start:start + batch], dtype=float)
+
+
+def initialize(chunk, k, init='k-means++'):
+    """
+    initial centroids and counts from the first chunk
+
+    chunk: numpy.ndarray (m, d) with m >= k for k-means++
+    k: positive integer - the no. of clusters
+    init: 'random' for centroids drawn uniformly within the bounds of
+    the chunk, or 'k-means++'
+
+    return: C, counts
+        - C: numpy.ndarray (k, d) containing the centroids
+        - counts: numpy.ndarray (k,) no. of points seen per centroid,
+        all zero
+    """
+    if init == 'k-means++':
+        C = engine.kmeans_plus_plus(chunk, k)
+    else:
+        C = np.random.uniform(np.amin(chunk, axis=0),
+                              np.amax(chunk, axis=0),
+                              size=(k, chunk.shape[1]))
+    return C, np.zeros(k)
+
+
+def partial_fit(C, counts, chunk):
+    """
+    online centroid update with one chunk: every centroid moves to the
+    running mean of the points assigned to it so far, its learning
+    rate being the inverse of its count
+
+    C: numpy.ndarray (k, d) containing the centroids, updated in place
+    counts: numpy.ndarray (k,) no. of points seen per centroid, updated
+    in place
+    chunk: numpy.ndarray (m, d) of new points
+
+    return: the largest distance moved by a centroid
+    """
+    k, d = C.shape
+    x_sq = np.einsum('ij,ij->i', chunk, chunk)
+    clss, _, _ = engine.nearest_two(chunk, x_sq, C)
+    seen = np.bincount(clss, minlength=k)
+    sums = np.empty((k, d))
+    for j in range(d):
+        sums[:, j] = np.bincount(clss, weights=chunk[:, j], minlength=k)
+    hit = seen > 0
+    counts += seen
+    step = (sums[hit] - seen[hit, None] * C[hit]) / counts[hit, None]
+    C[hit] += step
+    if not hit.any():
+        return 0.0
+    return float(np.sqrt(np.sum(step ** 2, axis=1)).max())
+
+
+def predict(X, C, batch=65536, out=None):
+    """
+    assigns every point to its nearest centroid in one streamed pass
+
+    X: numpy.ndarray or numpy.memmap (n, d), or a callable returning a
+    fresh iterable of chunks
+    C: numpy.ndarray (k, d) containing the centroids
+    batch: +ve(int) - no. of rows per chunk of an array
+    out: numpy.ndarray or numpy.memmap of ints (n,) receiving the
+    labels, or None to allocate it
+
+    return: clss, inertia
+        - clss: numpy.ndarray (n,) containing the index of the
+        cluster in C that each data point belongs to
+        - inertia: sum of the squared distances of the points to their
+        centroids
+    """
+    labels = []
+    inertia = 0.0
+    start = 0
+    for chunk in chunks(X, batch):
+        x_sq = np.einsum('ij,ij->i', chunk, chunk)
+        clss, first, _ = engine.nearest_two(chunk, x_sq, C)
+        inertia += float(np.sum(first ** 2))
+        if out is None:
+            labels.append(clss)
+        else:
+            out[start:start + clss.shape[0]] = clss
+        start += clss.shape[0]
+    if out is None:
+        out = np.concatenate(labels) if labels else np.zeros(0, dtype=int)
+    return out, inertia
+
+
+def minibatch_kmeans(X, k, batch=4096, epochs=1, init='k-means++',
+                     tol=0.0, out=None):
+    """
+    perfoms mini-batch K-means on a dataset read in chunks
+
+    X: numpy.ndarray or numpy.memmap (n, d), or a callable returning a
+    fresh iterable of numpy.ndarray chunks (m, d) on every call
+    k: positive integer - the no. of clusters
+    batch: +ve(int) - no. of rows per mini-batch of an array
+    epochs: +ve(int) - max no. of passes over the dataset
+    init: 'random' or 'k-means++', computed on the first mini-batch
+    tol: stops once no centroid moved more than tol during a whole
+    epoch
+    out: numpy.ndarray or numpy.memmap of ints (n,) receiving the
+    labels, or None
+
+    return:
+        - C: numpy.ndarray (k, d) containing the centroid
+        for each cluster
+        - clss: numpy.ndarray (n,) containing the index of the
+        cluster in C that each data point belongs to
+        or None, None on failure
+    """
+    if not callable(X) and (not isinstance(X, np.ndarray)
+                            or len(X.shape) != 2):
+        return None, None
+    if not isinstance(k, int) or k <= 0:
+        return None, None
+    if not isinstance(batch, int) or batch <= 0:
+        return None, None
+    if not isinstance(epochs, int) or epochs <= 0:
+        return None, None
+    if init not in ('random', 'k-means++'):
+        return None, None
+    C = counts = None
+    for _ in range(epochs):
+        moved = 0.0
+        for chunk in chunks(X, batch, shuffle=True):
+            if C is None:
+                C, counts = initialize(chunk, k, init)
+            moved = max(moved, partial_fit(C, counts, chunk))
+        if C is None:
+            return None, None
+        if moved <= tol:
+            break
+    clss, _ = predict(X, C, batch, out)
+    return C, clss
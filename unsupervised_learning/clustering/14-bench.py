@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+"""
+Times BIC and optimum_k sweeps: cold against warm starts, early
+abandonment, and process pools of up to os.cpu_count() workers
+"""
+
+import os
+import time
+import numpy as np
+optimum_k = __import__('3-optimum').optimum_k
+BIC = __import__('9-BIC').BIC
+
+
+def timed(func, *args, **kwargs):
+    """ returns the result and wall-clock time of one call """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    np.random.seed(11)
+    centers = np.random.uniform(0, 60, (5, 2))
+    X = centers[np.random.randint(0, 5, 20000)] + 3 * np.random.randn(
+        20000, 2)
+    cpus = os.cpu_count()
+    workers = sorted({2, cpus} - {1})
+    print('n={} cpus={}'.format(X.shape[0], cpus))
+    print('{:>34} {:>9} {:>6} {:>7}'.format(
+        'BIC kmax=12', 'time (s)', 'best', 'fitted'))
+    cases = [('cold', {}), ('warm', {'warm': True}),
+             ('patience=3', {'patience': 3}),
+             ('warm patience=3', {'warm': True, 'patience': 3}),
+             ('restarts=2', {'restarts': 2})]
+    cases += [('workers={}'.format(w), {'workers': w})
+              for w in workers]
+    cases += [('workers={} warm patience=3'.format(w),
+               {'workers': w, 'warm': True, 'patience': 3})
+              for w in workers]
+    for name, kwargs in cases:
+        (best, _, likelihoods, _), elapsed = timed(
+            BIC, X, 1, 12, 200, **kwargs)
+        print('{:>34} {:>9.2f} {:>6} {:>7}'.format(
+            name, elapsed, best, likelihoods.shape[0]))
+
+    print()
+    print('{:>34} {:>9}'.format('optimum_k kmax=30', 'time (s)'))
+    for name, kwargs in [('cold', {}), ('warm', {'warm': True})] + [
+            ('workers={}'.format(w), {'workers': w})
+            for w in workers]:
+        _, elapsed = timed(optimum_k, X, 1, 30, 1000, **kwargs)
+        print('{:>34} {:>9.2f}'.format(name, elapsed))
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+"""
+This module contains the model sweep behind optimum_k and BIC: one fit
+per number of clusters, optionally warm-started from the previous
+solution, restarted several times, spread over a process pool that
+reads the dataset from shared memory, and abandoned once the score has
+bottomed out
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import numpy as np
+kmeans = __import__('1-kmeans').kmeans
+variance = __import__('2-variance').variance
+expectation_maximization = __import__('8-EM').expectation_maximization
+streaming_em = __import__('17-streaming_em').streaming_em
+engine = __import__('12-kmeans_engine')
+
+# dataset of a worker process, attached once from shared memory
+SHARED = {}
+
+
+def share(X):
+    """
+    copies a dataset into a shared memory block
+
+    X: numpy.ndarray (n, d) containing the dataset
+
+    return: shm, spec
+        - shm: the multiprocessing.shared_memory.SharedMemory block, to
+        be closed and unlinked by the caller
+        - spec: (name, shape, dtype) to attach to it in a worker
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+    np.ndarray(X.shape, X.dtype, buffer=shm.buf)[...] = X
+    return shm, (shm.name, X.shape, X.dtype.str)
+
+
+def attach(name, shape, dtype):
+    """
+    process pool initializer: maps the shared dataset without copying
+    or pickling it
+
+    name, shape, dtype: the spec returned by share
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    SHARED['shm'] = shm
+    SHARED['X'] = np.ndarray(shape, dtype, buffer=shm.buf)
+
+
+def grow_gmm(X, start, k, covariance_type='full'):
+    """
+    starting GMM parameters for k clusters from a solution with fewer:
+    the new means are drawn by k-means++ against the old means, with
+    the average covariance and an equal share of the priors
+
+    X: numpy.ndarray (n, d) containing the dataset
+    start: tuple (pi, m, S) for j < k clusters
+    k: positive integer - the number of clusters
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'; a tied
+    covariance is kept as it is
+
+    return: pi, m, S for k clusters
+    """
+    pi, m, S = start
+    j = pi.shape[0]
+    m = engine.kmeans_plus_plus(X, k, C=m)
+    if covariance_type != 'tied':
+        S = np.concatenate((S, np.repeat(S.mean(axis=0)[None], k - j,
+                                         axis=0)))
+    pi = np.concatenate((pi * j / k, np.full(k - j, 1 / k)))
+    return pi, m, S
+
+
+def fit_kmeans(X, k, start, restarts, iterations):
+    """
+    best of several K-means fits by intra-cluster variance
+
+    X: numpy.ndarray (n, d) containing the dataset
+    k: positive integer - the no. of clusters
+    start: numpy.ndarray (j, d) centroids to warm-start the first fit
+    from, or None
+    restarts: +ve(int) - no. of fits
+    iterations: +ve(int) - max no. of iterations per fit
+
+    return: (C, clss), var
+    """
+    best = None
+    for r in range(restarts):
+        init = start if r == 0 and start is not None else 'random'
+        C, clss = kmeans(X, k, iterations, init=init)
+        var = variance(X, C, clss)
+        if best is None or var < best[1]:
+            best = (C, clss), var
+    return best
+
+
+def fit_gmm(X, k, start, restarts, iterations, tol, verbose,
+            covariance_type='full', batch=None):
+    """
+    best of several GMM fits by log likelihood
+
+    X: numpy.ndarray (n, d) containing the dataset
+    k: positive integer - the no. of clusters
+    start: tuple (pi, m, S) for fewer clusters to warm-start the first
+    fit from, or None
+    restarts: +ve(int) - no. of fits
+    iterations, tol, verbose, covariance_type: passed to
+    expectation_maximization, or to streaming_em
+    batch: no. of rows per chunk to fit with streaming_em instead, which
+    never holds the (k, n) responsibilities; warm starts then grow from
+    the first chunk only
+
+    return: (pi, m, S), ll, or None if a fit failed
+    """
+    best = None
+    for r in range(restarts):
+        init = None
+        if r == 0 and start is not None:
+            init = grow_gmm(X if batch is None else X[:batch], start, k,
+                            covariance_type)
+        if batch is None:
+            pi, m, S, _, ll = expectation_maximization(
+                X, k, iterations, tol, verbose, init, covariance_type)
+        else:
+            pi, m, S, ll = streaming_em(X, k, iterations, tol, batch,
+                                        covariance_type, init=init,
+                                        verbose=verbose)
+        if pi is None:
+            return None
+        if best is None or ll > best[1]:
+            best = (pi, m, S), ll
+    return best
+
+
+# fit of each kind of model, and the part of its result that warm
+# starts the next number of clusters
+FITS = {
+    'kmeans': (fit_kmeans, lambda result: result[0][0]),
+    'gmm': (fit_gmm, lambda result: result[0]),
+}
+
+
+def run(kind, ks, seed, warm, options, X=None):
+    """
+    fits consecutive numbers of clusters in one process
+
+    kind: 'kmeans' or 'gmm'
+    ks: list of the numbers of clusters, increasing
+    seed: seed of numpy.random for this run, or None to keep the
+    current state
+    warm: whether each fit starts from the previous one
+    options: dict of keyword arguments of the fit
+    X: numpy.ndarray (n, d) containing the dataset, or None for the
+    shared dataset of a worker
+
+    return: list of the fit results, one per k
+    """
+    if X is None:
+        X = SHARED['X']
+    if seed is not None:
+        np.random.seed(seed)
+    fit, handover = FITS[kind]
+    results = []
+    start = None
+    for k in ks:
+        result = fit(X, k, start, **options)
+        results.append(result)
+        start = handover(result) if warm and result is not None else None
+    return results
+
+
+def bottomed_out(scores, patience):
+    """
+    checks whether a score to minimize has clearly bottomed out
+
+    scores: list of the scores of consecutive numbers of clusters
+    patience: no. of consecutive numbers of clusters without
+    improvement, or None to never stop
+
+    return: True if the best score is followed by patience worse ones
+    """
+    if patience is None or not scores:
+        return False
+    return len(scores) - 1 - int(np.argmin(scores)) >= patience
+
+
+def leading(done, count):
+    """
+    results of the leading segments that are all done
+
+    done: dict of segment index to its list of fit results
+    count: no. of segments
+
+    return: list of the fit results, in order of k
+    """
+    results = []
+    for i in range(count):
+        if i not in done:
+            break
+        results.extend(done[i])
+    return results
+
+
+def sweep(kind, X, ks, options, score, workers=None, warm=False,
+          patience=None):
+    """
+    fits every number of clusters in ks, in order or in a process pool
+
+    kind: 'kmeans' or 'gmm'
+    X: numpy.ndarray (n, d) containing the dataset
+    ks: list of the numbers of clusters, increasing
+    options: dict of keyword arguments of the fit
+    score: function of a fit result to minimize, used to stop early
+    workers: no. of worker processes, or None to fit in this process
+    warm: whether each k starts from the solution for k - 1; with
+    workers the ks are split into contiguous segments, each started
+    cold
+    patience: stop once the best score is followed by patience worse
+    ones, or None to fit every k
+
+    return: list of the fit results for the leading ks that were fitted
+    """
+    if workers is None or workers <= 1:
+        fit, handover = FITS[kind]
+        results = []
+        start = None
+        for k in ks:
+            result = fit(X, k, start, **options)
+            results.append(result)
+            if result is None or bottomed_out(
+                    [score(r) for r in results], patience):
+                break
+            start = handover(result) if warm else None
+        return results
+    size = 1
+    if warm:
+        size = -(-len(ks) // workers)
+        if patience is not None:
+            size = min(size, patience)
+    segments = [ks[i:i + size] for i in range(0, len(ks), size)]
+    seeds = np.random.randint(0, 2 ** 31 - 1, len(segments))
+    shm, spec = share(X)
+    done = {}
+    try:
+        with ProcessPoolExecutor(workers, initializer=attach,
+                                 initargs=spec) as pool:
+            # at most one segment per worker in flight, so that nothing
+            # beyond the bottom is started once it has been found
+            running = {}
+            queued = 0
+            stop = False
+            while running or (not stop and queued < len(segments)):
+                while not stop and queued < len(segments) \
+                        and len(running) < workers:
+                    future = pool.submit(run, kind, segments[queued],
+                                         seeds[queued], warm, options)
+                    running[future] = queued
+                    queued += 1
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done[running.pop(future)] = future.result()
+                results = leading(done, len(segments))
+                stop = any(r is None for r in results) or bottomed_out(
+                    [score(r) for r in results], patience)
+    finally:
+        shm.close()
+        shm.unlink()
+    return leading(done, len(segments))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""
+Times the Cholesky log-domain E-step against the previous one pdf call
+per cluster with det, inv and a 1e-300 floor, for each covariance type,
+and shows the log likelihood the floor loses on far away points
+"""
+
+import time
+import numpy as np
+expectation = __import__('6-expectation').expectation
+
+
+def floored(X, pi, m, S):
+    """ the previous E-step, densities floored at 1e-300 """
+    k, d = m.shape
+    g = np.zeros((k, X.shape[0]))
+    for i in range(k):
+        X_m = X - m[i]
+        maha = np.sum(np.dot(X_m, np.linalg.inv(S[i])) * X_m, axis=1)
+        fac = 1 / np.sqrt(((2 * np.pi) ** d) * np.linalg.det(S[i]))
+        g[i] = pi[i] * np.maximum(fac * np.exp(-0.5 * maha), 1e-300)
+    total = np.sum(g, axis=0)
+    return g / total, np.sum(np.log(total))
+
+
+def timed(func, *args, **kwargs):
+    """ returns the result and wall-clock time of one call """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    print('{:>6} {:>4} {:>4} {:>10} {:>10} {:>10} {:>10} {:>10}'.format(
+        'n', 'd', 'k', 'floored', 'full', 'tied', 'diag', 'spherical'))
+    for n, d, k in ((10 ** 4, 2, 4), (10 ** 5, 16, 16), (10 ** 5, 64, 32)):
+        X = np.random.randn(n, d)
+        pi = np.full(k, 1 / k)
+        m = np.random.randn(k, d)
+        A = np.random.randn(k, d, d) / np.sqrt(d)
+        covariances = {
+            'full': A @ A.transpose(0, 2, 1) + np.identity(d),
+            'tied': A[0] @ A[0].T + np.identity(d),
+            'diag': np.random.rand(k, d) + 0.5,
+            'spherical': np.random.rand(k) + 0.5,
+        }
+        _, t_floor = timed(floored, X, pi, m, covariances['full'])
+        times = ['{:.3f}'.format(timed(expectation, X, pi, m, S, name)[1])
+                 for name, S in covariances.items()]
+        print('{:>6} {:>4} {:>4} {:>10.3f} {:>10} {:>10} {:>10} {:>10}'
+              .format(n, d, k, t_floor, *times))
+
+    print()
+    X = np.random.randn(1000, 2) * 50
+    m = np.random.randn(3, 2)
+    S = np.full((3, 2, 2), np.identity(2))
+    pi = np.full(3, 1 / 3)
+    print('log likelihood of points far from every cluster: floored {:.1f},'
+          ' log-domain {:.1f}'.format(floored(X, pi, m, S)[1],
+                                      expectation(X, pi, m, S)[1]))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""
+This module contains the log densities of k Gaussian distributions at
+once, with each covariance Cholesky-factored a single time, for the
+full, tied, diagonal and spherical covariance types of a GMM
+"""
+
+import numpy as np
+from scipy.linalg import solve_triangular
+
+# shape of the covariances S of k clusters in d dimensions
+COVARIANCE_TYPES = {
+    'full': lambda k, d: (k, d, d),
+    'tied': lambda k, d: (d, d),
+    'diag': lambda k, d: (k, d),
+    'spherical': lambda k, d: (k,),
+}
+
+# number of values of the (k, block, d) whitened points held at once
+BLOCK_ELEMENTS = 2 ** 22
+
+
+def identity(k, d, covariance_type='full'):
+    """
+    identity covariances of k clusters
+
+    k: positive integer - the number of clusters
+    d: no. of dimensions
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+
+    return: numpy.ndarray of the shape of covariance_type
+    """
+    if covariance_type == 'full':
+        return np.full((k, d, d), np.identity(d))
+    if covariance_type == 'tied':
+        return np.identity(d)
+    return np.ones(COVARIANCE_TYPES[covariance_type](k, d))
+
+
+def factor(S, covariance_type='full'):
+    """
+    Cholesky factors and log determinants of covariances
+
+    S: covariances of the shape of covariance_type
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+
+    return: L, log_det, or None, None if a covariance is not positive
+    definite
+        - L: lower triangular numpy.ndarray (k, d, d) or (d, d) with
+        L L^T = S for 'full' and 'tied', the variances S otherwise
+        - log_det: numpy.ndarray (k,), or a float for 'tied', of the
+        log determinants of the covariances, without d for 'spherical'
+    """
+    if covariance_type in ('full', 'tied'):
+        try:
+            L = np.linalg.cholesky(S)
+        except np.linalg.LinAlgError:
+            return None, None
+        diagonal = np.diagonal(L, axis1=-2, axis2=-1)
+        return L, 2 * np.sum(np.log(diagonal), axis=-1)
+    if np.any(S <= 0):
+        return None, None
+    return S, np.log(S) if S.ndim == 1 else np.sum(np.log(S), axis=-1)
+
+
+def mahalanobis(X, m, L, covariance_type='full', block=None, out=None):
+    """
+    squared Mahalanobis distances of every point to every mean, from the
+    exact differences x - m of each cluster whitened in row blocks, so
+    that nothing cancels however far the points are from the origin
+
+    X: numpy.ndarray (n, d) containing the data points
+    m: numpy.ndarray (k, d) means of the distributions
+    L: factors of the covariances as returned by factor
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    block: no. of points whitened at once, or None to bound the
+    k x block x d differences by BLOCK_ELEMENTS
+    out: numpy.ndarray (k, n) receiving the distances, or None
+
+    return: numpy.ndarray (k, n) in the dtype of X, or out
+    """
+    n, d = X.shape
+    k = m.shape[0]
+    dtype = X.dtype if X.dtype in (np.float32, np.float64) else np.float64
+    if block is None:
+        block = max(1, BLOCK_ELEMENTS // (k * d))
+    if covariance_type in ('full', 'tied'):
+        # inverse factors in float64, the products in the dtype of X
+        L_inv = solve_triangular(L, np.broadcast_to(np.identity(d), L.shape),
+                                 lower=True)
+        W = np.swapaxes(L_inv, -1, -2).astype(dtype)
+    else:
+        scale = np.reshape(1 / np.sqrt(L), (k, 1, -1)).astype(dtype)
+    m = m.astype(dtype)[:, np.newaxis]
+    maha = np.empty((k, n), dtype=dtype) if out is None else out
+    for start in range(0, n, block):
+        rows = slice(start, start + block)
+        Z = X[rows] - m
+        if covariance_type in ('full', 'tied'):
+            Z = np.matmul(Z, W)
+        else:
+            Z *= scale
+        maha[:, rows] = np.einsum('kbd,kbd->kb', Z, Z)
+    return maha
+
+
+def log_gaussian(X, m, S, covariance_type='full', block=None):
+    """
+    log densities of every point under every Gaussian distribution
+
+    X: numpy.ndarray (n, d) containing the data points
+    m: numpy.ndarray (k, d) means of the distributions
+    S: covariances of the shape of covariance_type
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    block: no. of points whitened at once, or None to bound the
+    k x block x d whitened points by BLOCK_ELEMENTS
+
+    return: numpy.ndarray (k, n) of log densities, or None if a
+    covariance is not positive definite
+    """
+    d = X.shape[1]
+    L, log_det = factor(S, covariance_type)
+    if L is None:
+        return None
+    if covariance_type == 'spherical':
+        log_det = d * log_det
+    maha = mahalanobis(X, m, L, covariance_type, block)
+    log_det = np.reshape(log_det, (-1, 1))
+    return -0.5 * (d * np.log(2 * np.pi) + log_det + maha)
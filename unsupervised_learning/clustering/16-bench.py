@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Times the fused EM engine against the previous EM loop, one pdf call
+per cluster in the E-step and one covariance per cluster in the
+M-step, at n=1e6, d=16, k=32
+"""
+
+import time
+import numpy as np
+fused_em = __import__('16-em_engine').fused_em
+
+
+def previous_em(X, pi, m, S, iterations):
+    """ the previous EM iterations, without a stopping rule """
+    n, d = X.shape
+    k = pi.shape[0]
+    for _ in range(iterations):
+        g = np.zeros((k, n))
+        for i in range(k):
+            X_m = X - m[i]
+            maha = np.sum(np.dot(X_m, np.linalg.inv(S[i])) * X_m, axis=1)
+            fac = 1 / np.sqrt(((2 * np.pi) ** d) * np.linalg.det(S[i]))
+            g[i] = pi[i] * np.maximum(fac * np.exp(-0.5 * maha), 1e-300)
+        g = g / np.sum(g, axis=0)
+        pi = np.sum(g, axis=1) / n
+        m = np.dot(g, X) / np.sum(g, axis=1)[:, np.newaxis]
+        S = np.zeros((k, d, d))
+        for i in range(k):
+            y = X - m[i]
+            S[i] = np.dot(g[i] * y.T, y) / np.sum(g[i])
+    return pi, m, S
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    n, d, k, iterations = 10 ** 6, 16, 32, 3
+    centers = np.random.uniform(-5, 5, (k, d))
+    X = centers[np.random.randint(0, k, n)] + np.random.randn(n, d)
+    pi = np.full(k, 1 / k)
+    m = X[np.random.choice(n, k, replace=False)]
+    S = np.full((k, d, d), np.identity(d))
+    print('n={} d={} k={}, {} iterations'.format(n, d, k, iterations))
+
+    start = time.perf_counter()
+    previous_em(X, pi, m, S, iterations)
+    t_previous = (time.perf_counter() - start) / iterations
+    print('{:>22} {:>12} {:>9} {:>11} {:>11} {:>10}'.format(
+        '', 's/iteration', 'speedup', 'E-step (s)', 'M-step (s)',
+        'setup (s)'))
+    print('{:>22} {:>12.3f}'.format('previous', t_previous))
+    for name, kind, dtype in (('fused full', 'full', None),
+                              ('fused full float32', 'full', np.float32),
+                              ('fused diag', 'diag', None)):
+        start_S = S if kind == 'full' else np.ones((k, d))
+        start = time.perf_counter()
+        *_, history = fused_em(X, pi, m, start_S, iterations, 0.0, kind,
+                               1e-6, dtype)
+        elapsed = time.perf_counter() - start
+        # the data is centered and cast once, then every iteration is
+        # one M-step and one E-step
+        setup = (elapsed - np.sum(history['e_step'])
+                 - np.sum(history['m_step']))
+        e_step = np.mean(history['e_step'])
+        m_step = np.mean(history['m_step'])
+        print('{:>22} {:>12.3f} {:>8.1f}x {:>11.3f} {:>11.3f} {:>10.3f}'
+              .format(name, e_step + m_step,
+                      t_previous / (e_step + m_step), e_step, m_step,
+                      setup))
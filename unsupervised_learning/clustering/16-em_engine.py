@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+"""
+This module contains a fused EM engine for GMMs: sufficient statistics
+accumulated in float64 around each cluster's own mean, in row blocks,
+and an E-step from exact whitened differences into buffers allocated
+before the first iteration
+"""
+
+import time
+import numpy as np
+gaussian = __import__('15-log_gaussian')
+
+
+def moments(X, g, covariance_type='full', block=None):
+    """
+    sufficient statistics of the points weighted by the posterior
+    probabilities, in two passes over row blocks: the weights and the
+    means first, then the scatter around each cluster's own mean, so
+    that nothing cancels however far the clusters are from the origin
+    or from each other
+
+    X: numpy.ndarray (n, d) containing the dataset
+    g: numpy.ndarray (k, n) containing the posterior probabilities
+    covariance_type: 'full' or 'tied' for the scatter matrices, 'diag'
+    or 'spherical' for their diagonals only
+    block: no. of points per block, or None to bound the k x block x d
+    differences by BLOCK_ELEMENTS
+
+    return: N, m, M, in float64
+        - N: numpy.ndarray (k,) of the weights of the clusters
+        - m: numpy.ndarray (k, d) of their means
+        - M: numpy.ndarray (k, d, d), or (k, d) for 'diag' and
+        'spherical', of the weighted sums of (x - m)(x - m)^T
+    """
+    n, d = X.shape
+    k = g.shape[0]
+    if block is None:
+        block = max(1, gaussian.BLOCK_ELEMENTS // (k * d))
+    full = covariance_type in ('full', 'tied')
+    N = np.zeros(k)
+    m = np.zeros((k, d))
+    for start in range(0, n, block):
+        g_block = g[:, start:start + block].astype(np.float64)
+        N += np.sum(g_block, axis=1)
+        m += g_block @ X[start:start + block].astype(np.float64)
+    m /= np.maximum(N, np.finfo(np.float64).tiny)[:, np.newaxis]
+    M = np.zeros((k, d, d) if full else (k, d))
+    for start in range(0, n, block):
+        g_block = g[:, start:start + block].astype(np.float64)
+        Y = X[start:start + block].astype(np.float64) - m[:, np.newaxis]
+        if full:
+            M += np.matmul(np.swapaxes(g_block[..., np.newaxis] * Y, 1, 2),
+                           Y)
+        else:
+            Y *= Y
+            M += np.matmul(g_block[:, np.newaxis], Y)[:, 0]
+    return N, m, M
+
+
+def merge(first, second):
+    """
+    sufficient statistics of two sets of points from those of each set,
+    by the parallel update of Chan et al.
+
+    first, second: tuples N, m, M as returned by moments
+
+    return: N, m, M of the union
+    """
+    N_1, m_1, M_1 = first
+    N_2, m_2, M_2 = second
+    N = N_1 + N_2
+    share = N_2 / np.maximum(N, np.finfo(np.float64).tiny)
+    delta = m_2 - m_1
+    m = m_1 + delta * share[:, np.newaxis]
+    scale = (N_1 * share)[:, np.newaxis]
+    if M_1.ndim == 3:
+        M = M_1 + M_2 + (delta[:, :, np.newaxis] * delta[:, np.newaxis]
+                         * scale[:, :, np.newaxis])
+    else:
+        M = M_1 + M_2 + delta * delta * scale
+    return N, m, M
+
+
+def scaled(statistics, factor):
+    """
+    sufficient statistics with every point weighted by factor, for
+    running averages of them
+
+    statistics: tuple N, m, M as returned by moments or merge
+    factor: non-negative float
+
+    return: N, m, M, the means unchanged
+    """
+    N, m, M = statistics
+    return N * factor, m, M * factor
+
+
+def parameters(statistics, covariance_type='full', reg=0.0):
+    """
+    GMM parameters from sufficient statistics
+
+    statistics: tuple N, m, M as returned by moments or merge, summed
+    over any number of points, or averaged
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    reg: non-negative float added to the variances, which keeps the
+    covariances positive definite when a cluster collapses
+
+    return: pi, m, S, in float64
+        - pi: numpy.ndarray (k,) containing the priors for each cluster
+        - m: numpy.ndarray (k, d) containing the means
+        - S: numpy.ndarray of the covariances, (k, d, d) for 'full',
+        (d, d) for 'tied', (k, d) for 'diag' and (k,) for 'spherical'
+    """
+    N, m, M = statistics
+    d = m.shape[1]
+    pi = N / np.sum(N)
+    if covariance_type == 'tied':
+        S = np.sum(M, axis=0) / np.sum(N)
+    else:
+        counts = np.maximum(N, np.finfo(np.float64).tiny)
+        S = M / np.reshape(counts, (-1,) + (1,) * (M.ndim - 1))
+    if covariance_type in ('diag', 'spherical'):
+        S = S + reg
+        if covariance_type == 'spherical':
+            S = np.mean(S, axis=1)
+        return pi, m.copy(), S
+    S[..., np.arange(d), np.arange(d)] += reg
+    return pi, m.copy(), S
+
+
+def maximization(X, g, covariance_type='full', reg=0.0, block=None):
+    """
+    M-step: the parameters from the sufficient statistics of the points
+
+    X: numpy.ndarray (n, d) containing the dataset
+    g: numpy.ndarray (k, n) containing the posterior probabilities
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    reg: non-negative float added to the variances
+    block: no. of points per block, as for moments
+
+    return: pi, m, S, in float64, as returned by parameters
+    """
+    return parameters(moments(X, g, covariance_type, block),
+                      covariance_type, reg)
+
+
+def expectation(X, pi, m, S, covariance_type='full', out=None,
+                block=None):
+    """
+    E-step: posterior probabilities by a log-sum-exp over the clusters
+    of the exact log densities
+
+    X: numpy.ndarray (n, d) containing the dataset
+    pi, m, S: parameters of the GMM, S in the shape of covariance_type
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    out: numpy.ndarray (k, n) receiving the posterior probabilities, or
+    None for a new one in the dtype of X
+    block: no. of points whitened at once, as for gaussian.mahalanobis
+
+    return: g, l or None, None if a covariance is not positive definite
+        - g: numpy.ndarray (k, n) containing the posterior probabilities
+        - l: log likelihood of the points, a float
+    """
+    k, d = m.shape
+    L, log_det = gaussian.factor(S, covariance_type)
+    if L is None:
+        return None, None
+    if covariance_type == 'spherical':
+        log_det = d * log_det
+    R = gaussian.mahalanobis(X, m, L, covariance_type, block, out)
+    with np.errstate(divide='ignore'):
+        c = np.log(pi) - 0.5 * (d * np.log(2 * np.pi) + log_det)
+    R *= -0.5
+    R += np.reshape(c, (-1, 1)).astype(R.dtype)
+    # log-sum-exp over the clusters, shifted by the largest term
+    top = np.max(R, axis=0)
+    R -= top
+    # normalized by at most k, exp(floor) still stays a normal number,
+    # and subnormal responsibilities would slow matrix products down
+    np.maximum(R, np.log(np.finfo(R.dtype).tiny * 2 * k), out=R)
+    np.exp(R, out=R)
+    total = np.sum(R, axis=0)
+    R /= total
+    ll = (np.sum(top, dtype=np.float64)
+          + np.sum(np.log(total), dtype=np.float64))
+    return R, float(ll)
+
+
+def fused_em(X, pi, m, S, iterations=1000, tol=1e-5,
+             covariance_type='full', reg=0.0, dtype=None, verbose=False):
+    """
+    EM for a GMM from starting parameters, without argument checks or
+    allocations of the responsibilities inside the loop
+
+    X: numpy.ndarray (n, d) containing the dataset
+    pi, m, S: starting parameters, S in the shape of covariance_type
+    iterations: positive integer - the maximum number of iterations
+    tol: non-negative float, stops once an iteration changes the log
+    likelihood by no more than tol; the first one always runs
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    reg: non-negative float added to the variances at every M-step
+    dtype: numpy.float32 to halve the memory and time of the whitened
+    points and responsibilities, or None for float64; the sufficient
+    statistics, parameters and log likelihood stay float64
+    verbose: boolean, prints the log likelihood every 10 iterations
+    and after the last one
+
+    return: pi, m, S, g, l, history or None, None, None, None, None,
+    None if a covariance is not positive definite
+        - g: numpy.ndarray (k, n) containing the posterior
+        probabilities of the final parameters
+        - l: log likelihood of the model
+        - history: dict of lists, 'log_likelihood' after each
+        iteration (the starting parameters first) and the seconds of
+        each 'e_step' and 'm_step'
+    """
+    dtype = np.float64 if dtype is None else dtype
+    # centered in float64 first, so that single precision keeps the
+    # spread of the points rather than their offset
+    center = np.mean(X, axis=0)
+    X = (X - center).astype(dtype, copy=False)
+    m = m - center
+    R = np.empty((pi.shape[0], X.shape[0]), dtype=dtype)
+    history = {'log_likelihood': [], 'e_step': [], 'm_step': []}
+    msg = "Log Likelihood after {} iterations: {}"
+
+    start = time.perf_counter()
+    _, ll = expectation(X, pi, m, S, covariance_type, R)
+    if ll is None:
+        return None, None, None, None, None, None
+    history['e_step'].append(time.perf_counter() - start)
+    history['log_likelihood'].append(ll)
+    i = 0
+    for i in range(iterations):
+        if verbose and i % 10 == 0:
+            print(msg.format(i, round(ll, 5)))
+        start = time.perf_counter()
+        pi, m, S = maximization(X, R, covariance_type, reg)
+        history['m_step'].append(time.perf_counter() - start)
+        previous = ll
+        start = time.perf_counter()
+        _, ll = expectation(X, pi, m, S, covariance_type, R)
+        if ll is None:
+            return None, None, None, None, None, None
+        history['e_step'].append(time.perf_counter() - start)
+        history['log_likelihood'].append(ll)
+        if i > 0 and abs(ll - previous) <= tol:
+            break
+    if verbose:
+        print(msg.format(i + 1, round(ll, 5)))
+    return pi, m + center, S, R, ll, history
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Compares the in-memory fused EM with the streaming and online EM over
+a numpy.memmap: time, log likelihood per point and peak traced memory.
+Both batch EMs start from the same streamed mini-batch K-means
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+fused_em = __import__('16-em_engine').fused_em
+streaming = __import__('17-streaming_em')
+
+
+def measured(func, *args, **kwargs):
+    """ returns the result, wall-clock time and peak traced MiB """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def last(generator):
+    """ the last value of a generator """
+    value = None
+    for value in generator:
+        pass
+    return value
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    n, d, k, batch = 2 * 10 ** 6, 8, 16, 65536
+    path = os.path.join(tempfile.mkdtemp(), 'X.dat')
+    X = np.memmap(path, dtype=np.float64, mode='w+', shape=(n, d))
+    centers = np.random.uniform(-10, 10, (k, d))
+    for start in range(0, n, 10 ** 5):
+        rows = min(10 ** 5, n - start)
+        X[start:start + rows] = (centers[np.random.randint(0, k, rows)]
+                                 + np.random.randn(rows, d))
+    X.flush()
+    X = np.memmap(path, dtype=np.float64, mode='r', shape=(n, d))
+    print('n={} d={} k={} batch={}, {:.0f} MiB on disk'.format(
+        n, d, k, batch, n * d * 8 / 2 ** 20))
+    print('{:>20} {:>9} {:>11} {:>14} {:>11}'.format(
+        'method', 'time (s)', 'iterations', 'll per point', 'peak (MiB)'))
+
+    start = streaming.initialize(X, k, batch)
+    (*_, ll, history), elapsed, peak = measured(
+        fused_em, np.array(X), *start, 30, 1e-3)
+    print('{:>20} {:>9.1f} {:>11} {:>14.4f} {:>11.0f}'.format(
+        'in memory', elapsed, len(history['log_likelihood']) - 1, ll / n,
+        peak))
+
+    passes = []
+    (_, _, _, ll), elapsed, peak = measured(
+        streaming.streaming_em, X, k, 30, 1e-3, batch, init=start,
+        history=passes)
+    print('{:>20} {:>9.1f} {:>11} {:>14.4f} {:>11.0f}'.format(
+        'streaming', elapsed, len(passes) - 1, ll / n, peak))
+
+    def online():
+        """ one pass of online EM over shuffled chunks """
+        return last(streaming.online_em(
+            streaming.minibatch.chunks(X, 8192, shuffle=True), k))
+
+    (pi, m, S, _), elapsed, peak = measured(online)
+    _, _, _, ll = streaming.streaming_em(X, k, 1, 0.0, batch,
+                                         init=(pi, m, S))
+    print('{:>20} {:>9.1f} {:>11} {:>14.4f} {:>11.0f}'.format(
+        'online, one pass', elapsed, '-', ll / n, peak))
+    os.remove(path)
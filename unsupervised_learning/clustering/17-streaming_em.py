@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+"""
+This module contains EM for Gaussian mixtures that holds neither the
+dataset nor its (k, n) responsibilities: a streaming EM accumulating
+sufficient statistics chunk by chunk over a numpy.memmap or any source
+of chunks, and an online EM for data that keeps arriving. Memory is
+O(k d^2) plus one chunk, whatever n is
+"""
+
+import numpy as np
+gaussian = __import__('15-log_gaussian')
+minibatch = __import__('13-minibatch_kmeans')
+engine = __import__('16-em_engine')
+kmeans_engine = __import__('12-kmeans_engine')
+
+
+def chunk_statistics(chunk, pi, m, S, covariance_type='full'):
+    """
+    E-step on one chunk, summed into sufficient statistics
+
+    chunk: numpy.ndarray (b, d) of data points
+    pi, m, S: parameters of the GMM
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+
+    return: statistics, ll, g or None, None, None if a covariance is
+    not positive definite
+        - statistics: tuple N, m, M of the chunk, as returned by
+        engine.moments
+        - ll: log likelihood of the chunk
+        - g: numpy.ndarray (k, b) containing the posterior
+        probabilities of the chunk
+    """
+    g, ll = engine.expectation(chunk, pi, m, S, covariance_type)
+    if g is None:
+        return None, None, None
+    return engine.moments(chunk, g, covariance_type), ll, g
+
+
+def initialize(X, k, batch=65536, covariance_type='full'):
+    """
+    streamed starting parameters: means from one epoch of mini-batch
+    K-means, identity covariances and equal priors
+
+    X: numpy.ndarray or numpy.memmap (n, d), or a callable returning a
+    fresh iterable of chunks on every call
+    k: positive integer - the number of clusters
+    batch: +ve(int) - no. of rows per chunk of an array
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+
+    return: pi, m, S or None, None, None if X is empty
+    """
+    C = counts = None
+    for chunk in minibatch.chunks(X, batch, shuffle=True):
+        if C is None:
+            C, counts = minibatch.initialize(chunk, k)
+        minibatch.partial_fit(C, counts, chunk)
+    if C is None:
+        return None, None, None
+    S = gaussian.identity(k, C.shape[1], covariance_type)
+    return np.full(k, 1 / k), C, S
+
+
+def streaming_em(X, k, iterations=100, tol=1e-5, batch=65536,
+                 covariance_type='full', reg=0.0, init=None,
+                 history=None, verbose=False):
+    """
+    EM for a GMM with one streamed pass over the dataset per iteration
+
+    X: numpy.ndarray or numpy.memmap (n, d), or a callable returning a
+    fresh iterable of numpy.ndarray chunks (b, d) on every call
+    k: positive integer - the number of clusters
+    iterations: positive integer - the maximum number of M-steps
+    tol: non-negative float, stops once an iteration changes the log
+    likelihood by no more than tol
+    batch: +ve(int) - no. of rows per chunk of an array
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    reg: non-negative float added to the variances at every M-step
+    init: tuple (pi, m, S) of starting parameters, or None to start
+    from a streamed mini-batch K-means
+    history: list receiving the log likelihood of each pass, or None
+    verbose: boolean, prints the log likelihood every 10 iterations
+    and after the last one
+
+    return: pi, m, S, l or None, None, None, None on failure
+        - l: log likelihood of the returned parameters
+    """
+    if not callable(X) and (not isinstance(X, np.ndarray)
+                            or len(X.shape) != 2):
+        return None, None, None, None
+    if not isinstance(k, int) or k <= 0:
+        return None, None, None, None
+    if not isinstance(iterations, int) or iterations <= 0:
+        return None, None, None, None
+    if not isinstance(tol, float) or tol < 0:
+        return None, None, None, None
+    if not isinstance(batch, int) or batch <= 0:
+        return None, None, None, None
+    if covariance_type not in gaussian.COVARIANCE_TYPES:
+        return None, None, None, None
+    if not isinstance(reg, float) or reg < 0:
+        return None, None, None, None
+    if not isinstance(verbose, bool):
+        return None, None, None, None
+    if init is None:
+        pi, m, S = initialize(X, k, batch, covariance_type)
+        if pi is None:
+            return None, None, None, None
+    else:
+        pi, m, S = init
+    previous = None
+    msg = "Log Likelihood after {} iterations: {}"
+    for i in range(iterations + 1):
+        statistics = None
+        ll = 0.0
+        for chunk in minibatch.chunks(X, batch):
+            chunk_moments, chunk_ll, _ = chunk_statistics(
+                chunk, pi, m, S, covariance_type)
+            if chunk_moments is None:
+                return None, None, None, None
+            if statistics is None:
+                statistics = chunk_moments
+            else:
+                statistics = engine.merge(statistics, chunk_moments)
+            ll += chunk_ll
+        if history is not None:
+            history.append(ll)
+        if i == iterations or (previous is not None
+                               and abs(ll - previous) <= tol):
+            break
+        if verbose and i % 10 == 0:
+            print(msg.format(i, round(ll, 5)))
+        previous = ll
+        pi, m, S = engine.parameters(statistics, covariance_type, reg)
+    if verbose:
+        print(msg.format(i, round(ll, 5)))
+    return pi, m, S, ll
+
+
+def responsibilities(X, pi, m, S, batch=65536, covariance_type='full'):
+    """
+    posterior probabilities of a GMM, one chunk at a time
+
+    X: numpy.ndarray or numpy.memmap (n, d), or a callable returning a
+    fresh iterable of chunks
+    pi, m, S: parameters of the GMM
+    batch: +ve(int) - no. of rows per chunk of an array
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+
+    return: generator of numpy.ndarrays (k, b) of the posterior
+    probabilities of each chunk, in order; empty if a covariance is not
+    positive definite
+    """
+    if gaussian.factor(S, covariance_type)[0] is None:
+        return
+    for chunk in minibatch.chunks(X, batch):
+        yield engine.expectation(chunk, pi, m, S, covariance_type)[0]
+
+
+def online_em(source, k, covariance_type='full', reg=0.0, decay=0.6):
+    """
+    online (stochastic) EM: the sufficient statistics are a running
+    average in which each new chunk has weight (t + 1)^-decay, and the
+    parameters are updated after every chunk
+
+    source: iterable of numpy.ndarray chunks (b, d), possibly endless
+    k: positive integer - the number of clusters
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
+    reg: non-negative float added to the variances at every update
+    decay: float in (0.5, 1], how fast old chunks are forgotten
+
+    return: generator of (pi, m, S, l) after each chunk, where l is the
+    mean log likelihood of the chunk under the parameters before it;
+    stops if a covariance stops being positive definite
+    """
+    statistics = None
+    for t, chunk in enumerate(source):
+        chunk = np.asarray(chunk, dtype=float)
+        if statistics is None:
+            pi = np.full(k, 1 / k)
+            m = kmeans_engine.kmeans_plus_plus(chunk, k)
+            S = gaussian.identity(k, chunk.shape[1], covariance_type)
+        moments, ll, _ = chunk_statistics(chunk, pi, m, S, covariance_type)
+        if moments is None:
+            return
+        moments = engine.scaled(moments, 1 / chunk.shape[0])
+        if statistics is None:
+            statistics = moments
+        else:
+            step = (t + 1) ** -decay
+            statistics = engine.merge(engine.scaled(statistics, 1 - step),
+                                      engine.scaled(moments, step))
+        pi, m, S = engine.parameters(statistics, covariance_type, reg)
+        yield pi, m, S, ll / chunk.shape[0]
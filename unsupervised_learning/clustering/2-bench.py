@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+"""
+Times the blocked intra-cluster variance, with and without the
+labels, against the previous (k, n, d) broadcast, with the peak memory
+traced on top of the dataset
+"""
+
+import time
+import tracemalloc
+import numpy as np
+variance = __import__('2-variance').variance
+predict = __import__('13-minibatch_kmeans').predict
+
+
+def previous_variance(X, C):
+    """ the previous variance """
+    var = np.sum((X - C[:, np.newaxis])**2, axis=-1)
+    mean = np.sqrt(var)
+    mini = np.min(mean, axis=0)
+    var = np.sum(mini ** 2)
+    return np.sum(var)
+
+
+def measured(func, *args, **kwargs):
+    """ returns the result, wall-clock time and peak traced MiB """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    d, k = 8, 16
+    C = np.random.uniform(-10, 10, (k, d))
+    print('d={} k={}'.format(d, k))
+    print('{:>10} {:>18} {:>9} {:>11} {:>16}'.format(
+        'n', 'method', 'time (s)', 'peak (MiB)', 'variance'))
+    for n in (10 ** 6, 10 ** 7):
+        clss = np.random.randint(0, k, n)
+        X = C[clss] + np.random.randn(n, d)
+        # the labels of the nearest centroids, as kmeans returns them
+        clss = predict(X, C)[0]
+        methods = [('blocked', variance, (X, C)),
+                   ('blocked, labels', variance, (X, C, clss))]
+        if n <= 10 ** 6:
+            methods.insert(0, ('previous', previous_variance, (X, C)))
+        for name, func, args in methods:
+            var, elapsed, peak = measured(func, *args)
+            print('{:>10} {:>18} {:>9.2f} {:>11.0f} {:>16.6e}'.format(
+                n, name, elapsed, peak, var))
@@ -6,11 +6,13 @@ calculates total intra-cluster variance for a dataset
 """
 
 import numpy as np
+BLOCK_ELEMENTS = __import__('12-kmeans_engine').BLOCK_ELEMENTS
 
 
-def variance(X, C):
+def variance(X, C, clss=None, per_cluster=False, block=None):
     """
-    calculates intra-cluster variance for a dataset
+    calculates intra-cluster variance for a dataset, one block of rows
+    at a time so that memory does not grow with n
 
     X: numpy.ndarray (n, d) containing the dataset that
     will be used for K-means clustering
@@ -18,12 +20,51 @@ def variance(X, C):
         - d no. of dimensions for each data point
     C: numpy.ndarray (k, d) containing the centroid
         for each cluster
+    clss: numpy.ndarray (n,) index of the cluster of each data point,
+    e.g. from kmeans, to skip the search for the nearest centroid, or
+    None to assign each point to its nearest centroid
+    per_cluster: whether to also return the inertia of each cluster
+    block: no. of rows per block, or None to bound the block x k
+    distances by BLOCK_ELEMENTS
 
     return:
-        - var: total intra-cluster variance
+        - var: total intra-cluster variance, or None on failure
+        - inertia: numpy.ndarray (k,) sum of the squared distances of
+        the points of each cluster to its centroid, only if per_cluster
     """
-    var = np.sum((X - C[:, np.newaxis])**2, axis=-1)
-    mean = np.sqrt(var)
-    mini = np.min(mean, axis=0)
-    var = np.sum(mini ** 2)
-    return np.sum(var)
+    failure = (None, None) if per_cluster else None
+    if not isinstance(X, np.ndarray) or len(X.shape) != 2:
+        return failure
+    if not isinstance(C, np.ndarray) or len(C.shape) != 2:
+        return failure
+    if X.shape[1] != C.shape[1]:
+        return failure
+    n, k = X.shape[0], C.shape[0]
+    if clss is not None and (not isinstance(clss, np.ndarray)
+                             or clss.shape != (n,)):
+        return failure
+    if block is None:
+        block = max(1, BLOCK_ELEMENTS // max(k, X.shape[1]))
+    c_sq = np.einsum('ij,ij->i', C, C)
+    inertia = np.zeros(k)
+    for start in range(0, n, block):
+        rows = X[start:start + block]
+        if clss is None:
+            # ||x||^2 - 2x.c + ||c||^2, minimized over the centroids
+            D = rows @ C.T
+            D *= -2
+            D += c_sq
+            labels = np.argmin(D, axis=1)
+            squares = D[np.arange(D.shape[0]), labels]
+            squares += np.einsum('ij,ij->i', rows, rows)
+            # rounding in the expansion can leave tiny negative squares
+            np.maximum(squares, 0, out=squares)
+        else:
+            labels = clss[start:start + block]
+            Y = rows - C[labels]
+            squares = np.einsum('ij,ij->i', Y, Y)
+        inertia += np.bincount(labels, weights=squares, minlength=k)
+    var = np.sum(inertia)
+    if per_cluster:
+        return var, inertia
+    return var
@@ -6,11 +6,12 @@ tests for the optimum number of clusters by variance
 """
 
 import numpy as np
-kmeans = __import__('1-kmeans').kmeans
 variance = __import__('2-variance').variance
+sweep = __import__('14-sweep').sweep
 
 
-def optimum_k(X, kmin=1, kmax=None, iterations=1000):
+def optimum_k(X, kmin=1, kmax=None, iterations=1000, workers=None,
+              restarts=1, warm=False):
     """
     calculates intra-cluster variance for a dataset
 
@@ -20,6 +21,12 @@ def optimum_k(X, kmin=1, kmax=None, iterations=1000):
     kmin: positive integer - the minimum no. of clusters
     kmax: positive integer - the maximum no. of clusters
     iterations: +ve(int) - max no. of iterations perfomed
+    workers: no. of processes fitting cluster sizes in parallel from a
+    shared-memory copy of X, or None to fit them in this process
+    restarts: +ve(int) - no. of K-means fits per cluster size, the one
+    with the lowest variance being kept
+    warm: whether each cluster size starts from the centroids of the
+    previous one, extended by k-means++
 
     return:
         - results: list containing the results of the
@@ -37,12 +44,14 @@ def optimum_k(X, kmin=1, kmax=None, iterations=1000):
         return None, None
     if not isinstance(iterations, int) or iterations <= 0:
         return None, None
-    results = []
-    d_vars = []
-    for k in range(kmin, kmax + 1):
-        C, clss = kmeans(X, k, iterations)
-        results.append((C, clss))
-        if k == kmin:
-            var = variance(X, C)
-        d_vars.append(var - variance(X, C))
+    if workers is not None and (not isinstance(workers, int)
+                                or workers <= 0):
+        return None, None
+    if not isinstance(restarts, int) or restarts <= 0:
+        return None, None
+    fits = sweep('kmeans', X, list(range(kmin, kmax + 1)),
+                 {'restarts': restarts, 'iterations': iterations},
+                 lambda fit: fit[1], workers, warm)
+    results = [result for result, _ in fits]
+    d_vars = [fits[0][1] - var for _, var in fits]
     return results, d_vars
@@ -7,9 +7,10 @@ initializes variables for a Gaussian Mixture Model
 
 import numpy as np
 kmeans = __import__('1-kmeans').kmeans
+gaussian = __import__('15-log_gaussian')
 
 
-def initialize(X, k):
+def initialize(X, k, covariance_type='full'):
     """
     initializes variables for a Gaussian Mixture Model
 
@@ -17,6 +18,7 @@ def initialize(X, k):
         - n no. of data points
         - d no. of dimensions for each data point
     k: positive integer - the number of clusters
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
 
     return:
         - pi: numpy.ndarray (k,) containing priors for each cluster
@@ -24,14 +26,17 @@ def initialize(X, k):
         - m: numpy.ndarray (k, d) containing centroid means for each cluster,
         initialized with K-means
         - S: numpy.ndarray (k, d, d) covariance matrices for each cluster,
-        initialized as identity matrices
+        initialized as identity matrices, or the identity in the shape
+        of covariance_type
     """
     n, d = X.shape
     if not isinstance(X, np.ndarray) or len(X.shape) != 2:
         return None, None, None
     if not isinstance(k, int) or k <= 0:
         return None, None, None
+    if covariance_type not in gaussian.COVARIANCE_TYPES:
+        return None, None, None
     pi = np.full((k,), 1 / k)
     m, _ = kmeans(X, k)
-    S = np.full((k, d, d), np.identity(d))
+    S = gaussian.identity(k, d, covariance_type)
     return pi, m, S
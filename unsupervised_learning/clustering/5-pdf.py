@@ -6,6 +6,7 @@ probability density function of a Gaussian distribution
 """
 
 import numpy as np
+log_gaussian = __import__('15-log_gaussian').log_gaussian
 
 
 def pdf(X, m, S):
@@ -30,11 +31,9 @@ def pdf(X, m, S):
     n, d = X.shape
     if d != m.shape[0] or d != S.shape[0] or d != S.shape[1]:
         return None
-    S_det = np.linalg.det(S)
-    S_inv = np.linalg.inv(S)
-    fac = 1 / np.sqrt(((2 * np.pi) ** d) * S_det)
-    X_m = X - m
-    X_m_dot = np.dot(X_m, S_inv)
-    X_m_dot_X_m = np.sum(X_m_dot * X_m, axis=1)
-    P = fac * np.exp(-0.5 * X_m_dot_X_m)
-    return np.maximum(P, 1e-300)
+    log_P = log_gaussian(X, m[np.newaxis], S[np.newaxis])
+    if log_P is None:
+        return None
+    # the contract floors P at 1e-300; log_gaussian keeps the exact
+    # log densities
+    return np.maximum(np.exp(log_P[0]), 1e-300)
@@ -6,10 +6,10 @@ expectation step in the EM algorithm for a GMM
 """
 
 import numpy as np
-pdf = __import__('5-pdf').pdf
+gaussian = __import__('15-log_gaussian')
 
 
-def expectation(X, pi, m, S):
+def expectation(X, pi, m, S, covariance_type='full'):
     """
     initializes variables for a Gaussian Mixture Model
 
@@ -18,26 +18,35 @@ def expectation(X, pi, m, S):
         - d no. of dimensions for each data point
     pi: numpy.ndarray (k,) containing the priors for each cluster
     m: numpy.ndarray (k, d) containing centroid means for each cluster
-    S: numpy.ndarray (k, d, d) covariance matrices for each cluster
+    S: numpy.ndarray (k, d, d) covariance matrices for each cluster,
+        or for covariance_type 'tied' (d, d), 'diag' (k, d) and
+        'spherical' (k,)
+    covariance_type: 'full', 'tied', 'diag' or 'spherical'
 
     return:
         - g: numpy.ndarray (k, n) containing the posterior
             probabilities for each data point in each cluster
         -l: log likelihood of the model
     """
-    if len(X.shape) != 2 or len(S.shape) != 3\
-            or len(pi.shape) != 1 or len(m.shape) != 2\
+    if covariance_type not in gaussian.COVARIANCE_TYPES:
+        return None, None
+    if len(X.shape) != 2 or len(pi.shape) != 1 or len(m.shape) != 2\
             or m.shape[1] != X.shape[1]\
-            or S.shape[2] != S.shape[1]\
-            or S.shape[0] != pi.shape[0]\
-            or S.shape[0] != m.shape[0]\
+            or m.shape[0] != pi.shape[0]\
+            or S.shape != gaussian.COVARIANCE_TYPES[covariance_type](
+                *m.shape)\
             or np.min(pi) < 0:
         return None, None
-    n, d = X.shape
-    k = pi.shape[0]
-    g = np.zeros((k, n))
-    for i in range(k):
-        g[i] = pi[i] * pdf(X, m[i], S[i])
-    g = g / np.sum(g, axis=0)
-    l = np.sum(np.log(np.sum(g, axis=0)))
+    log_g = gaussian.log_gaussian(X, m, S, covariance_type)
+    if log_g is None:
+        return None, None
+    with np.errstate(divide='ignore'):
+        log_g += np.log(pi)[:, np.newaxis]
+    # log-sum-exp over the clusters, shifted by the largest term
+    top = np.max(log_g, axis=0)
+    log_g -= top
+    g = np.exp(log_g)
+    total = np.sum(g, axis=0)
+    g /= total
+    l = np.sum(top + np.log(total))
     return g, l
@@ -6,9 +6,10 @@ maximization step in the EM algorithm for a GMM
 """
 
 import numpy as np
+engine = __import__('16-em_engine')
 
 
-def maximization(X, g):
+def maximization(X, g, covariance_type='full'):
     """
     initializes variables for a Gaussian Mixture Model
 
@@ -17,11 +18,15 @@ def maximization(X, g):
         - d no. of dimensions for each data point
     g: numpy.ndarray (k, n) containing the posterior
         probabilities for each data point in each cluster
+    covariance_type: 'full', 'tied' (one covariance shared by all
+        clusters), 'diag' (variances only) or 'spherical' (one variance
+        per cluster)
 
     return:
         - pi: numpy.ndarray (k,) containing the updated priors for each cluster
         - m: numpy.ndarray (k, d) has updated centroid means for each cluster
-        - S: numpy.ndarray (k, d, d) updated cov matrices for each cluster
+        - S: numpy.ndarray (k, d, d) updated cov matrices for each cluster,
+        or (d, d), (k, d) and (k,) for 'tied', 'diag' and 'spherical'
     """
     if not isinstance(X, np.ndarray) or len(X.shape) != 2:
         return None, None, None
@@ -33,10 +38,6 @@ def maximization(X, g):
         return None, None, None
     if not np.isclose(np.sum(g, axis=0), 1).all():
         return None, None, None
-    pi = np.sum(g, axis=1) / n
-    m = np.dot(g, X) / np.sum(g, axis=1)[:, np.newaxis]
-    S = np.zeros((k, d, d))
-    for i in range(k):
-        y = X - m[i]
-        S[i] = np.dot(g[i] * y.T, y) / np.sum(g[i])
-    return pi, m, S
+    if covariance_type not in ('full', 'tied', 'diag', 'spherical'):
+        return None, None, None
+    return engine.maximization(X, g, covariance_type)
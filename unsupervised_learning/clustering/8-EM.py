@@ -7,12 +7,14 @@ expectation maximization for a GMM
 
 import numpy as np
 initialize = __import__('4-initialize').initialize
-expectation = __import__('6-expectation').expectation
-maximization = __import__('7-maximization').maximization
+gaussian = __import__('15-log_gaussian')
+fused_em = __import__('16-em_engine').fused_em
 
 
-def expectation_maximization(X, k,
-                             iterations=1000, tol=1e-5, verbose=False):
+def expectation_maximization(X, k, iterations=1000, tol=1e-5,
+                             verbose=False, init=None,
+                             covariance_type='full', reg=0.0, dtype=None,
+                             history=None):
     """
     initializes variables for a Gaussian Mixture Model
 
@@ -23,11 +25,23 @@ def expectation_maximization(X, k,
     iterations: positive integer containing the maximum number of iterations
     tol: non-negative float containing tolerance of the log likelihood
     verbose: boolean that determines if output should be printed
+    init: tuple (pi, m, S) of starting parameters for k clusters, e.g.
+        a solution grown from k - 1 clusters, or None to initialize
+        them with K-means
+    covariance_type: 'full', 'tied' (one covariance shared by all
+        clusters), 'diag' (variances only) or 'spherical' (one variance
+        per cluster)
+    reg: non-negative float added to the variances at every M-step
+    dtype: numpy.float32 to run the iterations in single precision, or
+        None for float64
+    history: dict receiving the log likelihood after each iteration
+        and the seconds of each E-step and M-step, or None
     returns:
         pi, m, S, g, l or None, None, None, None, None on failure
         - pi: numpy.ndarray (k,) containing the priors for each cluster
         - m: numpy.ndarray (k, d) containing centroid means for each cluster
-        - S: numpy.ndarray (k, d, d) covariance matrices for each cluster
+        - S: numpy.ndarray (k, d, d) covariance matrices for each cluster,
+            or (d, d), (k, d) and (k,) for 'tied', 'diag' and 'spherical'
         - g: numpy.ndarray (k, n) containing the posterior
             probabilities for each data point in each cluster
         - l: log likelihood of the model
@@ -43,21 +57,26 @@ def expectation_maximization(X, k,
     if not isinstance(verbose, bool):
         return None, None, None, None, None
 
-    pi, m, S = initialize(X, k)
-    g, l = expectation(X, pi, m, S)
-    prev_like = i = 0
-    msg = "Log Likelihood after {} iterations: {}"
-
-    for i in range(iterations):
-        if verbose and i % 10 == 0:
-            print(msg.format(i, total_log_like.round(5)))
-        pi, m, S = maximization(X, g)
-        g, total_log_like = expectation(X, pi, m, S)
-        if abs(prev_like - total_log_like) <= tol:
-            break
-        prev_like = total_log_like
+    if covariance_type not in gaussian.COVARIANCE_TYPES:
+        return None, None, None, None, None
+    if not isinstance(reg, float) or reg < 0:
+        return None, None, None, None, None
 
-    if verbose:
-        print(msg.format(i + 1, total_log_like.round(5)))
+    if init is None:
+        pi, m, S = initialize(X, k, covariance_type)
+        if pi is None:
+            return None, None, None, None, None
+    else:
+        pi, m, S = init
+        shape = gaussian.COVARIANCE_TYPES[covariance_type](k, X.shape[1])
+        if pi.shape != (k,) or m.shape != (k, X.shape[1])\
+                or S.shape != shape:
+            return None, None, None, None, None
+    pi, m, S, g, total_log_like, trace = fused_em(
+        X, pi, m, S, iterations, tol, covariance_type, reg, dtype, verbose)
+    if pi is None:
+        return None, None, None, None, None
+    if history is not None:
+        history.update(trace)
 
     return pi, m, S, g, total_log_like
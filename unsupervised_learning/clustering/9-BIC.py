@@ -2,13 +2,28 @@
 """This module contains a function that finds the best number of clusters
 for a GMM using the Bayesian Information Criterion"""
 import numpy as np
-expectation_maximization = __import__('8-EM').expectation_maximization
+sweep = __import__('14-sweep').sweep
 
 
-def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
+def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False,
+        workers=None, restarts=1, warm=False, patience=None,
+        covariance_type='full', batch=None):
     """
     Finds the best number of clusters for a GMM using the
     Bayesian Information Criterion
+
+    workers is the number of processes fitting cluster sizes in parallel
+    from a shared-memory copy of X, or None to fit them in this process.
+    restarts is the number of EM fits per cluster size, the most likely
+    being kept. warm starts each cluster size from the solution for the
+    previous one. patience stops the sweep once the best BIC is followed
+    by that many worse ones, and defaults to 3 when kmax is None, where
+    the sweep would otherwise go up to n clusters; likelihoods and bics
+    then only cover the cluster sizes fitted. covariance_type is 'full',
+    'tied', 'diag' or 'spherical', and sets the number of parameters.
+    batch fits with a streaming EM over chunks of that many rows, so
+    that X may be a numpy.memmap larger than memory and no (k, n)
+    responsibilities are held; workers still copy X to shared memory.
     """
     if not isinstance(X, np.ndarray) or len(X.shape) != 2:
         return None, None, None, None
@@ -18,6 +33,8 @@ def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
 
     if kmax is None:
         kmax = X.shape[0]
+        if patience is None:
+            patience = 3
 
     if not isinstance(kmax, int) or kmax <= kmin:
         return None, None, None, None
@@ -31,28 +48,60 @@ def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
     if not isinstance(verbose, bool):
         return None, None, None, None
 
+    if workers is not None and (not isinstance(workers, int)
+                                or workers <= 0):
+        return None, None, None, None
+
+    if not isinstance(restarts, int) or restarts <= 0:
+        return None, None, None, None
+
+    if batch is not None and (not isinstance(batch, int) or batch <= 0):
+        return None, None, None, None
+
+    if patience is not None and (not isinstance(patience, int)
+                                 or patience <= 0):
+        return None, None, None, None
+
     n, d = X.shape
+    # free parameters of the covariances of k clusters
+    covariances = {
+        'full': lambda k: k * d * (d + 1) // 2,
+        'tied': lambda k: d * (d + 1) // 2,
+        'diag': lambda k: k * d,
+        'spherical': lambda k: k,
+    }
+    if covariance_type not in covariances:
+        return None, None, None, None
+
+    def bic(k, ll):
+        """ BIC of a GMM with k clusters and log likelihood ll """
+        p = (k - 1) + (k * d) + covariances[covariance_type](k)
+        return p * np.log(n) - 2 * ll
+
+    ks = list(range(kmin, kmax + 1))
+    fits = sweep('gmm', X, ks,
+                 {'restarts': restarts, 'iterations': iterations,
+                  'tol': tol, 'verbose': verbose,
+                  'covariance_type': covariance_type, 'batch': batch},
+                 lambda fit: bic(fit[0][0].shape[0], fit[1]),
+                 workers, warm, patience)
+    if any(fit is None for fit in fits):
+        return None, None, None, None
+
     likelihoods = []
     bics = []
     best_k = None
     best_result = None
     best_bic = float('inf')
 
-    for k in range(kmin, kmax + 1):
-        pi, m, S, g, ll = expectation_maximization(X, k, iterations, tol,
-                                                 verbose)
-        if pi is None:
-            return None, None, None, None
-
-        p = (k - 1) + (k * d) + (k * d * (d + 1) // 2)
-        bic = p * np.log(n) - 2 * ll
+    for k, (result, ll) in zip(ks, fits):
         likelihoods.append(ll)
-        bics.append(bic)
+        bics.append(bic(k, ll))
 
-        if bic < best_bic:
+        if bics[-1] < best_bic:
             best_k = k
-            best_result = (pi, m, S)
-            best_bic = bic
+            best_result = result
+            best_bic = bics[-1]
 
     if best_k is None:
         return None, None, None, None
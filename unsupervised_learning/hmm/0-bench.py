@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the step-by-step, repeated-squaring and eigendecomposition
+paths of markov_chain over the horizon t and the number of states n,
+and the batch mode over many start distributions and horizons
+"""
+
+import time
+import numpy as np
+chains = __import__('0-markov_chain')
+
+
+def random_chain(n):
+    """ random dense row-stochastic matrix """
+    P = np.random.rand(n, n)
+    return P / P.sum(axis=1, keepdims=True)
+
+
+def timed(func, *args, **kwargs):
+    """ returns the result and wall-clock time of one call """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    print('{:>5} {:>11} {:>10} {:>10} {:>10} {:>10} {:>9}'.format(
+        'n', 't', 'steps (s)', 'square (s)', 'eigen (s)', 'auto (s)',
+        'picked'))
+    for n in (10, 100, 500):
+        P = random_chain(n)
+        S = np.random.dirichlet(np.ones(n), 1)
+        for t in (10, 1000, 10 ** 5, 10 ** 9):
+            times = []
+            for method in ('steps', 'squaring', 'eigen'):
+                chains.EIGEN_CACHE.clear()
+                if method == 'steps' and t * n * n > 10 ** 10:
+                    times.append('-')
+                    continue
+                _, elapsed = timed(chains.markov_chains, P, S, [t], method)
+                times.append('{:.4f}'.format(elapsed))
+            chains.EIGEN_CACHE.clear()
+            picked = chains.choose_method(n, 1, np.array([t]))
+            _, t_auto = timed(chains.markov_chains, P, S, [t])
+            print('{:>5} {:>11} {:>10} {:>10} {:>10} {:>10.4f} {:>9}'
+                  .format(n, t, *times, t_auto, picked))
+
+    print()
+    n, k = 200, 1000
+    P = random_chain(n)
+    S = np.random.dirichlet(np.ones(n), k)
+    ts = np.unique(np.logspace(0, 9, 50).astype(int))
+    chains.EIGEN_CACHE.clear()
+    # one call per start distribution and horizon, on 1% of the starts
+    _, t_loop = timed(lambda: [chains.markov_chains(P, S[j:j + 1], [t])
+                               for j in range(k // 100) for t in ts])
+    chains.EIGEN_CACHE.clear()
+    _, t_first = timed(chains.markov_chains, P, S, ts)
+    _, t_again = timed(chains.markov_chains, P, S, ts)
+    print('n={} starts={} horizons={}'.format(n, k, ts.shape[0]))
+    print('  one call per start and horizon: {:.3f}s (extrapolated)'.format(
+        t_loop * 100))
+    print('  batch: {:.3f}s, again with the cached decomposition: '
+          '{:.3f}s'.format(t_first, t_again))
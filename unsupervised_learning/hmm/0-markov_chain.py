@@ -4,7 +4,153 @@
 This module has the implementation of a
 Markov Chain"""
 
+import hashlib
 import numpy as np
+from scipy import sparse
+
+# eigendecompositions of recently used transition matrices
+EIGEN_CACHE = {}
+EIGEN_CACHE_SIZE = 8
+
+
+def matrix_key(P):
+    """
+    cache key of a dense transition matrix
+
+    P - numpy.ndarray
+    Returns: a hashable key that changes with the shape, type or any
+    entry of P
+    """
+    return P.shape, P.dtype.str, hashlib.sha1(P.tobytes()).hexdigest()
+
+
+def eigen_decomposition(P):
+    """
+    cached eigendecomposition P = V diag(values) V^-1
+
+    P - square 2D numpy.ndarray: (n, n) -transition matrix
+    Returns: values, V, V_inv, or None if P is not (numerically)
+    diagonalizable
+    """
+    key = matrix_key(P)
+    if key not in EIGEN_CACHE:
+        values, V = np.linalg.eig(P)
+        # a defective P gives (nearly) parallel eigenvectors
+        if np.linalg.cond(V) > 1 / np.sqrt(np.finfo(float).eps):
+            result = None
+        else:
+            result = values, V, np.linalg.inv(V)
+        if len(EIGEN_CACHE) >= EIGEN_CACHE_SIZE:
+            EIGEN_CACHE.pop(next(iter(EIGEN_CACHE)))
+        EIGEN_CACHE[key] = result
+    return EIGEN_CACHE[key]
+
+
+def choose_method(n, k, ts, nnz=None, cached=False):
+    """
+    picks the cheapest way to evaluate S P^t from a cost estimate
+
+    n - number of states
+    k - number of start distributions
+    ts - numpy.ndarray of the requested horizons
+    nnz - number of non-zeros when P is sparse, None when dense
+    cached - whether the eigendecomposition of P is already known
+    Returns: 'steps' for t products S P, 'squaring' for binary powers
+    of P, or 'eigen' for the diagonalization of P
+    """
+    # flops, plus a fixed cost per numpy call; products with fewer than
+    # 8 rows are memory bound and cost as much as 8 rows, and eig costs
+    # about as much as 75 matrix products
+    call = 5e4
+    rows = max(k, 8)
+    t = int(ts.max())
+    steps = t * (2 * rows * (n * n if nnz is None else nnz) + call)
+    ones = sum(bin(int(x)).count('1') for x in ts)
+    squaring = (t.bit_length() * (2 * n ** 3 + call)
+                + ones * (2 * rows * n * n + call))
+    eigen = ((0 if cached else 150 * n ** 3)
+             + len(ts) * (4 * rows * n * n + 4 * call))
+    costs = {'steps': steps, 'squaring': squaring, 'eigen': eigen}
+    return min(costs, key=costs.get)
+
+
+def markov_chains(P, S, ts, method=None):
+    """
+    batch mode: distributions of many start distributions after many
+    numbers of iterations, in one call
+
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    -transition matrix
+    S - numpy.ndarray of shape (k, n), one start distribution per row
+    ts - non-negative ints, the numbers of iterations
+    method - 'steps', 'squaring', 'eigen' or None to pick the
+    cheapest one; 'eigen' falls back to 'squaring' when P is not
+    diagonalizable
+    Returns: a numpy.ndarray of shape (len(ts), k, n) where [i, j] is
+    the distribution after ts[i] iterations from S[j], or None on failure
+    """
+    if type(P) is not np.ndarray and not sparse.issparse(P):
+        return None
+    if len(P.shape) != 2 or P.shape[0] != P.shape[1]:
+        return None
+    n = P.shape[0]
+    if type(S) is not np.ndarray or len(S.shape) != 2 or S.shape[1] != n:
+        return None
+    ts = np.asarray(ts)
+    if (ts.ndim != 1 or ts.size == 0 or ts.dtype.kind not in 'iu'
+            or np.any(ts < 0)):
+        return None
+    if method not in (None, 'steps', 'squaring', 'eigen'):
+        return None
+    out = np.empty((ts.shape[0], S.shape[0], n))
+    if method is None and sparse.issparse(P):
+        method = choose_method(n, S.shape[0], ts, P.nnz)
+    elif method is None:
+        method = choose_method(n, S.shape[0], ts,
+                               cached=matrix_key(P) in EIGEN_CACHE)
+    if method != 'steps' and sparse.issparse(P):
+        P = P.toarray()
+    if method == 'eigen':
+        decomposition = eigen_decomposition(P)
+        if decomposition is None:
+            method = 'squaring'
+        else:
+            values, V, V_inv = decomposition
+            # rounding can put an eigenvalue of a stochastic matrix just
+            # above 1 in modulus, which a large t would blow up
+            values = values / np.maximum(np.abs(values), 1)
+            SV = S @ V
+            totals = np.sum(S, axis=1, keepdims=True)
+            for i, t in enumerate(ts):
+                s = np.maximum(((SV * values ** int(t)) @ V_inv).real, 0)
+                # each row keeps the mass of its start distribution
+                sums = np.sum(s, axis=1, keepdims=True)
+                out[i] = s * np.divide(totals, sums,
+                                       out=np.zeros_like(sums),
+                                       where=sums > 0)
+            return out
+    if method == 'squaring':
+        powers = [P]
+        for _ in range(1, int(ts.max()).bit_length()):
+            powers.append(powers[-1] @ powers[-1])
+        for i, t in enumerate(ts):
+            s = S
+            for bit, power in enumerate(powers):
+                if int(t) >> bit & 1:
+                    s = s @ power
+            out[i] = s
+        return out
+    # steps: one pass up to the largest horizon, recording on the way
+    PT = P.T.tocsr() if sparse.issparse(P) else P.T
+    order = np.argsort(ts, kind='stable')
+    s = S.T
+    done = 0
+    for i in order:
+        for _ in range(int(ts[i]) - done):
+            s = PT @ s
+        done = int(ts[i])
+        out[i] = s.T
+    return out
 
 
 def markov_chain(P, s, t=1):
@@ -12,7 +158,8 @@ def markov_chain(P, s, t=1):
     determine the probability of a markov chain being in a
     particular state after a specified number of iterations
 
-    P - square 2D numpy.ndarray: (n, n) -transition matrix
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    -transition matrix
         - P[i, j] - probability of transitioning from
     state i to state j
         - n no. of states in the markov chain
@@ -24,7 +171,9 @@ def markov_chain(P, s, t=1):
     the probability of being in a specific state after t
     iterations, or None on failure
     """
-    if type(P) is not np.ndarray or len(P.shape) != 2:
+    if type(P) is not np.ndarray and not sparse.issparse(P):
+        return None
+    if len(P.shape) != 2:
         return None
     n, n = P.shape
     if n != P.shape[0]:
@@ -41,6 +190,7 @@ def markov_chain(P, s, t=1):
         return None
     if t == 0:
         return s
-    for i in range(t):
-        s = np.matmul(s, P)
-    return s
+    chains = markov_chains(P, s, [t])
+    if chains is None:
+        return None
+    return chains[0]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks dense against scipy.sparse CSR transition matrices in the
+markov chain and hidden markov model functions, at N=10k states and 1%
+density
+"""
+
+import time
+import numpy as np
+from scipy import sparse
+markov_chain = __import__('0-markov_chain').markov_chain
+regular = __import__('1-regular').regular
+forward_backward = __import__('7-forward_backward').forward_backward
+viterbi = __import__('4-viterbi').viterbi
+baum_welch = __import__('6-baum_welch').baum_welch
+
+
+def random_chain(N, density):
+    """ random sparse row-stochastic matrix with a self loop per state """
+    P = sparse.random(N, N, density=density, format='csr',
+                      random_state=0) + sparse.eye(N, format='csr')
+    P = sparse.csr_matrix(P.multiply(1 / P.sum(axis=1)))
+    P.sort_indices()
+    return P
+
+
+def nbytes(P):
+    """ memory held by a dense or CSR matrix """
+    if sparse.issparse(P):
+        return P.data.nbytes + P.indices.nbytes + P.indptr.nbytes
+    return P.nbytes
+
+
+def timed(func, *args, **kwargs):
+    """ returns the wall-clock time of one call """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    N, M, density = 10000, 20, 0.01
+    S = random_chain(N, density)
+    D = S.toarray()
+    Emission = np.random.dirichlet(np.ones(M), N)
+    Initial = np.full((N, 1), 1 / N)
+    s = Initial.T.copy()
+    print('N={} density={} transition memory: dense {:.1f} MiB, '
+          'CSR {:.1f} MiB'.format(N, density, nbytes(D) / 2 ** 20,
+                                  nbytes(S) / 2 ** 20))
+    cases = (
+        ('markov_chain t=100', markov_chain, lambda P: (P, s, 100), {}),
+        ('regular', regular, lambda P: (P,), {'dense': False}),
+        ('forward_backward T=100', forward_backward,
+         lambda P: (np.random.randint(0, M, 100), Emission, P, Initial), {}),
+        ('viterbi T=10', viterbi,
+         lambda P: (np.random.randint(0, M, 10), Emission, P, Initial), {}),
+        ('baum_welch T=50 x1', baum_welch,
+         lambda P: (np.random.randint(0, M, 50), P, Emission, Initial),
+         {'iterations': 1}),
+    )
+    print('{:>24} {:>10} {:>10} {:>9}'.format(
+        'function', 'dense (s)', 'CSR (s)', 'speedup'))
+    for name, func, args, kwargs in cases:
+        # a dense eigendecomposition of 10k x 10k takes too long to time
+        if kwargs.pop('dense', True):
+            t_dense = timed(func, *args(D), **kwargs)
+        else:
+            t_dense = None
+        t_sparse = timed(func, *args(S), **kwargs)
+        print('{:>24} {:>10} {:>10.3f} {:>9}'.format(
+            name, '-' if t_dense is None else '{:.3f}'.format(t_dense),
+            t_sparse, '-' if t_dense is None
+            else '{:.1f}x'.format(t_dense / t_sparse)))
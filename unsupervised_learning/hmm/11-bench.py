@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Measures the markov chain analytics on sparse chains up to 1e5 states:
+communicating classes, regularity, steady state and absorption
+"""
+
+import time
+import numpy as np
+from scipy import sparse
+analytics = __import__('11-markov_analytics')
+
+
+def local_chain(n, width):
+    """
+    sparse chain whose states move at most width positions along a ring
+    """
+    offsets = np.arange(-width, width + 1)
+    rows = np.repeat(np.arange(n), offsets.size)
+    cols = (rows + np.tile(offsets, n)) % n
+    P = sparse.csr_matrix((np.random.rand(rows.size), (rows, cols)),
+                          shape=(n, n))
+    return sparse.csr_matrix(P.multiply(1 / P.sum(axis=1)))
+
+
+def absorbing_chain(n, width, sinks, leak=0.01):
+    """
+    local ring chain whose states leak with probability leak to one of
+    sinks absorbing states
+    """
+    P = local_chain(n, width) * (1 - leak)
+    targets = np.random.randint(0, sinks, n)
+    P = sparse.hstack([P, sparse.csr_matrix(
+        (np.full(n, leak), (np.arange(n), targets)), shape=(n, sinks))])
+    P = sparse.vstack([P, sparse.hstack([
+        sparse.csr_matrix((sinks, n)), sparse.eye(sinks)])])
+    return sparse.csr_matrix(P)
+
+
+def random_chain(n, degree):
+    """ sparse chain with degree random successors per state """
+    rows = np.repeat(np.arange(n), degree)
+    cols = np.random.randint(0, n, rows.size)
+    P = sparse.csr_matrix((np.random.rand(rows.size), (rows, cols)),
+                          shape=(n, n)) + sparse.eye(n)
+    return sparse.csr_matrix(P.multiply(1 / P.sum(axis=1)))
+
+
+def timed(func, *args, **kwargs):
+    """ returns the result and wall-clock time of one call """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    print('{:>7} {:>7} {:>9} {:>9} {:>10} {:>10} {:>10}'.format(
+        'chain', 'n', 'nnz', 'SCC (s)', 'regular', 'solve (s)',
+        'power (s)'))
+    for n in (10 ** 3, 10 ** 4, 10 ** 5):
+        for name, P in (('ring', local_chain(n, 2)),
+                        ('random', random_chain(n, 10))):
+            G = analytics.as_csr(P)
+            (_, count), t_scc = timed(
+                analytics.strongly_connected_components, G)
+            regular, _ = timed(analytics.is_regular, G)
+            if name == 'ring':
+                pi, t_solve = timed(analytics.steady_state, P, 'solve')
+                t_solve = '{:.3f}'.format(t_solve)
+            else:
+                # LU fill-in makes a direct solve of an expander too slow
+                t_solve = '-'
+            pi, t_power = timed(analytics.steady_state, P, 'power',
+                                tol=1e-10, max_iter=2000)
+            # slowly mixing chains do not converge within max_iter
+            t_power = '-' if pi is None else '{:.3f}'.format(t_power)
+            print('{:>7} {:>7} {:>9} {:>9.3f} {:>10} {:>10} {:>10}'
+                  .format(name, n, P.nnz, t_scc, str(regular), t_solve,
+                          t_power))
+
+    print()
+    print('{:>7} {:>9} {:>14} {:>14}'.format(
+        'n', 'nnz', 'absorbing (s)', 'absorption (s)'))
+    for n in (10 ** 3, 10 ** 4, 10 ** 5):
+        P = absorbing_chain(n, 2, 10)
+        _, t_check = timed(analytics.is_absorbing, analytics.as_csr(P))
+        (transient, absorbing, B, steps), t_solve = timed(
+            analytics.absorption, P)
+        assert np.allclose(B.sum(axis=1), 1)
+        print('{:>7} {:>9} {:>14.3f} {:>14.3f}'.format(
+            n, P.nnz, t_check, t_solve))
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+
+"""
+This module analyzes the structure and long-run behaviour of a
+markov chain: reachability, communicating classes, steady state and
+absorption, for dense or scipy.sparse transition matrices
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu, spsolve
+
+
+def as_csr(P):
+    """
+    transition graph of a markov chain
+
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    -transition matrix
+    Returns: a CSR copy of P without explicit zeros, its non-zero
+    entries being the edges i -> j of the graph
+    """
+    P = sparse.csr_matrix(P, dtype=float, copy=True)
+    P.sum_duplicates()
+    P.eliminate_zeros()
+    return P
+
+
+def check_chain(P):
+    """
+    checks for a valid transition matrix
+
+    P - the object to check
+    Returns: True if P is a square numpy.ndarray or scipy.sparse matrix
+    with non-negative rows summing to 1, otherwise False
+    """
+    if type(P) is not np.ndarray and not sparse.issparse(P):
+        return False
+    if len(P.shape) != 2 or P.shape[0] != P.shape[1] or P.shape[0] == 0:
+        return False
+    values = P.data if sparse.issparse(P) else P
+    if np.any(values < 0):
+        return False
+    return bool(np.allclose(np.asarray(P.sum(axis=1)).ravel(), 1))
+
+
+def reachable(P, sources):
+    """
+    states reachable from a set of states, by breadth-first search
+
+    P - CSR transition matrix from as_csr
+    sources - numpy.ndarray of state indices or boolean mask (n,)
+    Returns: a boolean numpy.ndarray (n,) of the states reachable from
+    sources in zero or more steps
+    """
+    seen = np.zeros(P.shape[0], dtype=bool)
+    seen[sources] = True
+    frontier = np.flatnonzero(seen)
+    while frontier.size:
+        # all successors of the frontier at once
+        successors = np.unique(P[frontier].indices)
+        frontier = successors[~seen[successors]]
+        seen[frontier] = True
+    return seen
+
+
+def strongly_connected_components(P):
+    """
+    communicating classes of a markov chain with Tarjan's algorithm,
+    iterative so that long chains do not overflow the call stack
+
+    P - CSR transition matrix from as_csr
+    Returns: labels, count
+        - labels is a numpy.ndarray (n,) with the class of each state;
+        classes are numbered in reverse topological order, so no edge
+        goes from a class to a class with a larger number
+        - count is the number of classes
+    """
+    n = P.shape[0]
+    indptr = P.indptr.tolist()
+    indices = P.indices.tolist()
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    labels = [-1] * n
+    stack = []
+    counter = 0
+    count = 0
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, indptr[root])]
+        while work:
+            v, i = work[-1]
+            end = indptr[v + 1]
+            descended = False
+            while i < end:
+                w = indices[i]
+                i += 1
+                if index[w] < 0:
+                    work[-1] = (v, i)
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, indptr[w]))
+                    descended = True
+                    break
+                if on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            if descended:
+                continue
+            work.pop()
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    labels[w] = count
+                    if w == v:
+                        break
+                count += 1
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+    return np.array(labels), count
+
+
+def communicating_classes(P):
+    """
+    communicating classes of a markov chain and whether they are closed
+
+    P - CSR transition matrix from as_csr
+    Returns: labels, closed
+        - labels is a numpy.ndarray (n,) with the class of each state
+        - closed is a boolean numpy.ndarray (count,), True for a
+        recurrent class that no transition leaves
+    """
+    labels, count = strongly_connected_components(P)
+    rows = np.repeat(np.arange(P.shape[0]), np.diff(P.indptr))
+    leaving = labels[rows] != labels[P.indices]
+    closed = np.ones(count, dtype=bool)
+    closed[labels[rows[leaving]]] = False
+    return labels, closed
+
+
+def period(P):
+    """
+    period of an irreducible markov chain
+
+    P - CSR transition matrix from as_csr, with a single class
+    Returns: the gcd of the lengths of all cycles; 1 means aperiodic
+    """
+    n = P.shape[0]
+    level = np.full(n, -1)
+    level[0] = 0
+    frontier = np.array([0])
+    depth = 0
+    while frontier.size:
+        depth += 1
+        successors = np.unique(P[frontier].indices)
+        frontier = successors[level[successors] < 0]
+        level[frontier] = depth
+    rows = np.repeat(np.arange(n), np.diff(P.indptr))
+    # every edge closes a cycle whose length is a multiple of the period
+    return int(np.gcd.reduce(np.abs(level[rows] + 1 - level[P.indices])))
+
+
+def is_regular(P):
+    """
+    checks whether some power of P has only positive entries
+
+    P - CSR transition matrix from as_csr
+    Returns: True if the chain is irreducible and aperiodic
+    """
+    _, count = strongly_connected_components(P)
+    return count == 1 and period(P) == 1
+
+
+def steady_state(P, method=None, tol=1e-12, max_iter=100000):
+    """
+    stationary distribution pi = pi P of an irreducible markov chain
+
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    -transition matrix
+    method - 'solve' for a direct linear solve, 'power' for power
+    iteration with sparse matvecs, or None for 'solve' on dense
+    matrices and on sparse ones 'power' falling back to 'solve' when it
+    has not converged after max_iter iterations
+    tol - L1 change between two power iterations under which they stop
+    max_iter - maximum number of power iterations
+    Returns: a numpy.ndarray of shape (1, n), or None if the power
+    iteration did not converge
+    """
+    n = P.shape[0]
+    if method is None and sparse.issparse(P):
+        # fast mixing chains converge in a few matvecs, slowly mixing
+        # ones (long cycles, bottlenecks) are better solved directly
+        state = steady_state(P, 'power', tol, min(max_iter, 1000))
+        if state is not None:
+            return state
+        method = 'solve'
+    elif method is None:
+        method = 'solve'
+    if method == 'solve':
+        # pi (P - I) = 0 with the equation of state 0 replaced by
+        # pi_0 = 1, then normalized
+        b = np.zeros(n)
+        b[0] = 1
+        if sparse.issparse(P):
+            keep = np.ones(n)
+            keep[0] = 0
+            A = (sparse.diags(keep) @ (P.T - sparse.eye(n))
+                 + sparse.diags(b))
+            state = spsolve(sparse.csc_matrix(A), b)
+        else:
+            A = P.T - np.eye(n)
+            A[0] = 0
+            A[0, 0] = 1
+            state = np.linalg.solve(A, b)
+        return (state / state.sum()).reshape(1, n)
+    PT = as_csr(P).T.tocsr()
+    state = np.full(n, 1 / n)
+    for _ in range(max_iter):
+        # the lazy chain (I + P) / 2 has the same steady state and
+        # converges even when P is periodic
+        following = 0.5 * (state + PT @ state)
+        if np.abs(following - state).sum() < tol:
+            return (following / following.sum()).reshape(1, n)
+        state = following
+    return None
+
+
+def absorbing_states(P):
+    """
+    states that the chain never leaves
+
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    Returns: a numpy.ndarray of the indices i with P[i, i] == 1
+    """
+    return np.flatnonzero(P.diagonal() == 1)
+
+
+def is_absorbing(P):
+    """
+    checks whether a markov chain is absorbing
+
+    P - CSR transition matrix from as_csr
+    Returns: True if there is an absorbing state and one can be reached
+    from every state
+    """
+    absorbing = absorbing_states(P)
+    if absorbing.size == 0:
+        return False
+    # states reaching an absorbing state, searched backwards
+    return bool(reachable(P.T.tocsr(), absorbing).all())
+
+
+def absorption(P):
+    """
+    fundamental-matrix analysis of an absorbing markov chain, solved
+    with a sparse LU factorization of I - Q instead of inverting it
+
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    -transition matrix of an absorbing chain
+    Returns: transient, absorbing, B, steps or None, None, None, None
+    if the chain is not absorbing
+        - transient, absorbing are numpy.ndarrays of state indices
+        - B is a numpy.ndarray (len(transient), len(absorbing)) where
+        B[i, j] is the probability of ending in absorbing[j] from
+        transient[i]
+        - steps is a numpy.ndarray (len(transient),) of the expected
+        number of steps before absorption from each transient state
+    """
+    P = as_csr(P)
+    if not is_absorbing(P):
+        return None, None, None, None
+    absorbing = absorbing_states(P)
+    transient = np.setdiff1d(np.arange(P.shape[0]), absorbing)
+    if transient.size == 0:
+        return transient, absorbing, np.zeros((0, absorbing.size)), \
+            np.zeros(0)
+    Q = P[transient][:, transient]
+    R = P[transient][:, absorbing]
+    lu = splu(sparse.csc_matrix(sparse.eye(transient.size) - Q))
+    B = lu.solve(R.toarray())
+    steps = lu.solve(np.ones(transient.size))
+    return transient, absorbing, B, steps
+
+
+def fundamental_matrix(P):
+    """
+    fundamental matrix N = (I - Q)^-1 of an absorbing markov chain,
+    where N[i, j] is the expected number of visits to transient[j]
+    from transient[i]; dense, so only for moderate numbers of
+    transient states
+
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    -transition matrix of an absorbing chain
+    Returns: transient, N or None, None if the chain is not absorbing
+    """
+    P = as_csr(P)
+    if not is_absorbing(P):
+        return None, None
+    transient = np.setdiff1d(np.arange(P.shape[0]), absorbing_states(P))
+    Q = P[transient][:, transient].toarray()
+    return transient, np.linalg.inv(np.eye(transient.size) - Q)
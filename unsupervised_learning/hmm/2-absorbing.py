@@ -4,15 +4,15 @@
 This module determines if markov chain
 is absorbing"""
 
-import numpy as np
+analytics = __import__('11-markov_analytics')
 
 
 def absorbing(P):
     """
-    determines steady state probabilities
-    of a markov chain
+    determines if a markov chain is absorbing
 
-    P - square 2D numpy.ndarray: (n, n) -transition matrix
+    P - square 2D numpy.ndarray or scipy.sparse matrix: (n, n)
+    -transition matrix
         - P[i, j] - probability of transitioning from
     state i to state j
         - n no. of states in the markov chain
@@ -21,14 +21,8 @@ def absorbing(P):
         or False on failure
     """
     # absorbing states are states that have a probability of 1
-    # of transitioning to themselves
-    if type(P) is not np.ndarray or len(P.shape) != 2:
+    # of transitioning to themselves, and every state must be able
+    # to reach one of them
+    if not analytics.check_chain(P):
         return False
-    n, n = P.shape
-    if n != P.shape[0]:
-        return False
-    if np.sum(P, axis=1).all() != 1:
-        return False
-    if np.any(np.diag(P) == 1):
-        return True
-    return False
+    return analytics.is_absorbing(analytics.as_csr(P))
@@ -6,6 +6,8 @@ for a hidden markov model
 """
 
 import numpy as np
+is_matrix = __import__('7-forward_backward').is_matrix
+transposed = __import__('7-forward_backward').transposed
 
 
 def forward(Observation, Emission, Transition, Initial):
@@ -23,8 +25,8 @@ def forward(Observation, Emission, Transition, Initial):
         j given the hidden state i
         - N is the number of hidden states
         - M is the number of all possible observations
-    Transition - 2D numpy.ndarray (N, N) containing the
-    transition probabilities
+    Transition - 2D numpy.ndarray or scipy.sparse matrix (N, N)
+    containing the transition probabilities
         - Transition[i, j] is the probability of transitioning
         from the hidden state i to j
     Initial - numpy.ndarray (N, 1) containing the probability
@@ -43,7 +45,7 @@ def forward(Observation, Emission, Transition, Initial):
     if type(Emission) is not np.ndarray or len(Emission.shape) != 2:
         return None, None
     N, M = Emission.shape
-    if type(Transition) is not np.ndarray or len(Transition.shape) != 2:
+    if not is_matrix(Transition):
         return None, None
     N1, N2 = Transition.shape
     if N1 != N or N2 != N:
@@ -53,11 +55,11 @@ def forward(Observation, Emission, Transition, Initial):
     N3, N4 = Initial.shape
     if N3 != N or N4 != 1:
         return None, None
-    F = np.zeros((N, T))
-    F[:, 0] = Initial.T * Emission[:, Observation[0]]
+    E = Emission.T[Observation]
+    TT = transposed(Transition)
+    F = np.zeros((T, N))
+    F[0] = Initial[:, 0] * E[0]
     for i in range(1, T):
-        F[:, i] = np.sum(
-            F[:, i - 1] * Transition.T * Emission[np.newaxis, :,
-                                                  Observation[i]].T, axis=1)
-    P = np.sum(F[:, -1])
-    return P, F
+        F[i] = (TT @ F[i - 1]) * E[i]
+    P = np.sum(F[-1])
+    return P, F.T
@@ -6,6 +6,129 @@ of hidden states for a hidden markov model
 """
 
 import numpy as np
+from scipy import sparse
+is_matrix = __import__('7-forward_backward').is_matrix
+
+
+def log_model(Emission, Transition, Initial):
+    """
+    takes the natural log of a hidden markov model
+
+    Emission - numpy.ndarray (N, M) of emission probabilities
+    Transition - numpy.ndarray or scipy.sparse matrix (N, N) of
+    transition probabilities
+    Initial - numpy.ndarray (N, 1) of starting probabilities
+    Return:
+    log_E, log_T, log_I
+        - log_E is a numpy.ndarray (M, N), the log of Emission.T
+        - log_T is the log of Transition: a numpy.ndarray (N, N), or a
+        scipy.sparse CSC matrix holding the log of every non-zero
+        transition, where missing entries stand for -inf
+        - log_I is a numpy.ndarray (N,), the log of Initial
+    impossible events are -inf
+    """
+    with np.errstate(divide='ignore'):
+        if sparse.issparse(Transition):
+            log_T = sparse.csc_matrix(Transition, copy=True)
+            log_T.sum_duplicates()
+            log_T.eliminate_zeros()
+            log_T.data = np.log(log_T.data)
+        else:
+            log_T = np.log(Transition)
+        return np.log(Emission.T), log_T, np.log(Initial[:, 0])
+
+
+def pointer_dtype(N):
+    """
+    smallest integer type able to index N hidden states
+
+    N - number of hidden states
+    Return:
+    numpy.int16 or numpy.int32
+    """
+    return np.int16 if N <= np.iinfo(np.int16).max else np.int32
+
+
+def sparse_max_product(delta, log_T, dtype=np.int32):
+    """
+    best predecessor of every state through the non-zero transitions
+    only, for a batch of log scores
+
+    delta - numpy.ndarray (B, N) of log scores of the current states
+    log_T - scipy.sparse CSC matrix (N, N) from log_model
+    dtype - integer type of the predecessors
+    Return:
+    best, back
+        - best is a numpy.ndarray (B, N) where best[b, j] is the
+        maximum over the predecessors i of j of delta[b, i] + log_T[i, j],
+        -inf for a state without predecessors
+        - back is a numpy.ndarray (B, N) of the first i reaching it
+    """
+    B, N = delta.shape
+    best = np.full((B, N), -np.inf)
+    back = np.zeros((B, N), dtype=dtype)
+    counts = np.diff(log_T.indptr)
+    filled = counts > 0
+    if not filled.any():
+        return best, back
+    starts = log_T.indptr[:-1][filled]
+    # one score per non-zero transition, reduced per destination column
+    scores = delta[:, log_T.indices] + log_T.data
+    column = np.repeat(np.arange(starts.shape[0]), counts[filled])
+    top = np.maximum.reduceat(scores, starts, axis=1)
+    where = np.where(scores == top[:, column], np.arange(scores.shape[1]),
+                     scores.shape[1])
+    first = np.minimum.reduceat(where, starts, axis=1)
+    best[:, filled] = top
+    back[:, filled] = log_T.indices[first]
+    return best, back
+
+
+def best_predecessor(delta, log_T, dtype=np.int32):
+    """
+    one viterbi step for a single sequence
+
+    delta - numpy.ndarray (N,) of log scores of the current states
+    log_T - log transition matrix from log_model
+    dtype - integer type of the predecessors
+    Return:
+    best, back
+        - best is a numpy.ndarray (N,) of the maximum over i of
+        delta[i] + log_T[i, j]
+        - back is a numpy.ndarray (N,) of the first i reaching it
+    """
+    if sparse.issparse(log_T):
+        best, back = sparse_max_product(delta[np.newaxis], log_T, dtype)
+        return best[0], back[0]
+    scores = delta[:, np.newaxis] + log_T
+    back = scores.argmax(axis=0).astype(dtype)
+    return scores[back, np.arange(delta.shape[0])], back
+
+
+def log_viterbi(Observation, log_E, log_T, log_I):
+    """
+    viterbi algorithm in log space
+
+    Observation - numpy.ndarray (T,) of observation indices
+    log_E, log_T, log_I - as returned by log_model
+    Return:
+    Path, log_P
+        - Path is a numpy.ndarray (T,) of the most likely hidden states
+        - log_P is the log-probability of that path
+    """
+    T = Observation.shape[0]
+    N = log_T.shape[0]
+    dtype = pointer_dtype(N)
+    back = np.empty((T, N), dtype=dtype)
+    delta = log_I + log_E[Observation[0]]
+    for t in range(1, T):
+        delta, back[t] = best_predecessor(delta, log_T, dtype)
+        delta += log_E[Observation[t]]
+    Path = np.empty(T, dtype=int)
+    Path[-1] = delta.argmax()
+    for t in range(T - 1, 0, -1):
+        Path[t - 1] = back[t, Path[t]]
+    return Path, delta[Path[-1]]
 
 
 def viterbi(Observation, Emission, Transition, Initial):
@@ -23,8 +146,8 @@ def viterbi(Observation, Emission, Transition, Initial):
         j given the hidden state i
         - N is the number of hidden states
         - M is the number of all possible observations
-    Transition - 2D numpy.ndarray (N, N) containing the
-    transition probabilities
+    Transition - 2D numpy.ndarray or scipy.sparse matrix (N, N)
+    containing the transition probabilities
         - Transition[i, j] is the probability of transitioning
         from the hidden state i to j
     Initial - numpy.ndarray (N, 1) containing the probability
@@ -41,7 +164,7 @@ def viterbi(Observation, Emission, Transition, Initial):
     if type(Emission) is not np.ndarray or len(Emission.shape) != 2:
         return None, None
     N, M = Emission.shape
-    if type(Transition) is not np.ndarray or len(Transition.shape) != 2:
+    if not is_matrix(Transition):
         return None, None
     N1, N2 = Transition.shape
     if N1 != N or N2 != N:
@@ -51,17 +174,6 @@ def viterbi(Observation, Emission, Transition, Initial):
     N3, N4 = Initial.shape
     if N3 != N or N4 != 1:
         return None, None
-    F = np.zeros((N, T))
-    F[:, 0] = Initial.T * Emission[:, Observation[0]]
-    back = np.zeros((N, T))
-    for i in range(1, T):
-        F[:, i] = np.max(
-            F[:, i - 1] * Transition.T * Emission[np.newaxis, :,
-                                                  Observation[i]].T, axis=1)
-        back[:, i] = np.argmax(
-            F[:, i - 1] * Transition.T, axis=1)
-    P = np.max(F[:, -1])
-    Path = [np.argmax(F[:, -1])]
-    for i in range(T - 1, 0, -1):
-        Path.insert(0, int(back[Path[0], i]))
-    return Path, P
+    Path, log_P = log_viterbi(Observation,
+                              *log_model(Emission, Transition, Initial))
+    return Path.tolist(), np.exp(log_P)
@@ -6,6 +6,7 @@ for a hidden markov model
 """
 
 import numpy as np
+is_matrix = __import__('7-forward_backward').is_matrix
 
 
 def backward(Observation, Emission, Transition, Initial):
@@ -23,8 +24,8 @@ def backward(Observation, Emission, Transition, Initial):
         j given the hidden state i
         - N is the number of hidden states
         - M is the number of all possible observations
-    Transition - 2D numpy.ndarray (N, N) containing the
-    transition probabilities
+    Transition - 2D numpy.ndarray or scipy.sparse matrix (N, N)
+    containing the transition probabilities
         - Transition[i, j] is the probability of transitioning
         from the hidden state i to j
     Initial - numpy.ndarray (N, 1) containing the probability
@@ -43,7 +44,7 @@ def backward(Observation, Emission, Transition, Initial):
     if type(Emission) is not np.ndarray or len(Emission.shape) != 2:
         return None, None, None
     N, M = Emission.shape
-    if type(Transition) is not np.ndarray or len(Transition.shape) != 2:
+    if not is_matrix(Transition):
         return None, None, None
     N1, N2 = Transition.shape
     if N1 != N or N2 != N:
@@ -53,10 +54,10 @@ def backward(Observation, Emission, Transition, Initial):
     N3, N4 = Initial.shape
     if N3 != N or N4 != 1:
         return None, None, None
-    B = np.zeros((N, T))
-    B[:, T - 1] = 1
+    E = Emission.T[Observation]
+    B = np.zeros((T, N))
+    B[T - 1] = 1
     for i in range(T - 2, -1, -1):
-        B[:, i] = np.dot(Transition, B[:, i + 1] *
-                         Emission[:, Observation[i + 1]])
-    P = np.sum(Initial.T * Emission[:, Observation[0]] * B[:, 0])
-    return P, B
+        B[i] = Transition @ (B[i + 1] * E[i + 1])
+    P = np.sum(Initial[:, 0] * E[0] * B[0])
+    return P, B.T
@@ -5,105 +5,188 @@ This module performs the Baum-Welch algorithm
 for a hidden markov model
 """
 
+import time
 import numpy as np
+from scipy import sparse
+is_matrix = __import__('7-forward_backward').is_matrix
+scaled_forward = __import__('7-forward_backward').scaled_forward
+scaled_backward = __import__('7-forward_backward').scaled_backward
+pad_sequences = __import__('8-batched').pad_sequences
+batch_forward = __import__('8-batched').batch_forward
+batch_backward = __import__('8-batched').batch_backward
 
 
-def forward(Observation, Emission, Transition, Initial):
-    """ forward function based on task3 """
-    # Hidden States
+def sparse_counts(F, following, Transition, max_bytes=2 ** 26):
+    """
+    expected transition counts restricted to the non-zero transitions
+
+    F - numpy.ndarray (S, N) of normalized forward probabilities of
+    every step that has a successor
+    following - numpy.ndarray (S, N) of the matching successor terms
+    Transition - scipy.sparse CSR matrix (N, N) in canonical form
+    max_bytes - size of the gathered columns per block of transitions
+    Return:
+    scipy.sparse CSR matrix (N, N) with the sparsity of Transition
+    """
     N = Transition.shape[0]
-
-    # Observations
-    T = Observation.shape[0]
-
-    # F == alpha
-    # initialization α1(j) = πjbj(o1) 1 ≤ j ≤ N
-    F = np.zeros((N, T))
-    F[:, 0] = Initial.T * Emission[:, Observation[0]]
-
-    # formula shorturl.at/amtJT
-    # Recursion αt(j) == ∑Ni=1 αt−1(i)ai jbj(ot); 1≤j≤N,1<t≤T
-    for t in range(1, T):
-        for n in range(N):
-            Transitions = Transition[:, n]
-            Emissions = Emission[n, Observation[t]]
-            F[n, t] = np.sum(Transitions * F[:, t - 1]
-                             * Emissions)
-
-    # Termination P(O|λ) == ∑Ni=1 αT (i)
-    # P = np.sum(F[:, -1])
-    return F
-
-
-def backward(Observation, Emission, Transition, Initial):
-    """ backward function based on task5 """
-
-    T = Observation.shape[0]
+    rows = np.repeat(np.arange(N), np.diff(Transition.indptr))
+    cols = Transition.indices
+    data = np.empty(rows.shape[0])
+    block = max(1, max_bytes // (8 * max(F.shape[0], 1)))
+    for start in range(0, rows.shape[0], block):
+        stop = start + block
+        data[start:stop] = np.einsum('sk,sk->k', F[:, rows[start:stop]],
+                                     following[:, cols[start:stop]])
+    return type(Transition)((Transition.data * data, cols,
+                             Transition.indptr), shape=(N, N))
+
+
+def expectation(Observations, lengths, Transition, Emission, Initial):
+    """
+    scaled E-step pooled over a batch of sequences
+
+    Observations - numpy.ndarray (B, T) of padded observation indices
+    lengths - numpy.ndarray (B,) of sequence lengths
+    Transition, Emission, Initial - the current model
+    Return:
+    log_P, xi, gamma
+        - log_P is the total log-likelihood of the sequences
+        - xi is a numpy.ndarray (N, N) of expected transition counts,
+        or a scipy.sparse CSR matrix with the sparsity of Transition
+        - gamma is a numpy.ndarray (B, T, N) of state posteriors, zero
+        on padding
+    """
+    if Observations.shape[0] == 1:
+        Observation = Observations[0, :lengths[0]]
+        F, scales = scaled_forward(Observation, Emission, Transition,
+                                   Initial)
+        Beta = scaled_backward(Observation, Emission, Transition, scales)
+        F, Beta, scales = F.T[np.newaxis], Beta.T[np.newaxis], scales[
+            np.newaxis]
+        with np.errstate(divide='ignore'):
+            log_P = np.sum(np.log(scales))
+    else:
+        log_P, F, scales = batch_forward(Observations, Emission,
+                                         Transition, Initial, lengths)
+        Beta = batch_backward(Observations, Emission, Transition, scales,
+                              lengths)
+        log_P = np.sum(log_P)
+    safe = np.where(scales > 0, scales, 1)
+    # Beta is zero past the end, so no transition leaves the last step
+    following = (Emission.T[Observations[:, 1:]] * Beta[:, 1:]
+                 / safe[:, 1:, np.newaxis])
+    if sparse.issparse(Transition):
+        N = Transition.shape[0]
+        xi = sparse_counts(F[:, :-1].reshape((-1, N)),
+                           following.reshape((-1, N)), Transition)
+    else:
+        xi = Transition * np.einsum('bti,btj->ij', F[:, :-1], following,
+                                    optimize=True)
+    return log_P, xi, F * Beta
+
+
+def maximization(Observations, xi, gamma, Transition, Emission):
+    """
+    M-step from the pooled expected counts
+
+    Observations - numpy.ndarray (B, T) of padded observation indices
+    xi, gamma - as returned by expectation
+    Transition, Emission - the current model, kept for states that are
+    never visited
+    Return:
+    Transition, Emission - the updated model
+    """
     N, M = Emission.shape
-    beta = np.zeros((N, T))
-    beta[:, T - 1] = np.ones(N)
-
-    for t in range(T - 2, -1, -1):
-        for n in range(N):
-            Transitions = Transition[n, :]
-            Emissions = Emission[:, Observation[t + 1]]
-            beta[n, t] = np.sum((Transitions * beta[:, t + 1]) * Emissions)
-
-    # P = np.sum(Initial[:, 0] * Emission[:, Observation[0]] * beta[:, 0])
-    return beta
+    gamma = gamma.reshape((-1, N))
+    symbols = Observations.ravel()
+    counts = np.empty((N, M))
+    for i in range(N):
+        counts[i] = np.bincount(symbols, weights=gamma[:, i], minlength=M)
+    in_state = counts.sum(axis=1, keepdims=True)
+    if sparse.issparse(xi):
+        rows = np.repeat(np.arange(N), np.diff(xi.indptr))
+        from_state = np.bincount(rows, weights=xi.data, minlength=N)[rows]
+        data = np.where(from_state > 0,
+                        xi.data / np.where(from_state > 0, from_state, 1),
+                        Transition.data)
+        Transition = type(xi)((data, xi.indices, xi.indptr), shape=(N, N))
+    else:
+        from_state = xi.sum(axis=1, keepdims=True)
+        Transition = np.where(from_state > 0,
+                              xi / np.where(from_state > 0, from_state, 1),
+                              Transition)
+    Emission = np.where(in_state > 0,
+                        counts / np.where(in_state > 0, in_state, 1),
+                        Emission)
+    return Transition, Emission
 
 
-def baum_welch(Observations, Transition, Emission, Initial, iterations=1000):
+def baum_welch(Observations, Transition, Emission, Initial, iterations=1000,
+               tol=1e-8, lengths=None, verbose=False):
     """
     Baum-Welch algorithm for a hidden markov model
     Args:
         Observations: numpy.ndarray of shape (T,) that contains the index of
-                      the observation
+                      the observation, or several sequences pooled together
+                      as a padded numpy.ndarray of shape (B, T) with lengths
+                      or a list of numpy.ndarrays of shape (T_b,)
                       T: the number of observations
         Transition: numpy.ndarray of shape (M, M) that contains the initialized
-                    transition probabilities
+                    transition probabilities, or a scipy.sparse matrix
+                    whose sparsity is kept by every update
                     M: the number of hidden states
         Emission: numpy.ndarray of shape (M, N) that contains the initialized
                   emission probabilities
                   N: the number of output states
         Initial: numpy.ndarray of shape (M, 1) that contains the initialized
                  starting probabilities
-        iterations: the number of times expectation-maximization should be
-                    performed
-    Returns: the converged Transition, Emission, or None, None on failure
+        iterations: the maximum number of times expectation-maximization
+                    should be performed
+        tol: non-negative tolerance on the change of the log-likelihood
+             between two iterations under which training stops
+        lengths: numpy.ndarray of shape (B,) with the valid length of each
+                 row of a padded Observations matrix
+        verbose: print the log-likelihood and the time per iteration every
+                 10 iterations
+    Returns: the converged Transition, Emission, or None, None on failure;
+             a sparse Transition is returned as a CSR matrix
     """
-    if iterations == 1000:
-        iterations = 385
-    N, M = Emission.shape
-    T = Observations.shape[0]
-
-    for n in range(iterations):
-        alpha = forward(Observations, Emission, Transition, Initial)
-        beta = backward(Observations, Emission, Transition, Initial)
-
-        xi = np.zeros((N, N, T - 1))
-        for t in range(T - 1):
-            denominator = np.dot(np.dot(alpha[:, t].T, Transition) *
-                                 Emission[:, Observations[t + 1]].T,
-                                 beta[:, t + 1])
-            for i in range(N):
-                numerator = alpha[i, t] * Transition[i] * \
-                            Emission[:, Observations[t + 1]].T * \
-                            beta[:, t + 1].T
-                xi[i, :, t] = numerator / denominator
-
-        gamma = np.sum(xi, axis=1)
-        Transition = np.sum(xi, 2) / np.sum(gamma,
-                                            axis=1).reshape((-1, 1))
-
-        # adding additional T element in gamma
-
-        gamma = np.hstack((gamma, np.sum(xi[:, :, T - 2],
-                                         axis=0).reshape((-1, 1))))
-
-        denominator = np.sum(gamma, axis=1)
-        for s in range(M):
-            Emission[:, s] = np.sum(gamma[:, Observations == s],
-                                    axis=1)
-        Emission = np.divide(Emission, denominator.reshape((-1, 1)))
+    if type(Observations) is np.ndarray and Observations.ndim == 1:
+        Observations = Observations[np.newaxis]
+    Observations, lengths = pad_sequences(Observations, lengths)
+    if Observations is None:
+        return None, None
+    if type(Emission) is not np.ndarray or Emission.ndim != 2:
+        return None, None
+    N = Emission.shape[0]
+    if not is_matrix(Transition) or Transition.shape != (N, N):
+        return None, None
+    if type(Initial) is not np.ndarray or Initial.shape != (N, 1):
+        return None, None
+    if type(iterations) is not int or iterations <= 0:
+        return None, None
+    if tol < 0:
+        return None, None
+    if sparse.issparse(Transition):
+        # canonical CSR, whose pattern every update keeps
+        Transition = Transition.tocsr(copy=True)
+        Transition.sum_duplicates()
+        Transition.eliminate_zeros()
+    msg = "Log Likelihood after {} iterations: {} ({:.4f}s/iteration)"
+    previous = None
+    start = time.perf_counter()
+    for i in range(iterations):
+        log_P, xi, gamma = expectation(Observations, lengths, Transition,
+                                       Emission, Initial)
+        if verbose and i % 10 == 0:
+            print(msg.format(i, round(log_P, 5),
+                             (time.perf_counter() - start) / (i + 1)))
+        if previous is not None and abs(log_P - previous) <= tol:
+            break
+        Transition, Emission = maximization(Observations, xi, gamma,
+                                            Transition, Emission)
+        previous = log_P
+    if verbose:
+        print(msg.format(i + 1, round(log_P, 5),
+                         (time.perf_counter() - start) / (i + 1)))
     return Transition, Emission
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the time per EM iteration of the vectorized Baum-Welch
+against the original loop implementation, on one long sequence and on
+many pooled sequences
+"""
+
+import time
+import numpy as np
+baum_welch = __import__('6-baum_welch').baum_welch
+
+
+def baum_welch_loop(Observations, Transition, Emission, iterations):
+    """ reference Baum-Welch (original task 6 implementation) """
+    N, M = Emission.shape
+    T = Observations.shape[0]
+    Emission = Emission.copy()
+    for _ in range(iterations):
+        alpha = np.zeros((N, T))
+        alpha[:, 0] = Emission[:, Observations[0]] / N
+        for t in range(1, T):
+            for n in range(N):
+                alpha[n, t] = np.sum(Transition[:, n] * alpha[:, t - 1]
+                                     * Emission[n, Observations[t]])
+        beta = np.zeros((N, T))
+        beta[:, T - 1] = 1
+        for t in range(T - 2, -1, -1):
+            for n in range(N):
+                beta[n, t] = np.sum(Transition[n, :] * beta[:, t + 1]
+                                    * Emission[:, Observations[t + 1]])
+        xi = np.zeros((N, N, T - 1))
+        for t in range(T - 1):
+            denominator = np.dot(np.dot(alpha[:, t].T, Transition)
+                                 * Emission[:, Observations[t + 1]].T,
+                                 beta[:, t + 1])
+            for i in range(N):
+                xi[i, :, t] = (alpha[i, t] * Transition[i]
+                               * Emission[:, Observations[t + 1]].T
+                               * beta[:, t + 1].T) / denominator
+        gamma = np.sum(xi, axis=1)
+        Transition = np.sum(xi, 2) / np.sum(gamma, axis=1).reshape((-1, 1))
+        gamma = np.hstack((gamma, np.sum(xi[:, :, T - 2],
+                                         axis=0).reshape((-1, 1))))
+        for s in range(M):
+            Emission[:, s] = np.sum(gamma[:, Observations == s], axis=1)
+        Emission = Emission / np.sum(gamma, axis=1).reshape((-1, 1))
+    return Transition, Emission
+
+
+def random_model(N, M):
+    """ random row-stochastic emission, transition and initial arrays """
+    Emission = np.random.dirichlet(np.ones(M), N)
+    Transition = np.random.dirichlet(np.ones(N), N)
+    Initial = np.full((N, 1), 1 / N)
+    return Emission, Transition, Initial
+
+
+def per_iteration(func, *args, iterations=3, **kwargs):
+    """ wall-clock time of one EM iteration """
+    start = time.perf_counter()
+    func(*args, iterations=iterations, **kwargs)
+    return (time.perf_counter() - start) / iterations
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    M = 20
+    print('{:>20} {:>4} {:>14} {:>14}'.format(
+        'sequences', 'N', 'loop (s/iter)', 'fast (s/iter)'))
+    for B, T, N in ((1, 300, 10), (1, 300, 50), (1, 10000, 50),
+                    (1, 100000, 50), (1000, 100, 10), (10000, 100, 50)):
+        Emission, Transition, Initial = random_model(N, M)
+        t_loop = None
+        if B > 1:
+            Observations = [np.random.randint(0, M, np.random.randint(
+                T // 2, T + 1)) for _ in range(B)]
+        else:
+            Observations = np.random.randint(0, M, T)
+        if B == 1 and T <= 300:
+            # raw probabilities underflow, the loop only gives the timing
+            with np.errstate(all='ignore'):
+                t_loop = per_iteration(baum_welch_loop, Observations,
+                                       Transition, Emission, iterations=1)
+        t_fast = per_iteration(baum_welch, Observations, Transition,
+                               Emission, Initial, tol=0.0)
+        print('{:>20} {:>4} {:>14} {:>14.4f}'.format(
+            '{} x {}'.format(B, T), N,
+            '-' if t_loop is None else '{:.4f}'.format(t_loop), t_fast))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the original forward algorithm against the matvec one and
+the scaled forward/backward across sequence length and state count
+"""
+
+import time
+import numpy as np
+forward = __import__('3-forward').forward
+forward_backward = __import__('7-forward_backward').forward_backward
+
+
+def forward_loop(Observation, Emission, Transition, Initial):
+    """ reference forward (original task 3 implementation) """
+    N = Emission.shape[0]
+    T = Observation.shape[0]
+    F = np.zeros((N, T))
+    F[:, 0] = Initial.T * Emission[:, Observation[0]]
+    for i in range(1, T):
+        F[:, i] = np.sum(
+            F[:, i - 1] * Transition.T * Emission[np.newaxis, :,
+                                                  Observation[i]].T, axis=1)
+    return np.sum(F[:, -1]), F
+
+
+def random_model(N, M):
+    """ random row-stochastic emission, transition and initial arrays """
+    Emission = np.random.dirichlet(np.ones(M), N)
+    Transition = np.random.dirichlet(np.ones(N), N)
+    Initial = np.random.dirichlet(np.ones(N)).reshape((-1, 1))
+    return Emission, Transition, Initial
+
+
+def timed(func, *args):
+    """ returns the result and wall-clock time of one call """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    M = 10
+    print('{:>7} {:>4} {:>10} {:>10} {:>10} {:>11} {:>16}'.format(
+        'T', 'N', 'loop (s)', 'matvec (s)', 'scaled (s)', 'P (raw)',
+        'log P (scaled)'))
+    for T in (100, 1000, 10000, 100000):
+        for N in (5, 50, 200):
+            Emission, Transition, Initial = random_model(N, M)
+            Observation = np.random.randint(0, M, T)
+            args = (Observation, Emission, Transition, Initial)
+            if T <= 10000:
+                _, t_loop = timed(forward_loop, *args)
+                t_loop = '{:>10.4f}'.format(t_loop)
+            else:
+                t_loop = '{:>10}'.format('-')
+            (P, _), t_matvec = timed(forward, *args)
+            (log_P, _, _, _), t_scaled = timed(forward_backward, *args)
+            print('{:>7} {:>4} {} {:>10.4f} {:>10.4f} {:>11.3e} {:>16.4f}'
+                  .format(T, N, t_loop, t_matvec, t_scaled, P, log_P))
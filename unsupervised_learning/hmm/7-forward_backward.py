@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+"""
+This module performs the scaled forward and backward algorithms
+for a hidden markov model, safe for arbitrarily long sequences
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+def is_matrix(A):
+    """
+    checks for a 2D transition matrix
+
+    A - the object to check
+    Return:
+    True for a 2D numpy.ndarray or a scipy.sparse matrix
+    """
+    return (type(A) is np.ndarray or sparse.issparse(A)) and A.ndim == 2
+
+
+def transposed(Transition):
+    """
+    transpose of a transition matrix laid out for repeated products
+
+    Transition - numpy.ndarray or scipy.sparse matrix (N, N)
+    Return:
+    Transition.T, converted to CSR when Transition is sparse so that
+    every product with a dense array is a row-wise sparse matvec
+    """
+    if sparse.issparse(Transition):
+        return Transition.T.tocsr()
+    return Transition.T
+
+
+def check_model(Observation, Emission, Transition, Initial):
+    """
+    checks the shapes of a hidden markov model and its observations
+
+    Observation - numpy.ndarray (T,) of observation indices
+    Emission - numpy.ndarray (N, M) of emission probabilities
+    Transition - numpy.ndarray or scipy.sparse matrix (N, N) of
+    transition probabilities
+    Initial - numpy.ndarray (N, 1) of starting probabilities
+    Return:
+    True if every shape is consistent, otherwise False
+    """
+    if type(Observation) is not np.ndarray or Observation.ndim != 1:
+        return False
+    if Observation.shape[0] == 0:
+        return False
+    if type(Emission) is not np.ndarray or Emission.ndim != 2:
+        return False
+    N = Emission.shape[0]
+    if not is_matrix(Transition) or Transition.shape != (N, N):
+        return False
+    if type(Initial) is not np.ndarray or Initial.shape != (N, 1):
+        return False
+    return True
+
+
+def scaled_forward(Observation, Emission, Transition, Initial):
+    """
+    forward algorithm with every step normalized to sum to 1
+
+    Observation, Emission, Transition, Initial - as in check_model
+    Return:
+    F, scales
+        - F is a numpy.ndarray (N, T) where F[:, t] is the probability
+        of each hidden state at time t given the first t + 1
+        observations
+        - scales is a numpy.ndarray (T,) where scales[t] is the
+        probability of observation t given the ones before it, so the
+        log-likelihood is np.sum(np.log(scales)); once an observation
+        is impossible under the model its scale and every later column
+        are 0
+    """
+    T = Observation.shape[0]
+    N = Emission.shape[0]
+    # (T, N) gather so every step reads one contiguous row
+    E = Emission.T[Observation]
+    TT = transposed(Transition)
+    F = np.zeros((T, N))
+    scales = np.zeros(T)
+    alpha = Initial[:, 0] * E[0]
+    for t in range(T):
+        if t:
+            alpha = TT @ F[t - 1]
+            alpha *= E[t]
+        scale = np.add.reduce(alpha)
+        if scale == 0:
+            break
+        scales[t] = scale
+        np.divide(alpha, scale, out=F[t])
+    return F.T, scales
+
+
+def scaled_backward(Observation, Emission, Transition, scales):
+    """
+    backward algorithm normalized with the forward scaling factors
+
+    Observation, Emission, Transition - as in check_model
+    scales - numpy.ndarray (T,) returned by scaled_forward
+    Return:
+    B - numpy.ndarray (N, T) where B[i, t] is the probability of the
+    observations after t from hidden state i, divided by the
+    probability of those observations given the ones up to t;
+    F * B is then the posterior probability of each hidden state
+    """
+    T = Observation.shape[0]
+    N = Emission.shape[0]
+    # emissions already divided by the scaling factor of their step
+    E = Emission.T[Observation] / np.where(scales > 0, scales,
+                                           1)[:, np.newaxis]
+    B = np.zeros((T, N))
+    B[T - 1] = 1
+    for t in range(T - 2, -1, -1):
+        B[t] = Transition @ (B[t + 1] * E[t + 1])
+    return B.T
+
+
+def forward_backward(Observation, Emission, Transition, Initial):
+    """
+    performs the scaled forward and backward algorithms for a hidden
+    markov model
+
+    Observation - numpy.ndarray (T,) that contains
+    index of the observation
+        - T - number of observations
+    Emission - numpy.ndarray (N, M) containing the
+    emission probability of a specific observation
+        given a hidden state
+    Transition - 2D numpy.ndarray or scipy.sparse matrix (N, N)
+    containing the transition probabilities
+    Initial - numpy.ndarray (N, 1) containing the probability
+    of starting in a particular hidden state
+    Return:
+    log_P, F, B, scales or None, None, None, None on failure
+        - log_P is the natural log of the likelihood of the
+        observations, -inf if they are impossible under the model
+        - F, scales as returned by scaled_forward
+        - B as returned by scaled_backward
+    """
+    if not check_model(Observation, Emission, Transition, Initial):
+        return None, None, None, None
+    F, scales = scaled_forward(Observation, Emission, Transition, Initial)
+    B = scaled_backward(Observation, Emission, Transition, scales)
+    with np.errstate(divide='ignore'):
+        log_P = np.sum(np.log(scales))
+    return log_P, F, B, scales
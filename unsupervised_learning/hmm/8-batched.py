@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+"""
+This module runs the forward, backward and viterbi algorithms on a
+whole batch of independent observation sequences at once
+"""
+
+import numpy as np
+from scipy import sparse
+check_model = __import__('7-forward_backward').check_model
+transposed = __import__('7-forward_backward').transposed
+log_model = __import__('4-viterbi').log_model
+pointer_dtype = __import__('4-viterbi').pointer_dtype
+sparse_max_product = __import__('4-viterbi').sparse_max_product
+
+
+def pad_sequences(Observations, lengths=None):
+    """
+    turns a batch of observation sequences into a padded matrix
+
+    Observations - numpy.ndarray (B, T) of observation indices, or a
+    list of B numpy.ndarrays (T_b,)
+    lengths - numpy.ndarray (B,) of the valid length of each row of a
+    padded matrix, None if every row is complete
+    Return:
+    Padded, lengths or None, None on failure
+        - Padded is a numpy.ndarray (B, T) of int, padded with 0
+        - lengths is a numpy.ndarray (B,) of int
+    """
+    if isinstance(Observations, (list, tuple)):
+        if len(Observations) == 0 or any(
+                type(o) is not np.ndarray or o.ndim != 1 or o.size == 0
+                for o in Observations):
+            return None, None
+        lengths = np.array([o.shape[0] for o in Observations])
+        Padded = np.zeros((len(Observations), lengths.max()), dtype=int)
+        for row, o in zip(Padded, Observations):
+            row[:o.shape[0]] = o
+        return Padded, lengths
+    if type(Observations) is not np.ndarray or Observations.ndim != 2:
+        return None, None
+    B, T = Observations.shape
+    if B == 0 or T == 0:
+        return None, None
+    if lengths is None:
+        return Observations, np.full(B, T)
+    lengths = np.asarray(lengths)
+    if (lengths.shape != (B,) or np.any(lengths < 1)
+            or np.any(lengths > T)):
+        return None, None
+    Padded = np.where(np.arange(T) < lengths[:, np.newaxis],
+                      Observations, 0)
+    return Padded, lengths
+
+
+def blocks(lengths, chunk):
+    """
+    groups sequences of similar length so each block only runs up to
+    its own longest sequence
+
+    lengths - numpy.ndarray (B,) of sequence lengths
+    chunk - maximum number of sequences per block
+    Return:
+    generator of (index, T) with the batch rows of a block and the
+    length of its longest sequence
+    """
+    order = np.argsort(lengths, kind='stable')
+    for start in range(0, order.shape[0], chunk):
+        index = order[start:start + chunk]
+        yield index, lengths[index[-1]]
+
+
+def forward_block(Observations, lengths, Emission, Transition, Initial,
+                  F=None, scales=None):
+    """
+    scaled forward algorithm on one block of padded sequences
+
+    Observations - numpy.ndarray (B, T) of observation indices
+    lengths - numpy.ndarray (B,) of sequence lengths
+    Emission, Transition, Initial - as in check_model
+    F - numpy.ndarray (B, T, N) filled with the normalized forward
+    probabilities, or None
+    scales - numpy.ndarray (B, T) filled with the scaling factors
+    (1 on padding), or None
+    Return:
+    log_P - numpy.ndarray (B,) of log-likelihoods
+    """
+    B, T = Observations.shape
+    TT = transposed(Transition)
+    log_P = np.zeros(B)
+    alpha = Initial[:, 0] * Emission.T[Observations[:, 0]]
+    for t in range(T):
+        if t:
+            alpha = (TT @ alpha.T).T * Emission.T[Observations[:, t]]
+        live = t < lengths
+        scale = np.where(live, alpha.sum(axis=1), 1)
+        # a sequence that became impossible stays at zero
+        alpha = alpha / np.where(scale > 0, scale, 1)[:, np.newaxis]
+        alpha[~live] = 0
+        with np.errstate(divide='ignore'):
+            log_P += np.log(scale)
+        if F is not None:
+            F[:, t] = alpha
+        if scales is not None:
+            scales[:, t] = scale
+    return log_P
+
+
+def batch_forward(Observations, Emission, Transition, Initial,
+                  lengths=None, store=True, chunk=4096):
+    """
+    performs the scaled forward algorithm on a batch of sequences with
+    one (B, N) @ (N, N) product per step
+
+    Observations - numpy.ndarray (B, T) padded with lengths, or a list
+    of numpy.ndarrays (T_b,)
+    Emission, Transition, Initial - as in check_model
+    lengths - numpy.ndarray (B,) of valid lengths, None for full rows
+    store - keep F and scales; False only computes the log-likelihoods
+    chunk - number of sequences processed together
+    Return:
+    log_P, F, scales or None, None, None on failure
+        - log_P is a numpy.ndarray (B,) of log-likelihoods
+        - F is a numpy.ndarray (B, T, N) where F[b, :T_b].T matches
+        scaled_forward on sequence b, zero on padding; None if not
+        store
+        - scales is a numpy.ndarray (B, T) of the scaling factors, 1
+        on padding; None if not store
+    """
+    Observations, lengths = pad_sequences(Observations, lengths)
+    if Observations is None or not check_model(
+            Observations[0], Emission, Transition, Initial):
+        return None, None, None
+    B, T = Observations.shape
+    N = Emission.shape[0]
+    log_P = np.zeros(B)
+    F = np.zeros((B, T, N)) if store else None
+    scales = np.ones((B, T)) if store else None
+    for index, length in blocks(lengths, chunk):
+        F_block = np.zeros((index.shape[0], length, N)) if store else None
+        s_block = np.ones((index.shape[0], length)) if store else None
+        log_P[index] = forward_block(
+            Observations[index, :length], lengths[index], Emission,
+            Transition, Initial, F_block, s_block)
+        if store:
+            F[index, :length] = F_block
+            scales[index, :length] = s_block
+    return log_P, F, scales
+
+
+def batch_backward(Observations, Emission, Transition, scales,
+                   lengths=None, chunk=4096):
+    """
+    performs the scaled backward algorithm on a batch of sequences
+
+    Observations, lengths, chunk - as in batch_forward
+    Emission, Transition - as in check_model
+    scales - numpy.ndarray (B, T) returned by batch_forward
+    Return:
+    Beta or None on failure
+        - Beta is a numpy.ndarray (B, T, N) where Beta[b, :T_b].T
+        matches scaled_backward on sequence b, zero on padding
+    """
+    Observations, lengths = pad_sequences(Observations, lengths)
+    if Observations is None or type(scales) is not np.ndarray:
+        return None
+    if scales.shape != Observations.shape:
+        return None
+    B, T = Observations.shape
+    N = Emission.shape[0]
+    safe = np.where(scales > 0, scales, 1)
+    Beta = np.zeros((B, T, N))
+    for index, length in blocks(lengths, chunk):
+        last = lengths[index] - 1
+        Obs = Observations[index]
+        beta = np.zeros((index.shape[0], N))
+        for t in range(length - 1, -1, -1):
+            if t < length - 1:
+                beta = ((Transition @ (beta * Emission.T[Obs[:, t + 1]]).T).T
+                        / safe[index, t + 1, np.newaxis])
+            beta[t == last] = 1
+            beta[t > last] = 0
+            Beta[index, t] = beta
+    return Beta
+
+
+def max_product(delta, log_T, dtype=np.int32):
+    """
+    best predecessor of every state, for a batch of log scores
+
+    delta - numpy.ndarray (B, N) of log scores of the current states
+    log_T - log transition matrix from log_model, dense or sparse
+    dtype - integer type of the predecessors
+    Return:
+    best, back
+        - best is a numpy.ndarray (B, N) where best[b, j] is the
+        maximum over i of delta[b, i] + log_T[i, j]
+        - back is a numpy.ndarray (B, N) of the first i reaching it
+    """
+    if sparse.issparse(log_T):
+        return sparse_max_product(delta, log_T, dtype)
+    # one (B, N) pass per predecessor is faster than a (B, N, N) argmax
+    best = delta[:, :1] + log_T[0]
+    back = np.zeros(best.shape, dtype=dtype)
+    candidate = np.empty_like(best)
+    better = np.empty(best.shape, dtype=bool)
+    for i in range(1, log_T.shape[0]):
+        np.add(delta[:, i:i + 1], log_T[i], out=candidate)
+        np.greater(candidate, best, out=better)
+        np.maximum(best, candidate, out=best)
+        np.copyto(back, i, where=better)
+    return best, back
+
+
+def batch_viterbi(Observations, Emission, Transition, Initial,
+                  lengths=None, chunk=4096):
+    """
+    calculates the most likely sequence of hidden states of every
+    sequence in a batch, in log space
+
+    Observations, lengths, chunk - as in batch_forward
+    Emission, Transition, Initial - as in check_model
+    Return:
+    Paths, log_P or None, None on failure
+        - Paths is a numpy.ndarray (B, T) of int where Paths[b, :T_b]
+        matches viterbi on sequence b, -1 on padding
+        - log_P is a numpy.ndarray (B,) of the log-probability of
+        each path
+    """
+    Observations, lengths = pad_sequences(Observations, lengths)
+    if Observations is None or not check_model(
+            Observations[0], Emission, Transition, Initial):
+        return None, None
+    B, T = Observations.shape
+    N = Emission.shape[0]
+    log_E, log_T, log_I = log_model(Emission, Transition, Initial)
+    dtype = pointer_dtype(N)
+    stay = np.arange(N, dtype=dtype)
+    Paths = np.full((B, T), -1)
+    log_P = np.zeros(B)
+    for index, length in blocks(lengths, chunk):
+        Obs = Observations[index]
+        live_until = lengths[index]
+        back = np.empty((length, index.shape[0], N), dtype=dtype)
+        delta = log_I + log_E[Obs[:, 0]]
+        for t in range(1, length):
+            step, best = max_product(delta, log_T, dtype)
+            step += log_E[Obs[:, t]]
+            live = t < live_until
+            # finished sequences keep their scores and point to themselves
+            delta = np.where(live[:, np.newaxis], step, delta)
+            back[t] = np.where(live[:, np.newaxis], best, stay)
+        state = delta.argmax(axis=1)
+        log_P[index] = delta[np.arange(index.shape[0]), state]
+        path = np.empty((index.shape[0], length), dtype=int)
+        path[:, length - 1] = state
+        for t in range(length - 1, 0, -1):
+            state = back[t, np.arange(index.shape[0]), state]
+            path[:, t - 1] = state
+        path[np.arange(length) >= live_until[:, np.newaxis]] = -1
+        Paths[index, :length] = path
+    return Paths, log_P
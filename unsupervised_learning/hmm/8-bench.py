@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the batched forward, backward and viterbi against one call
+of the single-sequence functions per sequence
+"""
+
+import time
+import numpy as np
+forward_backward = __import__('7-forward_backward').forward_backward
+viterbi = __import__('4-viterbi').viterbi
+batched = __import__('8-batched')
+
+
+def random_model(N, M):
+    """ random row-stochastic emission, transition and initial arrays """
+    Emission = np.random.dirichlet(np.ones(M), N)
+    Transition = np.random.dirichlet(np.ones(N), N)
+    Initial = np.random.dirichlet(np.ones(N)).reshape((-1, 1))
+    return Emission, Transition, Initial
+
+
+def timed(func, *args, **kwargs):
+    """ returns the result and wall-clock time of one call """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def per_sequence(Observations, lengths, Emission, Transition, Initial):
+    """ scores and decodes the sequences one at a time """
+    for row, length in zip(Observations, lengths):
+        forward_backward(row[:length], Emission, Transition, Initial)
+        viterbi(row[:length], Emission, Transition, Initial)
+
+
+def batch(Observations, lengths, Emission, Transition, Initial):
+    """ scores and decodes the sequences in one batch """
+    log_P, _, scales = batched.batch_forward(
+        Observations, Emission, Transition, Initial, lengths)
+    batched.batch_backward(Observations, Emission, Transition, scales,
+                           lengths)
+    batched.batch_viterbi(Observations, Emission, Transition, Initial,
+                          lengths)
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    N, M, T = 10, 20, 100
+    Emission, Transition, Initial = random_model(N, M)
+    print('{:>8} {:>14} {:>14} {:>9} {:>16}'.format(
+        'B', 'loop (seq/s)', 'batch (seq/s)', 'speedup', 'score (seq/s)'))
+    for B in (1000, 10000, 100000, 1000000):
+        Observations = np.random.randint(0, M, (B, T))
+        lengths = np.random.randint(T // 2, T + 1, B)
+        args = (Observations, lengths, Emission, Transition, Initial)
+        if B <= 1000:
+            _, t_loop = timed(per_sequence, *args)
+        else:
+            t_loop = None
+        if B <= 100000:
+            _, t_batch = timed(batch, *args)
+        else:
+            t_batch = None
+        _, t_score = timed(batched.batch_forward, Observations, Emission,
+                           Transition, Initial, lengths, store=False)
+        print('{:>8} {:>14} {:>14} {:>9} {:>16,.0f}'.format(
+            B, '-' if t_loop is None else '{:,.0f}'.format(B / t_loop),
+            '-' if t_batch is None else '{:,.0f}'.format(B / t_batch),
+            '-' if t_loop is None or t_batch is None
+            else '{:.1f}x'.format(t_loop / t_batch),
+            B / t_score))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the original viterbi against the log-space one, and the
+peak memory of streaming decoding against decoding the whole sequence
+"""
+
+import time
+import tracemalloc
+import numpy as np
+log_viterbi = __import__('4-viterbi').log_viterbi
+log_model = __import__('4-viterbi').log_model
+viterbi_stream = __import__('9-viterbi_stream').viterbi_stream
+
+
+def viterbi_loop(Observation, Emission, Transition, Initial):
+    """ reference viterbi (original task 4 implementation) """
+    N = Emission.shape[0]
+    T = Observation.shape[0]
+    F = np.zeros((N, T))
+    F[:, 0] = Initial.T * Emission[:, Observation[0]]
+    back = np.zeros((N, T))
+    for i in range(1, T):
+        F[:, i] = np.max(
+            F[:, i - 1] * Transition.T * Emission[np.newaxis, :,
+                                                  Observation[i]].T, axis=1)
+        back[:, i] = np.argmax(F[:, i - 1] * Transition.T, axis=1)
+    Path = [np.argmax(F[:, -1])]
+    for i in range(T - 1, 0, -1):
+        Path.insert(0, int(back[Path[0], i]))
+    return Path, np.max(F[:, -1])
+
+
+def random_model(N, M):
+    """ sticky random model, so decoded paths merge after a few steps """
+    Emission = np.random.dirichlet(np.full(M, 0.3), N)
+    Transition = np.random.dirichlet(np.full(N, 0.3), N)
+    Initial = np.random.dirichlet(np.ones(N)).reshape((-1, 1))
+    return Emission, Transition, Initial
+
+
+def chunks(T, M, size):
+    """ generates a random observation stream in chunks """
+    for start in range(0, T, size):
+        yield np.random.randint(0, M, min(size, T - start))
+
+
+def peak(func, *args):
+    """ returns the result, wall-clock time and peak traced memory """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak_bytes
+
+
+def decode_stream(T, M, Emission, Transition, Initial):
+    """ decodes a stream of T observations, keeping only a count """
+    return sum(path.shape[0] for path in viterbi_stream(
+        chunks(T, M, 1000), Emission, Transition, Initial))
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    M = 10
+    print('{:>8} {:>4} {:>10} {:>10} {:>10} {:>9}'.format(
+        'T', 'N', 'loop (s)', 'log (s)', 'speedup', 'P (loop)'))
+    for T in (1000, 10000, 30000):
+        for N in (5, 50):
+            Emission, Transition, Initial = random_model(N, M)
+            Observation = np.random.randint(0, M, T)
+            start = time.perf_counter()
+            path, P = viterbi_loop(Observation, Emission, Transition,
+                                   Initial)
+            t_loop = time.perf_counter() - start
+            start = time.perf_counter()
+            fast, _ = log_viterbi(Observation, *log_model(
+                Emission, Transition, Initial))
+            t_log = time.perf_counter() - start
+            print('{:>8} {:>4} {:>10.4f} {:>10.4f} {:>9.1f}x {:>9.2e}'
+                  .format(T, N, t_loop, t_log, t_loop / t_log, P))
+
+    print()
+    print('{:>8} {:>4} {:>12} {:>14} {:>12} {:>14}'.format(
+        'T', 'N', 'whole (s)', 'whole (MiB)', 'stream (s)', 'stream (MiB)'))
+    for T in (10 ** 4, 10 ** 5):
+        N = 20
+        Emission, Transition, Initial = random_model(N, M)
+        Observation = np.random.randint(0, M, T)
+        _, t_whole, m_whole = peak(log_viterbi, Observation, *log_model(
+            Emission, Transition, Initial))
+        count, t_stream, m_stream = peak(decode_stream, T, M, Emission,
+                                         Transition, Initial)
+        assert count == T
+        print('{:>8} {:>4} {:>12.3f} {:>14.2f} {:>12.3f} {:>14.2f}'.format(
+            T, N, t_whole, m_whole / 2 ** 20, t_stream, m_stream / 2 ** 20))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+This module decodes an unbounded stream of observations with the
+viterbi algorithm, emitting hidden states as soon as they are final
+"""
+
+import numpy as np
+check_model = __import__('7-forward_backward').check_model
+log_model = __import__('4-viterbi').log_model
+pointer_dtype = __import__('4-viterbi').pointer_dtype
+best_predecessor = __import__('4-viterbi').best_predecessor
+
+
+def trace(back, state, k):
+    """
+    follows backpointers from a state k steps after the first pending one
+
+    back - list of numpy.ndarrays (N,) where back[j] holds the best
+    predecessor of every state j + 1 steps after the first pending one
+    state - hidden state k steps after the first pending one
+    k - number of steps to walk back
+    Return:
+    numpy.ndarray (k + 1,) of the hidden states from the first pending
+    step up to step k
+    """
+    path = np.empty(k + 1, dtype=int)
+    path[k] = state
+    for j in range(k, 0, -1):
+        state = back[j - 1][state]
+        path[j - 1] = state
+    return path
+
+
+def viterbi_stream(Chunks, Emission, Transition, Initial, max_lag=None):
+    """
+    streaming viterbi algorithm for a hidden markov model
+
+    Chunks - iterable of numpy.ndarrays (T_c,) of observation indices,
+    together forming one sequence
+    Emission - numpy.ndarray (N, M) containing the
+    emission probability of a specific observation
+        given a hidden state
+    Transition - 2D numpy.ndarray or scipy.sparse matrix (N, N)
+    containing the transition probabilities
+    Initial - numpy.ndarray (N, 1) containing the probability
+    of starting in a particular hidden state
+    max_lag - maximum number of undecided steps; past it the prefix of
+    the currently best path is emitted even though a later observation
+    could still change it, None to always wait for an exact decision
+    Yield:
+    numpy.ndarrays of the next hidden states of the most likely path,
+    emitted once the paths ending in every reachable state agree on
+    them, and the rest of the path when Chunks is exhausted; nothing if
+    the model or a chunk is invalid
+    Return:
+    log_P - the log-probability of the decoded path, as the value of
+    the StopIteration
+    """
+    if not check_model(np.zeros(1, dtype=int), Emission, Transition,
+                       Initial):
+        return None
+    log_E, log_T, log_I = log_model(Emission, Transition, Initial)
+    N = Emission.shape[0]
+    dtype = pointer_dtype(N)
+    states = np.arange(N)
+    delta = None
+    back = []
+    for Chunk in Chunks:
+        if type(Chunk) is not np.ndarray or Chunk.ndim != 1:
+            return None
+        for observation in Chunk:
+            if delta is None:
+                delta = log_I + log_E[observation]
+                continue
+            delta, best = best_predecessor(delta, log_T, dtype)
+            delta += log_E[observation]
+            back.append(best)
+        if delta is None:
+            continue
+        # walk the surviving paths back until they merge
+        survivors = np.flatnonzero(delta > -np.inf)
+        if survivors.size == 0:
+            survivors = states
+        k = len(back)
+        while k > 0:
+            survivors = back[k - 1][survivors]
+            k -= 1
+            if survivors.min() == survivors.max():
+                yield trace(back, survivors[0], k)
+                back = back[k + 1:]
+                break
+        if max_lag is not None and len(back) > max_lag:
+            k = len(back) - max_lag - 1
+            state = delta.argmax()
+            for j in range(len(back), k, -1):
+                state = back[j - 1][state]
+            yield trace(back, state, k)
+            back = back[k + 1:]
+    if delta is None:
+        return None
+    yield trace(back, delta.argmax(), len(back))
+    return delta.max()
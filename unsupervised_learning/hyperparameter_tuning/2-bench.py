@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""
+Time of one acquisition step, a single-point update then a prediction
+on 1000 candidates, as the Gaussian process grows to 5000 observations:
+the Cholesky-updated process against the previous one, which rebuilt
+the kernel matrix and inverted it on every step; then a hand grid
+search over l and sigma_f against fit_hyperparameters
+"""
+
+import time
+import numpy as np
+gp_module = __import__('2-gp')
+GP = gp_module.GaussianProcess
+
+
+class PreviousGaussianProcess:
+    """ the previous Gaussian process, on 2D inputs """
+
+    def __init__(self, X_init, Y_init, l=1, sigma_f=1):
+        """ keeps the full kernel matrix only """
+        self.X = X_init
+        self.Y = Y_init
+        self.l = l
+        self.sigma_f = sigma_f
+        self.K = self.kernel(X_init, X_init)
+
+    def kernel(self, X1, X2):
+        """ squared exponential kernel """
+        sqdist = np.sum(X1**2, 1).reshape(-1, 1) + np.sum(
+            X2**2, 1) - 2 * np.dot(X1, X2.T)
+        return self.sigma_f**2 * np.exp(-0.5 / self.l**2 * sqdist)
+
+    def predict(self, X_s):
+        """ inverse and full covariance of the candidates """
+        K_inv = np.linalg.inv(self.K)
+        K_s = self.kernel(self.X, X_s)
+        mu = K_s.T.dot(K_inv).dot(self.Y).reshape(-1)
+        K_ss = self.kernel(X_s, X_s)
+        sigma = K_ss - K_s.T.dot(K_inv).dot(K_s)
+        return mu, np.diag(sigma)
+
+    def update(self, X_new, Y_new):
+        """ kernel matrix rebuilt from scratch """
+        self.X = np.concatenate((self.X, np.reshape(X_new, (-1, 2))))
+        self.Y = np.append(self.Y, Y_new).reshape(-1, 1)
+        self.K = self.kernel(self.X, self.X)
+
+
+def f(X):
+    """ the black-box function """
+    return np.sum(np.sin(3 * X), axis=1, keepdims=True)
+
+
+def step(gp, X_s):
+    """ seconds of one update and of one prediction """
+    x = np.random.uniform(0, 10, (1, 2))
+    start = time.perf_counter()
+    gp.update(x, f(x))
+    middle = time.perf_counter()
+    gp.predict(X_s)
+    return middle - start, time.perf_counter() - middle
+
+
+def growth():
+    """ time per acquisition step as the process grows """
+    np.random.seed(0)
+    X_s = np.random.uniform(0, 10, (1000, 2))
+    X = np.random.uniform(0, 10, (5000, 2))
+    Y = f(X)
+    checkpoints = (100, 500, 1000, 2000, 3000, 4000, 5000)
+    print('{:>6} {:>13} {:>13} {:>13} {:>13} {:>9}'.format(
+        't', 'previous (s)', 'update', 'cholesky (s)', 'update',
+        'speedup'))
+    gp = GP(X[:10], Y[:10], l=0.5, sigma_f=1, noise=1e-3)
+    previous = PreviousGaussianProcess(X[:10], Y[:10], l=0.5, sigma_f=1)
+    t = 10
+    for checkpoint in checkpoints:
+        # grown in one block, then one acquisition step timed
+        gp.update(X[t:checkpoint - 1], Y[t:checkpoint - 1])
+        previous.update(X[t:checkpoint - 1], Y[t:checkpoint - 1])
+        t = checkpoint - 1
+        u_previous, p_previous = step(previous, X_s)
+        u_cholesky, p_cholesky = step(gp, X_s)
+        t = checkpoint
+        t_previous = u_previous + p_previous
+        t_cholesky = u_cholesky + p_cholesky
+        print('{:>6} {:>13.4f} {:>13.4f} {:>13.4f} {:>13.4f} {:>8.1f}x'
+              .format(checkpoint, t_previous, u_previous, t_cholesky,
+                      u_cholesky, t_previous / t_cholesky))
+
+
+def grid_search(X, Y, noise, size):
+    """
+    best log marginal likelihood over a size x size grid of l and
+    sigma_f, with the kernel rebuilt for every pair
+    """
+    best = -np.inf
+    for l in np.logspace(-2, 2, size):
+        for sigma_f in np.logspace(-2, 2, size):
+            gp = GP(X, Y, l=l, sigma_f=sigma_f, noise=noise)
+            lml = (-0.5 * gp.v.T.dot(gp.v).item()
+                   - np.sum(np.log(np.diagonal(gp.L)))
+                   - 0.5 * X.shape[0] * np.log(2 * np.pi))
+            best = max(best, lml)
+    return best
+
+
+def hyperparameters():
+    """ grid search against marginal-likelihood maximization """
+    print('\n{:>6} {:>28} {:>12} {:>10} {:>14} {:>10}'.format(
+        't', '', 'evaluations', 'total (s)', 's/evaluation', 'lml'))
+    for t in (250, 500, 1000):
+        np.random.seed(0)
+        X = np.random.uniform(0, 10, (t, 2))
+        Y = f(X) + 0.1 * np.random.randn(t, 1)
+        start = time.perf_counter()
+        lml = grid_search(X, Y, 0.1, 20)
+        elapsed = time.perf_counter() - start
+        print('{:>6} {:>28} {:>12} {:>10.2f} {:>14.4f} {:>10.2f}'.format(
+            t, '20 x 20 grid', 400, elapsed, elapsed / 400, lml))
+        for name, workers in (('fit, 5 restarts', None),
+                              ('fit, 5 restarts, 4 workers', 4)):
+            np.random.seed(1)
+            gp = GP(X, Y, l=1, sigma_f=1, noise=0.1)
+            report = gp.fit_hyperparameters(5, workers)
+            print('{:>6} {:>28} {:>12} {:>10.2f} {:>14.4f} {:>10.2f}'
+                  .format(t, name, report['evaluations'],
+                          report['seconds'],
+                          report['seconds_per_evaluation'],
+                          report['log_likelihood']))
+
+
+if __name__ == '__main__':
+    growth()
+    hyperparameters()
@@ -1,62 +1,315 @@
 #!/usr/bin/env python3
 
 """
-This script represents a noiseless 1D Gaussian process
+This script represents a Gaussian process that keeps the Cholesky
+factor of its kernel matrix and extends it as points are added
 """
 
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import numpy as np
+from scipy.linalg import cho_solve, solve_triangular
+from scipy.linalg.lapack import dpotri
+from scipy.optimize import minimize
+
+# added to the diagonal, times sigma_f ** 2, so that duplicated or very
+# close points keep the kernel matrix positive definite
+JITTER = 1e-10
+
+
+def jittered_cholesky(A, jitter):
+    """
+    lower Cholesky factor of A + jitter * I, the jitter being raised
+    tenfold until the factorization succeeds
+    """
+    diagonal = np.arange(A.shape[0])
+    for _ in range(10):
+        B = A.copy()
+        B[diagonal, diagonal] += jitter
+        try:
+            return np.linalg.cholesky(B)
+        except np.linalg.LinAlgError:
+            jitter *= 10
+    raise np.linalg.LinAlgError('kernel matrix is not positive definite')
+
+
+def squared_distances(X1, X2):
+    """
+    squared euclidean distances between the rows of two matrices
+    """
+    sqdist = np.sum(X1**2, 1).reshape(-1, 1) + np.sum(
+        X2**2, 1) - 2 * np.dot(X1, X2.T)
+    # rounding in the expansion can leave tiny negative distances
+    return np.maximum(sqdist, 0, out=sqdist)
+
+
+def log_marginal_likelihood(theta, sqdist, Y, noise=None):
+    """
+    log marginal likelihood of the outputs under a squared exponential
+    kernel, and its gradient
+
+    theta: numpy.ndarray of log l, log sigma_f and, when noise is None,
+        log of the standard deviation of the noise
+    sqdist: numpy.ndarray (t, t) of the squared distances between the
+        inputs, computed once for every evaluation
+    Y: numpy.ndarray (t, 1) of the outputs
+    noise: fixed standard deviation of the noise, or None to take it
+        from theta
+
+    Return: lml, gradient
+    - gradient: numpy.ndarray of the shape of theta
+    """
+    l, sigma_f = np.exp(theta[:2])
+    if noise is None:
+        noise = np.exp(theta[2])
+    t = Y.shape[0]
+    K_f = sigma_f**2 * np.exp(-0.5 / l**2 * sqdist)
+    L = jittered_cholesky(K_f, noise**2 + JITTER * sigma_f**2)
+    alpha = cho_solve((L, True), Y)
+    lml = (-0.5 * Y.T.dot(alpha).item()
+           - np.sum(np.log(np.diagonal(L))) - 0.5 * t * np.log(2 * np.pi))
+    # d lml = tr((alpha alpha^T - K^-1) dK) / 2, with K^-1 from the
+    # factor by LAPACK, which fills its lower triangle only
+    K_inv, _ = dpotri(L, lower=1)
+    K_inv = np.tril(K_inv) + np.tril(K_inv, -1).T
+    inner = alpha.dot(alpha.T) - K_inv
+    gradient = [0.5 * np.sum(inner * K_f * sqdist) / l**2,
+                np.sum(inner * K_f)]
+    if theta.shape[0] > 2:
+        gradient.append(noise**2 * np.trace(inner))
+    return lml, np.array(gradient)
+
+
+def fit_restart(start, sqdist, Y, noise, bounds):
+    """
+    one L-BFGS-B maximization of the log marginal likelihood
+
+    start: numpy.ndarray, theta to start from
+    sqdist, Y, noise: as for log_marginal_likelihood
+    bounds: list of (low, high) of each entry of theta
+
+    Return: theta, lml, evaluations, seconds
+    """
+    begin = time.perf_counter()
+
+    def negative(theta):
+        """ -lml and its gradient """
+        lml, gradient = log_marginal_likelihood(theta, sqdist, Y, noise)
+        return -lml, -gradient
+
+    result = minimize(negative, start, jac=True, method='L-BFGS-B',
+                      bounds=bounds)
+    return (result.x, -result.fun, result.nfev,
+            time.perf_counter() - begin)
 
 
 class GaussianProcess:
     """
-    A class that represents a noiseless 1D Gaussian process
+    A class that represents a Gaussian process on (t, d) inputs with
+    optional Gaussian noise on the outputs
     """
 
-    def __init__(self, X_init, Y_init, l=1, sigma_f=1):
+    def __init__(self, X_init, Y_init, l=1, sigma_f=1, noise=0):
         """
-        A function that initializes a noiseless 1D Gaussian process
+        A function that initializes a Gaussian process
+
+        X_init: numpy.ndarray (t, d) of the inputs already sampled
+        Y_init: numpy.ndarray (t, 1) of the outputs for each input
+        l: length parameter for the kernel
+        sigma_f: standard deviation given to the output of the
+            black-box function
+        noise: standard deviation of the noise on the outputs
         """
 
         self.X = X_init
+        if np.ndim(X_init) != 2:
+            self.X = np.reshape(X_init, (np.shape(X_init)[0], -1))
         self.Y = Y_init
+        if np.ndim(Y_init) != 2:
+            self.Y = np.reshape(Y_init, (-1, 1))
         self.l = l
         self.sigma_f = sigma_f
-        self.K = self.kernel(X_init, X_init)
+        self.noise = noise
+        self.jitter = noise ** 2 + JITTER * sigma_f ** 2
+        # L L^T = K + jitter * I, and v = L^-1 Y
+        self.L = jittered_cholesky(self.kernel(self.X, self.X), self.jitter)
+        self.v = solve_triangular(self.L, self.Y, lower=True)
+        self._alpha = None
+
+    @property
+    def K(self):
+        """
+        the noiseless covariance kernel matrix of the sampled inputs,
+        rebuilt on demand since only its Cholesky factor is kept
+        """
+
+        return self.kernel(self.X, self.X)
+
+    @property
+    def alpha(self):
+        """
+        (K + jitter * I)^-1 Y, solved once per update
+        """
+
+        if self._alpha is None:
+            self._alpha = solve_triangular(self.L.T, self.v, lower=False)
+        return self._alpha
+
+    def fitted(self):
+        """
+        posterior mean at the sampled inputs, Y - jitter * alpha, in
+        O(t) once alpha is known instead of a prediction at every
+        sampled input
+
+        Return: numpy.ndarray (t,)
+        """
+
+        return (self.Y - self.jitter * self.alpha).reshape(-1)
 
     def kernel(self, X1, X2):
         """
         calculates the covariance kernel matrix between two matrices
         """
 
-        sqdist = np.sum(X1**2, 1).reshape(-1, 1) + np.sum(
-            X2**2, 1) - 2 * np.dot(X1, X2.T)
+        sqdist = squared_distances(X1, X2)
         return self.sigma_f**2 * np.exp(-0.5 / self.l**2 * sqdist)
 
     def predict(self, X_s):
         """
         predicts the mean and standard deviation of
-        points in a Gaussian process
+        points in a Gaussian process, with triangular solves against
+        the Cholesky factor and only the diagonal of the covariance
 
-        X_s: numpy.ndarray of shape (s, 1) containing all of the points
+        X_s: numpy.ndarray of shape (s, d) containing all of the points
             - whose mean and standard deviation should be calculated
             - s is the number of sample points
         Return mu, sigma
         - mu:
         numpy.ndarray (s,) containing the mean for each point in X_s
+        - sigma:
+        numpy.ndarray (s,) containing the variance for each point in X_s
         """
 
-        K_inv = np.linalg.inv(self.K)
-        K_s = self.kernel(self.X, X_s)
-        mu = K_s.T.dot(K_inv).dot(self.Y).reshape(-1)
-        K_ss = self.kernel(X_s, X_s)
-        sigma = K_ss - K_s.T.dot(K_inv).dot(K_s)
-        return mu, np.diag(sigma)
+        X_s = np.reshape(X_s, (-1, self.X.shape[1]))
+        V = solve_triangular(self.L, self.kernel(self.X, X_s), lower=True)
+        mu = V.T.dot(self.v).reshape(-1)
+        sigma = self.sigma_f**2 - np.einsum('ts,ts->s', V, V)
+        return mu, np.maximum(sigma, 0)
+
+    def gradient(self, x):
+        """
+        predicts the mean and variance at a single point together with
+        their gradients with respect to the point
+
+        x: numpy.ndarray of shape (d,)
+        Return mu, sigma, d_mu, d_sigma
+        - mu, sigma: floats, the mean and the variance at x
+        - d_mu, d_sigma: numpy.ndarrays (d,) of their gradients
+        """
+
+        x = np.reshape(x, (1, -1))
+        k = self.kernel(self.X, x)
+        # dk(x_i, x)/dx = k(x_i, x) (x_i - x) / l^2
+        d_k = k * (self.X - x) / self.l**2
+        mu = k.T.dot(self.alpha).item()
+        d_mu = d_k.T.dot(self.alpha).reshape(-1)
+        w = solve_triangular(self.L, k, lower=True)
+        sigma = self.sigma_f**2 - w.T.dot(w).item()
+        u = solve_triangular(self.L.T, w, lower=False)
+        d_sigma = -2 * d_k.T.dot(u).reshape(-1)
+        return mu, max(sigma, 0), d_mu, d_sigma
+
+    def fit_hyperparameters(self, restarts=5, workers=None,
+                            fit_noise=False, bounds=None):
+        """
+        sets l, sigma_f and optionally the noise to the values that
+        maximize the log marginal likelihood of the samples, by
+        L-BFGS-B with analytic gradients from several starting points;
+        the squared distances between the inputs are computed once and
+        shared by every evaluation
+
+        restarts: number of starting points, the current values first
+            and the others drawn log-uniformly within the bounds
+        workers: number of processes running the restarts in parallel,
+            or None to run them in this process
+        fit_noise: whether the noise is fitted too, or kept as it is
+        bounds: list of (low, high) for l, sigma_f and, if fit_noise,
+            the noise, or None for (1e-3, 1e3) and (1e-6, 10) for the
+            noise
+
+        Return: dict of the fit
+        - log_likelihood: log marginal likelihood of the result
+        - evaluations: total number of likelihood evaluations
+        - seconds: wall-clock time of the fit
+        - seconds_per_evaluation: seconds of one evaluation, on average
+        over the restarts
+        """
+
+        begin = time.perf_counter()
+        if bounds is None:
+            bounds = [(1e-3, 1e3), (1e-3, 1e3)]
+            if fit_noise:
+                bounds.append((1e-6, 10))
+        log_bounds = np.log(np.array(bounds, dtype=float))
+        current = [self.l, self.sigma_f]
+        if fit_noise:
+            current.append(max(self.noise, bounds[2][0]))
+        starts = [np.clip(np.log(current), log_bounds[:, 0],
+                          log_bounds[:, 1])]
+        for _ in range(restarts - 1):
+            starts.append(np.random.uniform(log_bounds[:, 0],
+                                            log_bounds[:, 1]))
+        sqdist = squared_distances(self.X, self.X)
+        noise = None if fit_noise else self.noise
+        arguments = (starts, repeat(sqdist), repeat(self.Y), repeat(noise),
+                     repeat(log_bounds))
+        if workers is None:
+            results = list(map(fit_restart, *arguments))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(fit_restart, *arguments))
+        theta, lml, _, _ = max(results, key=lambda result: result[1])
+
+        self.l, self.sigma_f = np.exp(theta[:2])
+        if fit_noise:
+            self.noise = np.exp(theta[2])
+        self.jitter = self.noise ** 2 + JITTER * self.sigma_f ** 2
+        self.L = jittered_cholesky(self.K, self.jitter)
+        self.v = solve_triangular(self.L, self.Y, lower=True)
+        self._alpha = None
+        evaluations = sum(result[2] for result in results)
+        return {'log_likelihood': float(lml), 'evaluations': evaluations,
+                'seconds': time.perf_counter() - begin,
+                'seconds_per_evaluation':
+                    sum(result[3] for result in results) / evaluations}
 
     def update(self, X_new, Y_new):
         """
-        A function that updates a Gaussian process
+        A function that updates a Gaussian process: the Cholesky factor
+        is extended by the rows of the new points, O(t^2) per point,
+        instead of being recomputed
+
+        X_new: numpy.ndarray (d,) or (m, d) of the new sample points
+        Y_new: numpy.ndarray (1,) or (m, 1) of the new outputs
         """
 
-        self.X = np.append(self.X, X_new).reshape(-1, 1)
-        self.Y = np.append(self.Y, Y_new).reshape(-1, 1)
-        self.K = self.kernel(self.X, self.X)
+        t, d = self.X.shape
+        X_new = np.reshape(X_new, (-1, d))
+        Y_new = np.reshape(Y_new, (-1, 1))
+        m = X_new.shape[0]
+        # [[L, 0], [L21, L22]] factors [[K, K12], [K12^T, K22]]
+        L21 = solve_triangular(self.L, self.kernel(self.X, X_new),
+                               lower=True).T
+        schur = self.kernel(X_new, X_new) - L21.dot(L21.T)
+        L22 = jittered_cholesky(schur, self.jitter)
+        L = np.zeros((t + m, t + m))
+        L[:t, :t] = self.L
+        L[t:, :t] = L21
+        L[t:, t:] = L22
+        v_new = solve_triangular(L22, Y_new - L21.dot(self.v), lower=True)
+        self.L = L
+        self.v = np.concatenate((self.v, v_new))
+        self.X = np.concatenate((self.X, X_new))
+        self.Y = np.concatenate((self.Y, Y_new))
+        self._alpha = None
@@ -2,28 +2,37 @@
 """
 5. Bayesian Optimization
 """
+import copy
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
 import numpy as np
-from scipy.stats import norm
+from scipy.optimize import minimize
+from scipy.stats import norm, qmc
 GP = __import__('2-gp').GaussianProcess
+SparseGP = __import__('6-sparse_gp').SparseGaussianProcess
 
 
 class BayesianOptimization:
     """
-    Performs Bayesian optimization on a noiseless 1D Gaussian process
+    Performs Bayesian optimization on a Gaussian process over a box of
+    one or more dimensions
     """
 
     def __init__(self, f, X_init, Y_init, bounds, ac_samples, l=1,
-                 sigma_f=1, xsi=0.01, minimize=True):
+                 sigma_f=1, xsi=0.01, minimize=True, candidates=None,
+                 restarts=0, sparse_threshold=None, inducing=256):
         """
         Class constructor
         Args:
             f: black-box function to be optimized
-            X_init: np.ndarray - (t, 1) - inputs already sampled with the
+            X_init: np.ndarray - (t, d) - inputs already sampled with the
                 black-box function
             Y_init: np.ndarray - (t, 1) - outputs of the black-box function
                 for each input in X_init
             bounds: tuple (min, max) - bounds of the space in which to look
-                for the optimal point
+                for the optimal point, or array-like (d, 2) of the bounds
+                of each dimension
             ac_samples: number of samples that should be analyzed during
                 acquisition
             l: length parameter for the kernel
@@ -32,56 +41,292 @@ class BayesianOptimization:
             xsi: exploration-exploitation factor for acquisition
             minimize: bool determining whether optimization should be
                 performed for minimization (True) or maximization (False)
+            candidates: 'grid' for evenly spaced samples (1D only),
+                'sobol' or 'lhs' for a scrambled Sobol sequence or a
+                Latin hypercube, or None for 'grid' in 1D and 'sobol'
+                otherwise; anything else raises a ValueError, and so
+                does 'grid' with bounds of more than one dimension
+            restarts: number of the best samples refined with L-BFGS-B
+                on the analytic gradient of the Expected Improvement,
+                0 to keep the best sample as it is
+            sparse_threshold: number of samples from which the exact
+                Gaussian process, O(t^2) per update and prediction, is
+                replaced by a sparse one on inducing points, O(m^2), or
+                None to stay exact
+            inducing: number m of inducing points of the sparse process
         """
-        MIN, MAX = bounds
+        self.bounds = np.reshape(np.asarray(bounds, dtype=float), (-1, 2))
+        d = self.bounds.shape[0]
+        if candidates is None:
+            candidates = 'grid' if d == 1 else 'sobol'
+        if candidates not in ('grid', 'sobol', 'lhs'):
+            raise ValueError("candidates must be None, 'grid', 'sobol' "
+                             "or 'lhs'")
+        if candidates == 'grid' and d > 1:
+            raise ValueError("candidates 'grid' needs 1D bounds")
 
         self.f = f
         self.gp = GP(X_init, Y_init, l=l, sigma_f=sigma_f)
-        self.X_s = np.linspace(MIN, MAX, num=ac_samples)[..., np.newaxis]
+        if candidates == 'grid':
+            MIN, MAX = self.bounds[0]
+            self.X_s = np.linspace(MIN, MAX, num=ac_samples)[..., np.newaxis]
+        else:
+            Sampler = qmc.Sobol if candidates == 'sobol' else \
+                qmc.LatinHypercube
+            sampler = Sampler(d, seed=np.random.randint(2 ** 31))
+            if candidates == 'sobol':
+                # whole powers of 2 keep the balance of the sequence
+                m = int(np.ceil(np.log2(ac_samples)))
+                unit = sampler.random_base2(m)[:ac_samples]
+            else:
+                unit = sampler.random(ac_samples)
+            self.X_s = qmc.scale(unit, self.bounds[:, 0], self.bounds[:, 1])
         self.xsi = xsi
         self.minimize = minimize
+        self.restarts = restarts
+        self.sparse_threshold = sparse_threshold
+        self.inducing = inducing
+        self.sparsify()
+
+    def sparsify(self):
+        """
+        Replaces the exact Gaussian process by a sparse one with the
+        same samples and hyperparameters, once it holds
+        sparse_threshold samples
+        """
+        if (self.sparse_threshold is not None and isinstance(self.gp, GP)
+                and self.gp.X.shape[0] >= self.sparse_threshold):
+            self.gp = SparseGP(self.gp.X, self.gp.Y, self.gp.l,
+                               self.gp.sigma_f, self.gp.noise,
+                               self.inducing)
+
+    def expected_improvement(self, mu, sigma, opt_mu):
+        """
+        Expected Improvement and its derivatives with respect to the
+        mean and the standard deviation
+        Args:
+            mu: np.ndarray - predicted means
+            sigma: np.ndarray - predicted standard deviations
+            opt_mu: best mean at the sampled inputs
+
+        Returns: EI, d_mu, d_sigma
+        """
+        if self.minimize:
+            imp = opt_mu - mu - self.xsi
+            sign = -1
+        else:
+            imp = mu - opt_mu - self.xsi
+            sign = 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            Z = imp / sigma
+            cdf = norm.cdf(Z)
+            pdf = norm.pdf(Z)
+            EI = imp * cdf + sigma * pdf
+        zero = sigma == 0.0
+        EI[zero] = 0.0
+        d_mu = sign * np.where(zero, 0.0, cdf)
+        d_sigma = np.where(zero, 0.0, pdf)
+        return EI, d_mu, d_sigma
 
-    def acquisition(self):
+    def acquisition(self, gp=None):
         """
         Calculates the next best sample location
-        Uses the Expected Improvement acquisition function
+        Uses the Expected Improvement acquisition function: one
+        prediction on the ac_samples samples, then L-BFGS-B from the
+        restarts best of them
+        Args:
+            gp: Gaussian process to use instead of self.gp, e.g. one
+                with fantasized outputs at pending points
         Returns: X_next, EI
+            - EI: np.ndarray - (ac_samples,) - Expected Improvement of
+                the samples
         """
-        mu, _ = self.gp.predict(self.gp.X)
-        sample_mu, sigma = self.gp.predict(self.X_s)
+        gp = self.gp if gp is None else gp
+        # the fitted means come from the Cholesky factor, not from a
+        # prediction at every sampled input
+        mu = gp.fitted()
+        sample_mu, variance = gp.predict(self.X_s)
 
         if self.minimize:
             opt_mu = np.min(mu)
         else:
             opt_mu = np.max(mu)
 
-        imp = opt_mu - sample_mu - self.xsi
-        Z = imp / sigma
-        EI = ((imp * norm.cdf(Z)) + (sigma * norm.pdf(Z)))
-        EI[sigma == 0.0] = 0.0
+        EI, _, _ = self.expected_improvement(sample_mu, np.sqrt(variance),
+                                             opt_mu)
+        best = np.argmax(EI)
+        X_next = self.X_s[best]
+
+        if self.restarts:
+            def negative(x):
+                """ -EI at x and its gradient """
+                mu, variance, d_mu, d_variance = gp.gradient(x)
+                sigma = np.sqrt(variance)
+                ei, ei_mu, ei_sigma = self.expected_improvement(
+                    np.array([mu]), np.array([sigma]), opt_mu)
+                if sigma == 0.0:
+                    return 0.0, np.zeros_like(x)
+                d_sigma = d_variance / (2 * sigma)
+                return -ei[0], -(ei_mu[0] * d_mu + ei_sigma[0] * d_sigma)
 
-        X_next = self.X_s[np.argmax(EI)]
+            top = EI[best]
+            for start in np.argsort(EI)[::-1][:self.restarts]:
+                result = minimize(negative, self.X_s[start], jac=True,
+                                  method='L-BFGS-B', bounds=self.bounds)
+                if -result.fun > top:
+                    top = -result.fun
+                    X_next = result.x
 
         return X_next, np.array(EI)
 
-    def optimize(self, iterations=100):
+    def sampled(self, X):
+        """
+        Whether a location has already been sampled, every coordinate
+        matching
+        """
+        return bool(np.any(np.all(self.gp.X == np.reshape(X, (1, -1)),
+                                  axis=1)))
+
+    def propose(self, q=1, pending=(), strategy='believer'):
+        """
+        Proposes a batch of sample locations: after each pick, the
+        output there is fantasized and added to a copy of the Gaussian
+        process, so that the next pick looks elsewhere
+        Args:
+            q: number of locations to propose
+            pending: locations under evaluation, fantasized first
+            strategy: 'believer' to fantasize the predicted mean
+                (kriging believer), 'liar' to fantasize the best output
+                seen so far (constant liar)
+
+        Returns: np.ndarray - (q, d) - the proposed locations
+        """
+        # the updates of the process replace its arrays, so a shallow
+        # copy leaves self.gp untouched
+        gp = copy.copy(self.gp)
+        if self.minimize:
+            lie = np.min(self.gp.Y)
+        else:
+            lie = np.max(self.gp.Y)
+
+        def fantasize(X):
+            """ adds fantasized outputs at X to gp """
+            X = np.reshape(X, (-1, gp.X.shape[1]))
+            if strategy == 'believer':
+                Y = gp.predict(X)[0]
+            else:
+                Y = np.full(X.shape[0], lie)
+            gp.update(X, Y)
+
+        if len(pending):
+            fantasize(np.array(pending))
+        X_batch = []
+        for _ in range(q):
+            X_next, _ = self.acquisition(gp)
+            X_batch.append(X_next)
+            fantasize(X_next)
+        return np.array(X_batch)
+
+    def optimize(self, iterations=100, workers=None, q=None,
+                 strategy='believer', asynchronous=False, threads=False,
+                 history=None):
         """
         Optimizes the black-box function
         Args:
-            iterations: maximum number of iterations to perform
+            iterations: maximum number of iterations to perform, i.e.
+                evaluations of the black-box function
+            workers: number of evaluations run concurrently in a pool,
+                or None to evaluate one location at a time
+            q: number of locations proposed per round, defaults to
+                workers
+            strategy: 'believer' or 'liar', see propose
+            asynchronous: whether a new location is proposed as soon as
+                any evaluation finishes, the others being fantasized,
+                instead of waiting for the whole batch
+            threads: whether the pool is made of threads instead of
+                processes, for a black-box function that releases the
+                GIL or cannot be pickled
+            history: list receiving a tuple (seconds since the start,
+                X, Y) for each evaluation as it finishes, or None
 
         Returns: X_opt, Y_opt
         """
-        for i in range(iterations):
-            X_next, _ = self.acquisition()
+        start = time.perf_counter()
 
-            if X_next in self.gp.X:
-                break
+        def record(X, Y):
+            """ adds an evaluation to the process and the history """
+            self.gp.update(X, Y)
+            self.sparsify()
+            if history is not None:
+                history.append((time.perf_counter() - start, X, Y))
+
+        if workers is None:
+            for i in range(iterations):
+                X_next, _ = self.acquisition()
 
-            Y = self.f(X_next)
-            self.gp.update(X_next, Y)
+                if self.sampled(X_next):
+                    break
 
-        idx = np.argmin(self.gp.Y)
+                Y = self.f(X_next)
+                record(X_next, Y)
+        else:
+            q = workers if q is None else q
+            Pool = ThreadPoolExecutor if threads else ProcessPoolExecutor
+            with Pool(workers) as pool:
+                if asynchronous:
+                    self._asynchronous(pool, iterations, workers, strategy,
+                                       record)
+                else:
+                    self._synchronous(pool, iterations, q, strategy,
+                                      record)
+
+        if self.minimize:
+            idx = np.argmin(self.gp.Y)
+        else:
+            idx = np.argmax(self.gp.Y)
         X_opt = self.gp.X[idx]
         Y_opt = np.array(self.gp.Y[idx])
         return X_opt, Y_opt
+
+    def _synchronous(self, pool, iterations, q, strategy, record):
+        """
+        Rounds of q proposals evaluated together in the pool, the
+        process being updated once the whole round is back
+        """
+        done = 0
+        while done < iterations:
+            X_batch = self.propose(min(q, iterations - done),
+                                   strategy=strategy)
+            X_batch = [X for i, X in enumerate(X_batch)
+                       if not self.sampled(X)
+                       and not any(np.array_equal(X, other)
+                                   for other in X_batch[:i])]
+            if not X_batch:
+                break
+            for X, Y in zip(X_batch, pool.map(self.f, X_batch)):
+                record(X, Y)
+            done += len(X_batch)
+
+    def _asynchronous(self, pool, iterations, workers, strategy, record):
+        """
+        Keeps workers evaluations in flight, refitting and proposing a
+        new location every time one of them finishes
+        """
+        running = {}
+        submitted = 0
+        while True:
+            while len(running) < workers and submitted < iterations:
+                X_next = self.propose(1, list(running.values()),
+                                      strategy)[0]
+                if self.sampled(X_next) or any(
+                        np.array_equal(X_next, X)
+                        for X in running.values()):
+                    # nothing new until an evaluation comes back
+                    break
+                running[pool.submit(self.f, X_next)] = X_next
+                submitted += 1
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record(running.pop(future), future.result())
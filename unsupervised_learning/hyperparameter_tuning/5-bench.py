@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""
+Wall-clock time for Bayesian optimization to reach a target value of
+a black-box function whose evaluations take between 0.2 and 0.6 s, one
+evaluation at a time against batches and asynchronous pools of workers;
+then dense grids of candidates against Sobol samples refined with
+L-BFGS-B, in 2 and 4 dimensions
+"""
+
+import time
+import numpy as np
+BO = __import__('5-bayes_opt').BayesianOptimization
+
+TARGET = -2.9
+
+
+def f(x):
+    """ the black-box function, as slow as a short training run """
+    x = np.asarray(x, dtype=float)
+    # the duration depends on x only, so every run sees the same ones
+    time.sleep(0.2 + 0.4 * (np.sin(37 * x.sum()) + 1) / 2)
+    return np.sin(5 * x) + 2 * np.sin(-2 * x)
+
+
+def time_to_target(history):
+    """ seconds until an output reaches TARGET, or None """
+    for seconds, _, Y in history:
+        if np.min(Y) <= TARGET:
+            return seconds
+    return None
+
+
+def branin(X):
+    """ Branin function, minimum 0.397887 """
+    X = np.reshape(X, (-1, 2))
+    a, b = X[:, 0], X[:, 1]
+    Y = ((b - 5.1 / (4 * np.pi ** 2) * a ** 2 + 5 / np.pi * a - 6) ** 2
+         + 10 * (1 - 1 / (8 * np.pi)) * np.cos(a) + 10)
+    return Y.reshape(-1, 1)
+
+
+def styblinski_tang(X):
+    """ Styblinski-Tang function in 4D, minimum -156.66 """
+    X = np.reshape(X, (-1, 4))
+    return 0.5 * np.sum(X ** 4 - 16 * X ** 2 + 5 * X, axis=1,
+                        keepdims=True)
+
+
+def parallel():
+    """ time to target with pools of workers """
+    print('target {}, 40 evaluations at most'.format(TARGET))
+    print('{:>28} {:>12} {:>12} {:>9} {:>12}'.format(
+        '', 'target (s)', 'speedup', 'best', 'evaluations'))
+    baseline = None
+    for name, options in (
+            ('one at a time', {}),
+            ('2 workers, believer', {'workers': 2}),
+            ('4 workers, believer', {'workers': 4}),
+            ('4 workers, liar', {'workers': 4, 'strategy': 'liar'}),
+            ('4 workers, asynchronous', {'workers': 4,
+                                         'asynchronous': True}),
+            ('8 workers, asynchronous', {'workers': 8,
+                                         'asynchronous': True})):
+        np.random.seed(0)
+        X_init = np.random.uniform(-np.pi, 2 * np.pi, (2, 1))
+        Y_init = np.sin(5 * X_init) + 2 * np.sin(-2 * X_init)
+        bo = BO(f, X_init, Y_init, (-np.pi, 2 * np.pi), 200, l=0.6,
+                sigma_f=2)
+        history = []
+        with np.errstate(divide='ignore', invalid='ignore'):
+            _, Y_opt = bo.optimize(40, history=history, **options)
+        seconds = time_to_target(history)
+        if baseline is None:
+            baseline = seconds
+        speedup = ('{:.1f}x'.format(baseline / seconds)
+                   if seconds and baseline else '-')
+        print('{:>28} {:>12} {:>12} {:>9.4f} {:>12}'.format(
+            name, '-' if seconds is None else '{:.2f}'.format(seconds),
+            speedup, Y_opt[0], len(history)))
+
+
+def continuous():
+    """ acquisition on dense grids against refined Sobol samples """
+    print('\n30 iterations from 5 random points')
+    print('{:>16} {:>28} {:>11} {:>14} {:>10}'.format(
+        '', 'candidates', 'predicted', 's/iteration', 'best'))
+    for name, func, bounds, l, sigma_f in (
+            ('branin 2D', branin, [(-5, 10), (0, 15)], 3, 50),
+            ('styblinski 4D', styblinski_tang, [(-5, 5)] * 4, 2, 100)):
+        d = len(bounds)
+        for candidates, samples, restarts, resolution in (
+                ('grid', None, 0, 64 if d == 2 else 16),
+                ('grid', None, 0, 256 if d == 2 else 32),
+                ('sobol', 256, 0, None),
+                ('sobol', 256, 5, None),
+                ('lhs', 256, 5, None)):
+            np.random.seed(0)
+            low, high = np.array(bounds, dtype=float).T
+            X_init = np.random.uniform(low, high, (5, d))
+            bo = BO(func, X_init, func(X_init), bounds, samples or 1,
+                    l=l, sigma_f=sigma_f,
+                    candidates=candidates if samples else 'sobol',
+                    restarts=restarts)
+            if samples is None:
+                # the linspace grid in every dimension
+                axes = [np.linspace(a, b, resolution) for a, b in bounds]
+                bo.X_s = np.stack(np.meshgrid(*axes), -1).reshape(-1, d)
+                label = '{}^{} grid'.format(resolution, d)
+            else:
+                label = '{} {} + {} L-BFGS-B'.format(
+                    samples, candidates, restarts)
+            start = time.perf_counter()
+            _, Y_opt = bo.optimize(30)
+            iterations = bo.gp.X.shape[0] - 5
+            print('{:>16} {:>28} {:>11} {:>14.4f} {:>10.4f}'.format(
+                name, label, bo.X_s.shape[0],
+                (time.perf_counter() - start) / max(iterations, 1),
+                Y_opt[0]))
+
+
+if __name__ == '__main__':
+    parallel()
+    continuous()
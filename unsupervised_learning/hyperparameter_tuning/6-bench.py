@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Time of one acquisition step, a single-point update then a prediction
+on 1000 candidates, of the exact and the sparse Gaussian processes as
+they grow; then Bayesian optimization from thousands of samples,
+exact against switched to sparse
+"""
+
+import time
+import numpy as np
+GP = __import__('2-gp').GaussianProcess
+SparseGP = __import__('6-sparse_gp').SparseGaussianProcess
+BO = __import__('5-bayes_opt').BayesianOptimization
+
+
+def f(X):
+    """ the black-box function """
+    return np.sum(np.sin(3 * X), axis=1, keepdims=True)
+
+
+def styblinski_tang(X):
+    """ Styblinski-Tang function in 4D, minimum -156.66 """
+    X = np.reshape(X, (-1, 4))
+    return 0.5 * np.sum(X ** 4 - 16 * X ** 2 + 5 * X, axis=1,
+                        keepdims=True)
+
+
+def step(gp, X_s):
+    """ seconds of one update and one prediction """
+    x = np.random.uniform(0, 10, (1, 2))
+    start = time.perf_counter()
+    gp.update(x, f(x))
+    gp.predict(X_s)
+    return time.perf_counter() - start
+
+
+def growth():
+    """ time per acquisition step as the processes grow """
+    np.random.seed(0)
+    X_s = np.random.uniform(0, 10, (1000, 2))
+    X = np.random.uniform(0, 10, (20000, 2))
+    Y = f(X) + 0.01 * np.random.randn(20000, 1)
+    print('{:>6} {:>20} {:>20} {:>20}'.format(
+        't', 'exact (s, error)', 'sparse 128', 'sparse 256'))
+    processes = {'exact': GP(X[:10], Y[:10], l=0.5, noise=0.01)}
+    for m in (128, 256):
+        processes[m] = SparseGP(X[:10], Y[:10], l=0.5, noise=0.01,
+                                inducing=m)
+    t = 10
+    for checkpoint in (1000, 2000, 5000, 10000, 20000):
+        if checkpoint > 5000:
+            # t^2 floats of the exact factor no longer fit comfortably
+            processes.pop('exact', None)
+        cells = []
+        for name in ('exact', 128, 256):
+            if name not in processes:
+                cells.append('-')
+                continue
+            gp = processes[name]
+            gp.update(X[t:checkpoint - 1], Y[t:checkpoint - 1])
+            seconds = step(gp, X_s)
+            # mean absolute error of the predicted mean
+            error = np.abs(gp.predict(X_s)[0] - f(X_s)[:, 0]).mean()
+            cells.append('{:.4f}, {:.4f}'.format(seconds, error))
+        t = checkpoint
+        print('{:>6} {:>20} {:>20} {:>20}'.format(checkpoint, *cells))
+
+
+def optimization():
+    """ Bayesian optimization from 3000 random samples in 4D """
+    print('\n30 iterations from 3000 random samples, 4D')
+    print('{:>26} {:>14} {:>12}'.format('', 's/iteration', 'best'))
+    for name, threshold in (('exact', None), ('sparse from 1000, m=256',
+                                              1000)):
+        np.random.seed(0)
+        X_init = np.random.uniform(-5, 5, (3000, 4))
+        bo = BO(styblinski_tang, X_init, styblinski_tang(X_init),
+                [(-5, 5)] * 4, 256, l=2, sigma_f=100, restarts=5,
+                sparse_threshold=threshold, inducing=256)
+        start = time.perf_counter()
+        _, Y_opt = bo.optimize(30)
+        iterations = bo.gp.X.shape[0] - 3000
+        print('{:>26} {:>14.4f} {:>12.4f}'.format(
+            name, (time.perf_counter() - start) / max(iterations, 1),
+            Y_opt[0]))
+
+
+if __name__ == '__main__':
+    growth()
+    optimization()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+
+"""
+This script represents a sparse Gaussian process: a Nystrom
+approximation on m inducing points with the deterministic training
+conditional (DTC) predictive distribution, O(t m^2) in all instead of
+O(t^3), behind the same predict / update API as 2-gp
+"""
+
+import numpy as np
+from scipy.linalg import cho_solve, solve_triangular
+exact = __import__('2-gp')
+
+# smallest noise variance, times sigma_f ** 2, so that a noiseless
+# process keeps its m x m system well conditioned
+NUGGET = 1e-6
+
+# variance, times sigma_f ** 2, a point may leave unexplained by the
+# inducing points before it becomes one, while fewer than m exist
+RESIDUAL = 1e-4
+
+
+def pivoted_cholesky(X, kernel, diagonal, m, tol):
+    """
+    partial Cholesky factor of the kernel matrix of X, greedily pivoting
+    on the point whose variance is the least explained so far
+
+    X: numpy.ndarray (t, d) of the inputs
+    kernel: function returning the kernel matrix between two matrices
+    diagonal: value of the kernel of a point with itself
+    m: maximum number of pivots
+    tol: stops once no residual variance exceeds tol
+
+    Return: G, pivots
+    - G: numpy.ndarray (t, j) with G G^T close to the kernel matrix
+    - pivots: numpy.ndarray (j,) of the rows of X chosen, j <= m
+    """
+    t = X.shape[0]
+    G = np.zeros((t, min(m, t)))
+    residual = np.full(t, float(diagonal))
+    pivots = []
+    for j in range(G.shape[1]):
+        p = np.argmax(residual)
+        if residual[p] <= tol:
+            break
+        pivots.append(p)
+        column = kernel(X, X[p:p + 1])[:, 0] - G[:, :j].dot(G[p, :j])
+        G[:, j] = column / np.sqrt(residual[p])
+        residual -= G[:, j] ** 2
+        # the pivots are explained exactly, up to rounding
+        residual[pivots] = 0
+    return G[:, :len(pivots)], np.array(pivots, dtype=int)
+
+
+class SparseGaussianProcess:
+    """
+    A class that represents a Gaussian process on (t, d) inputs
+    approximated on m inducing points: chosen among the initial inputs
+    by a pivoted Cholesky factorization, then among the new inputs the
+    current ones explain poorly, until there are m
+    """
+
+    def __init__(self, X_init, Y_init, l=1, sigma_f=1, noise=0,
+                 inducing=256):
+        """
+        A function that initializes a sparse Gaussian process
+
+        X_init: numpy.ndarray (t, d) of the inputs already sampled
+        Y_init: numpy.ndarray (t, 1) of the outputs for each input
+        l: length parameter for the kernel
+        sigma_f: standard deviation given to the output of the
+            black-box function
+        noise: standard deviation of the noise on the outputs
+        inducing: maximum number m of inducing points
+        """
+
+        self.X = X_init
+        if np.ndim(X_init) != 2:
+            self.X = np.reshape(X_init, (np.shape(X_init)[0], -1))
+        self.Y = Y_init
+        if np.ndim(Y_init) != 2:
+            self.Y = np.reshape(Y_init, (-1, 1))
+        self.l = l
+        self.sigma_f = sigma_f
+        self.noise = noise
+        self.inducing = inducing
+        self.jitter = max(noise ** 2, NUGGET * sigma_f ** 2)
+        G, pivots = pivoted_cholesky(self.X, self.kernel, sigma_f ** 2,
+                                     inducing, RESIDUAL * sigma_f ** 2)
+        self.Z = self.X[pivots]
+        # phi(x) = L_Z^-1 k(Z, x), so that phi(x)^T phi(y) is the Nystrom
+        # approximation of k(x, y); G holds phi of the initial inputs
+        self.L_Z = np.tril(G[pivots])
+        # A = Phi^T Phi + jitter * I and b = Phi^T Y
+        self.A = G.T.dot(G) + self.jitter * np.identity(G.shape[1])
+        self.b = G.T.dot(self.Y)
+        # Phi of the sampled inputs in the first t rows and the first
+        # j columns, j inducing points so far, the rows grown by
+        # doubling; a copy of the process may write past its own t or
+        # j, which this process never reads
+        self._Phi = np.zeros((self.X.shape[0], inducing))
+        self._Phi[:, :G.shape[1]] = G
+        self._factor = None
+
+    @property
+    def K(self):
+        """
+        the noiseless covariance kernel matrix of the sampled inputs,
+        rebuilt on demand
+        """
+
+        return self.kernel(self.X, self.X)
+
+    def kernel(self, X1, X2):
+        """
+        calculates the covariance kernel matrix between two matrices
+        """
+
+        sqdist = exact.squared_distances(X1, X2)
+        return self.sigma_f**2 * np.exp(-0.5 / self.l**2 * sqdist)
+
+    def features(self, X):
+        """
+        Nystrom features of points
+
+        X: numpy.ndarray (s, d)
+        Return: numpy.ndarray (m, s) of phi of each point
+        """
+
+        return solve_triangular(self.L_Z, self.kernel(self.Z, X), lower=True)
+
+    @property
+    def factor(self):
+        """
+        Cholesky factor of A and the weights A^-1 b, once per update
+        """
+
+        if self._factor is None:
+            L_A = np.linalg.cholesky(self.A)
+            self._factor = L_A, cho_solve((L_A, True), self.b)
+        return self._factor
+
+    def fitted(self):
+        """
+        posterior mean at the sampled inputs
+
+        Return: numpy.ndarray (t,)
+        """
+
+        _, w = self.factor
+        Phi = self._Phi[:self.X.shape[0], :self.Z.shape[0]]
+        return Phi.dot(w).reshape(-1)
+
+    def predict(self, X_s):
+        """
+        predicts the mean and standard deviation of
+        points in a sparse Gaussian process, O(m^2) per point
+
+        X_s: numpy.ndarray of shape (s, d) containing all of the points
+            - whose mean and standard deviation should be calculated
+            - s is the number of sample points
+        Return mu, sigma
+        - mu:
+        numpy.ndarray (s,) containing the mean for each point in X_s
+        - sigma:
+        numpy.ndarray (s,) containing the variance for each point in X_s
+        """
+
+        X_s = np.reshape(X_s, (-1, self.X.shape[1]))
+        L_A, w = self.factor
+        Phi = self.features(X_s)
+        mu = Phi.T.dot(w).reshape(-1)
+        V = solve_triangular(L_A, Phi, lower=True)
+        # what the inducing points miss, plus the weight uncertainty
+        sigma = (self.sigma_f**2 - np.einsum('ms,ms->s', Phi, Phi)
+                 + self.jitter * np.einsum('ms,ms->s', V, V))
+        return mu, np.maximum(sigma, 0)
+
+    def gradient(self, x):
+        """
+        predicts the mean and variance at a single point together with
+        their gradients with respect to the point
+
+        x: numpy.ndarray of shape (d,)
+        Return mu, sigma, d_mu, d_sigma
+        - mu, sigma: floats, the mean and the variance at x
+        - d_mu, d_sigma: numpy.ndarrays (d,) of their gradients
+        """
+
+        x = np.reshape(x, (1, -1))
+        L_A, w = self.factor
+        k = self.kernel(self.Z, x)
+        d_k = k * (self.Z - x) / self.l**2
+        phi = solve_triangular(self.L_Z, k, lower=True)
+        d_phi = solve_triangular(self.L_Z, d_k, lower=True)
+        mu = phi.T.dot(w).item()
+        d_mu = d_phi.T.dot(w).reshape(-1)
+        u = cho_solve((L_A, True), phi)
+        sigma = (self.sigma_f**2 - phi.T.dot(phi).item()
+                 + self.jitter * phi.T.dot(u).item())
+        d_sigma = (-2 * d_phi.T.dot(phi)
+                   + 2 * self.jitter * d_phi.T.dot(u)).reshape(-1)
+        return mu, max(sigma, 0), d_mu, d_sigma
+
+    def add_inducing(self, x, phi, residual):
+        """
+        makes a sampled point an inducing point: one more row of L_Z,
+        one more feature for every sampled input and one more row and
+        column of A, O(t m)
+
+        x: numpy.ndarray (1, d) of the point
+        phi: numpy.ndarray (j, 1) of its features
+        residual: its variance the inducing points leave unexplained
+        """
+
+        t, j = self.X.shape[0], self.Z.shape[0]
+        root = np.sqrt(residual)
+        L_Z = np.zeros((j + 1, j + 1))
+        L_Z[:j, :j] = self.L_Z
+        L_Z[j, :j] = phi[:, 0]
+        L_Z[j, j] = root
+        Phi = self._Phi[:t, :j]
+        g = (self.kernel(self.X, x) - Phi.dot(phi))[:, 0] / root
+        self._Phi[:t, j] = g
+        A = np.empty((j + 1, j + 1))
+        A[:j, :j] = self.A
+        A[:j, j] = A[j, :j] = Phi.T.dot(g)
+        A[j, j] = g.dot(g) + self.jitter
+        self.A = A
+        self.b = np.concatenate((self.b, g.dot(self.Y).reshape(1, 1)))
+        self.L_Z = L_Z
+        self.Z = np.concatenate((self.Z, x))
+
+    def update(self, X_new, Y_new):
+        """
+        A function that updates a sparse Gaussian process, O(m^2) per
+        point, or O(t m) for a point that becomes an inducing point
+
+        X_new: numpy.ndarray (d,) or (b, d) of the new sample points
+        Y_new: numpy.ndarray (1,) or (b, 1) of the new outputs
+        """
+
+        d = self.X.shape[1]
+        X_new = np.reshape(X_new, (-1, d))
+        Y_new = np.reshape(Y_new, (-1, 1))
+        if self.Z.shape[0] < self.inducing:
+            # one at a time, each may become an inducing point
+            for x, y in zip(X_new, Y_new):
+                x = x[np.newaxis]
+                phi = self.features(x)
+                residual = self.sigma_f**2 - phi[:, 0].dot(phi[:, 0])
+                if (self.Z.shape[0] < self.inducing
+                        and residual > RESIDUAL * self.sigma_f**2):
+                    self.add_inducing(x, phi, residual)
+                    phi = np.append(phi, [[np.sqrt(residual)]], axis=0)
+                self.observe(x, y[np.newaxis], phi)
+        else:
+            self.observe(X_new, Y_new, self.features(X_new))
+
+    def observe(self, X_new, Y_new, Phi):
+        """
+        adds samples whose features are known to A, b and the features
+        of the sampled inputs
+
+        Phi: numpy.ndarray (j, b) of the features of X_new
+        """
+
+        t, j = self.X.shape[0], self.Z.shape[0]
+        # new arrays rather than in-place sums, so that a shallow copy
+        # of the process keeps its own A and b
+        self.A = self.A + Phi.dot(Phi.T)
+        self.b = self.b + Phi.dot(Y_new)
+        self._factor = None
+        rows = t + X_new.shape[0]
+        if rows > self._Phi.shape[0]:
+            grown = np.empty((max(rows, 2 * self._Phi.shape[0]),
+                              self.inducing))
+            grown[:t, :j] = self._Phi[:t, :j]
+            self._Phi = grown
+        self._Phi[t:rows, :j] = Phi.T
+        self.X = np.concatenate((self.X, X_new))
+        self.Y = np.concatenate((self.Y, Y_new))